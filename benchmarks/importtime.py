@@ -0,0 +1,51 @@
+"""Startup cost of the CLI: `python -X importtime -c "import ds.cli"`.
+
+Prints the total import time and the slowest top-level imports, and fails if
+a heavy dependency is imported before argument parsing. Run from the repo root:
+
+    python benchmarks/importtime.py [--repeat 5] [--top 10]
+"""
+from __future__ import annotations
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+# Must stay out of `import ds.cli`; they load inside the subcommands
+HEAVY = ("numpy", "pandas", "matplotlib", "pydantic", "tqdm", "yaml")
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure() -> list[tuple[int, int, int, str]]:
+	"""(self µs, cumulative µs, depth, module) for every import of one cold start."""
+	env = dict(os.environ, PYTHONPATH=str(SRC))
+	proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import ds.cli"], env=env, capture_output=True, text=True, check=True)
+	rows = []
+	for line in proc.stderr.splitlines():
+		m = LINE.match(line)
+		if m:
+			rows.append((int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, m.group(4)))
+	return rows
+
+
+def main() -> None:
+	ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	ap.add_argument("--repeat", type=int, default=5)
+	ap.add_argument("--top", type=int, default=10)
+	args = ap.parse_args()
+	runs = [measure() for _ in range(args.repeat)]
+	totals = sorted(sum(r[0] for r in rows) for rows in runs)
+	rows = runs[0]
+	print(f"import ds.cli: median {totals[len(totals) // 2] / 1000:.1f} ms, min {totals[0] / 1000:.1f} ms over {args.repeat} runs")
+	for self_us, cum_us, depth, name in sorted((r for r in rows if r[2] == 0), key=lambda r: -r[1])[:args.top]:
+		print(f"  {cum_us / 1000:8.1f} ms  {name}")
+	loaded = sorted({r[3].split(".")[0] for r in rows} & set(HEAVY))
+	if loaded:
+		sys.exit(f"heavy modules imported at CLI startup: {', '.join(loaded)}")
+
+
+if __name__ == "__main__":
+	main()
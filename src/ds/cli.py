@@ -1,12 +1,35 @@
 import argparse
 import os
+import sys
 from pathlib import Path
-from .config import load_yaml_config, set_seed
-from .sim.scenarios import build_scenario
-from .sim.engine import run_simulation
-from .sim.outputs import write_outputs, plot_run
 import json
-from tqdm import tqdm
+import math
+# Only import-light modules at top level: NumPy, pandas, pydantic and matplotlib
+# load inside the subcommand that needs them (see benchmarks/importtime.py)
+from .sim import ENGINES, OUTPUT_KINDS
+
+
+def _add_output_args(p: argparse.ArgumentParser) -> None:
+	p.add_argument("--outputs", type=str, default=None, help=f"Comma-separated subset of {','.join(OUTPUT_KINDS)} (default: all)")
+	p.add_argument("--no-plots", action="store_true", help="Skip figures (never imports matplotlib)")
+
+
+def _add_cache_args(p: argparse.ArgumentParser) -> None:
+	p.add_argument("--no-cache", action="store_true", help="Always simulate; neither read nor fill the run cache")
+	p.add_argument("--cache-dir", type=str, default=None, help="Run cache directory (default $DS_CACHE_DIR or ~/.cache/ds/runs)")
+	p.add_argument("--cache-max-mb", type=float, default=None, help="Evict least recently used cached runs beyond this size (default 2048)")
+
+
+def _add_store_args(p: argparse.ArgumentParser) -> None:
+	p.add_argument("--store", type=str, default=None, help="Results store to index runs in (default $DS_STORE_DIR or ~/.local/share/ds/store)")
+	p.add_argument("--no-store", action="store_true", help="Do not index runs in the results store")
+
+
+def _open_store(args: argparse.Namespace):
+	if args.no_store:
+		return None
+	from .sim.store import ResultsStore, default_store_dir
+	return ResultsStore(Path(args.store) if args.store else default_store_dir())
 
 
 def main() -> None:
@@ -16,44 +39,291 @@ def main() -> None:
 	p_run = sub.add_parser("run", help="Run a scenario")
 	p_run.add_argument("--scenario", required=True, type=str)
 	p_run.add_argument("--out", required=True, type=str)
-	p_run.add_argument("--mc", type=int, default=1)
+	p_run.add_argument("--mc", type=int, default=1, help="Monte Carlo replicates sampled from the scenario's uncertainty/monte_carlo blocks; writes quantile bands (batch engine)")
+	p_run.add_argument("--mc-dirs", action="store_true", help="Run --mc replicates as full runs with one output directory each (needed for stochastic reliability)")
+	p_run.add_argument("--engine", choices=ENGINES, default=None, help="Override the scenario's engine (default: loop)")
+	p_run.add_argument("--jobs", type=int, default=1, help="Worker processes for --mc replicates (0 = one per CPU)")
+	p_run.add_argument("--output-every", type=int, default=None, help="Timeseries row spacing in days for the adaptive engine (default 1)")
+	p_run.add_argument("--vintage-days", type=str, default=None, help="Comma-separated days at which vintages.csv reports area by launch year")
+	_add_output_args(p_run)
+	p_run.add_argument("--stream", action="store_true", help="Write timeseries/events in day chunks during the run (bounded memory)")
+	p_run.add_argument("--chunk-days", type=int, default=None, help="Days per streamed chunk (default 36500; implies --stream)")
+	p_run.add_argument("--checkpoint-every", type=int, default=None, help="Write a loop-engine checkpoint every N days to OUT/checkpoints/")
+	p_run.add_argument("--resume", type=str, default=None, help="Continue (or fork, if the scenario differs) from a checkpoint .npz")
+	_add_cache_args(p_run)
+	_add_store_args(p_run)
 
 	p_plot = sub.add_parser("plot", help="Plot a prior run")
 	p_plot.add_argument("--run", required=True, type=str)
 
+	p_render = sub.add_parser("render", help="Render figures for saved runs (e.g. after --no-plots)")
+	p_render.add_argument("--runs", required=True, nargs="+", type=str, help="Run directories holding timeseries.csv/.parquet")
+	p_render.add_argument("--jobs", type=int, default=1, help="Worker processes (0 = one per CPU)")
+	p_render.add_argument("--max-points", type=int, default=None, help="Points per series after LTTB decimation (0 = full resolution)")
+
 	p_sweep = sub.add_parser("sweep", help="Parameter sweep")
 	p_sweep.add_argument("--scenario", required=True, type=str)
 	p_sweep.add_argument("--out", required=True, type=str)
-	p_sweep.add_argument("--param", required=True, type=str, help="key=min:max:step e.g. production.uptime_fraction=0.7:0.95:0.05")
+	sweep_what = p_sweep.add_mutually_exclusive_group(required=True)
+	sweep_what.add_argument("--param", type=str, help="key=min:max:step e.g. production.uptime_fraction=0.7:0.95:0.05")
+	sweep_what.add_argument("--spec", type=str, help="Sweep-spec YAML declaring several parameters and a grid/lhs/sobol design")
+	p_sweep.add_argument("--engine", choices=ENGINES + ("batch",), default=None, help="Override the scenario's engine; 'batch' runs all values as one array computation and writes summaries only")
+	p_sweep.add_argument("--jobs", type=int, default=1, help="Worker processes for sweep values (0 = one per CPU)")
+	p_sweep.add_argument("--fork", action="store_true", help="Simulate the shared pre-launch prefix once and fork every value from it (loop engine)")
+	_add_output_args(p_sweep)
+	_add_cache_args(p_sweep)
+	_add_store_args(p_sweep)
+
+	p_solve = sub.add_parser("solve", help="Smallest lever values that meet the area target by a deadline (batch engine)")
+	p_solve.add_argument("--scenario", required=True, type=str)
+	p_solve.add_argument("--param", required=True, action="append", help="Dotted lever key; repeat to scale several levers together from their scenario values")
+	p_solve.add_argument("--deadline-years", required=True, type=float)
+	p_solve.add_argument("--range", type=str, default=None, help="min:max of the lever (one --param) or of the common scale factor (default 1e-6:1e3)")
+	p_solve.add_argument("--rtol", type=float, default=1e-3, help="Relative width of the final bracket")
+	p_solve.add_argument("--points", type=int, default=8, help="Values evaluated per search round, as one batch")
+	p_solve.add_argument("--out", type=str, default=None, help="Also write the result to OUT/solve.json")
+	_add_store_args(p_solve)
+
+	p_sens = sub.add_parser("sensitivity", help="Sobol sensitivity indices over a Saltelli design (batch engine)")
+	p_sens.add_argument("--scenario", required=True, type=str)
+	p_sens.add_argument("--spec", required=True, type=str, help="YAML with parameters (sweep-spec ranges), samples, metrics, bootstrap")
+	p_sens.add_argument("--out", required=True, type=str)
+	p_sens.add_argument("--jobs", type=int, default=1, help="Worker processes for design chunks (0 = one per CPU)")
+	_add_store_args(p_sens)
+
+	p_query = sub.add_parser("query", help="Select runs from the results store")
+	p_query.add_argument("where", nargs="?", default=None, help='SQL condition, e.g. "years_to_target < 20 and param.transport.fleet_power_MW > 500"')
+	p_query.add_argument("--store", type=str, default=None, help="Results store (default $DS_STORE_DIR or ~/.local/share/ds/store)")
+	p_query.add_argument("--columns", type=str, default=None, help="Comma-separated columns (default: all); run_id is always included")
+	p_query.add_argument("--order-by", type=str, default=None)
+	p_query.add_argument("--limit", type=int, default=None)
+	p_query.add_argument("--timeseries", type=str, default=None, help="Comma-separated timeseries columns of the matching runs to return instead")
+	p_query.add_argument("--out", type=str, default=None, help="Write .csv or .parquet instead of printing CSV")
+	p_query.add_argument("--list-columns", action="store_true", help="Print the queryable columns")
+
+	p_sur = sub.add_parser("surrogate", help="Gaussian-process emulator of sweep/MC results for instant what-if queries")
+	sur = p_sur.add_subparsers(dest="action", required=True)
+	p_fit = sur.add_parser("fit", help="Fit on a sweep results.csv or an mc_samples.csv")
+	p_fit.add_argument("--results", required=True, type=str)
+	p_fit.add_argument("--inputs", type=str, default=None, help="Comma-separated input columns (default: between the id column and years_to_target)")
+	p_fit.add_argument("--out", required=True, type=str, help="Model file (.npz)")
+	p_pred = sur.add_parser("predict", help="Predict outputs with 90% intervals")
+	p_pred.add_argument("--model", required=True, type=str)
+	p_pred.add_argument("--set", action="append", default=[], help="key=value of one query (repeat per input)")
+	p_pred.add_argument("--queries", type=str, default=None, help="CSV with one query per row")
+	p_sug = sur.add_parser("suggest", help="Write a sweep spec of the points where the emulator is least certain")
+	p_sug.add_argument("--model", required=True, type=str)
+	p_sug.add_argument("-n", type=int, default=8)
+	p_sug.add_argument("--out", required=True, type=str, help="Sweep-spec YAML (design: points)")
 
 	args = parser.parse_args()
 
+	if args.cmd in ("run", "sweep"):
+		from .config import load_yaml_config, make_rng, with_overrides
+		from .sim.outputs import parse_outputs
+		from .sim.runner import RunTask, run_tasks
+		from .sim.scenarios import build_scenario
+		from .sim.cache import CacheStats, RunCache, DEFAULT_MAX_BYTES, default_cache_dir
+		try:
+			outputs = parse_outputs(args.outputs, no_plots=args.no_plots)
+		except ValueError as e:
+			parser.error(str(e))
+		cache = None
+		if not args.no_cache:
+			max_bytes = int(args.cache_max_mb * 1024 ** 2) if args.cache_max_mb is not None else DEFAULT_MAX_BYTES
+			cache = RunCache(Path(args.cache_dir) if args.cache_dir else default_cache_dir(), max_bytes=max_bytes)
+		cache_stats = CacheStats()
+		store = _open_store(args)
+		# Printed after the main output (stderr for single runs) when non-empty
+		meta = {}
+		if cache is not None:
+			meta["cache"] = cache_stats.to_dict()
+
 	if args.cmd == "run":
+		from .sim.engine import run_simulation
+		from .sim.outputs import write_outputs
 		cfg = load_yaml_config(args.scenario)
-		if args.mc <= 1:
-			set_seed(cfg.get("seed", 0))
+		if args.engine:
+			cfg["engine"] = args.engine
+		if args.output_every:
+			cfg["output_every_days"] = args.output_every
+		if args.vintage_days:
+			cfg["vintage_snapshot_days"] = [int(d) for d in args.vintage_days.split(",") if d.strip()]
+		chunk_days = None
+		if args.stream or args.chunk_days:
+			from .sim.streaming import DEFAULT_CHUNK_DAYS
+			chunk_days = args.chunk_days or DEFAULT_CHUNK_DAYS
+		if chunk_days and (args.checkpoint_every or args.resume):
+			parser.error("--checkpoint-every/--resume cannot be combined with --stream")
+		if args.resume and args.mc > 1:
+			parser.error("--resume applies to a single run, not --mc replicates")
+		if args.mc > 1 and not args.mc_dirs:
+			from .sim.montecarlo import MonteCarloSpec, run_monte_carlo, write_monte_carlo
+			if chunk_days or args.checkpoint_every:
+				parser.error("--stream/--checkpoint-every apply to single runs or --mc-dirs")
+			scenario = build_scenario(cfg)
+			try:
+				spec = MonteCarloSpec.from_dict(cfg.get("monte_carlo"), seed=cfg.get("seed", 0), replicates=args.mc)
+				mc = run_monte_carlo(scenario, spec)
+			except ValueError as e:
+				parser.error(f"{e} (use --mc-dirs for per-replicate runs)")
+			write_monte_carlo(mc, Path(args.out))
+			if store:
+				meta["store_group"] = store.new_group("mc", cfg.get("name"), sys.argv[1:])
+				store.record_table(meta["store_group"], mc.samples, label="replicate", params=mc.summary["sampled"])
+			print(json.dumps(mc.summary, indent=2))
+			if meta:
+				print(json.dumps(meta), file=sys.stderr)
+		elif args.mc <= 1:
 			scenario = build_scenario(cfg)
-			results = run_simulation(scenario)
-			write_outputs(results, Path(args.out))
+			rng = make_rng(cfg.get("seed", 0))
+			if chunk_days:
+				from .sim.streaming import run_streaming
+				results = run_streaming(scenario, Path(args.out), rng=rng, outputs=outputs, chunk_days=chunk_days)
+			else:
+				from .sim.checkpoint import Checkpoint, CheckpointPolicy
+				resume = Checkpoint.load(args.resume) if args.resume else None
+				checkpoints = CheckpointPolicy(Path(args.out) / "checkpoints", every_days=args.checkpoint_every) if args.checkpoint_every else None
+				if cache is not None and resume is None and checkpoints is None:
+					results, cache_stats = cache.fetch(scenario, None, lambda: run_simulation(scenario, rng=rng))
+				else:
+					results = run_simulation(scenario, rng=rng, resume=resume, checkpoints=checkpoints)
+				write_outputs(results, Path(args.out), outputs)
+			if cache is not None:
+				meta["cache"] = cache_stats.to_dict()
+			if store:
+				from .sim.store import write_timeseries_part
+				group_id = meta["store_group"] = store.new_group("run", cfg.get("name"), sys.argv[1:])
+				# Streamed runs keep no timeseries in memory; they are indexed without one
+				if results.get("timeseries") is not None:
+					write_timeseries_part(results["timeseries"], store.timeseries_path(group_id, 0), store.run_id(group_id, 0))
+				store.record(group_id, [{"label": 0, "summary": results["summary"], "out_dir": args.out}])
 			print(json.dumps(results["summary"], indent=2))
+			if meta:
+				print(json.dumps(meta), file=sys.stderr)
 		else:
 			base = Path(args.out)
 			base.mkdir(parents=True, exist_ok=True)
-			summaries = []
-			for i in tqdm(range(args.mc), desc="MC runs"):
-				cfg_i = dict(cfg)
-				cfg_i["seed"] = int(cfg.get("seed", 0)) + i
-				set_seed(cfg_i["seed"])
-				scenario = build_scenario(cfg_i)
-				out_i = base / f"replicate_{i:03d}"
-				results = run_simulation(scenario)
-				write_outputs(results, out_i)
-				summaries.append(results["summary"]) 
-			print(json.dumps({"mc": args.mc, "summaries": summaries}, indent=2))
+			group_id = store.new_group("mc", cfg.get("name"), sys.argv[1:]) if store else None
+			parts = [(str(store.timeseries_path(group_id, i)), store.run_id(group_id, i)) if store and not chunk_days else None for i in range(args.mc)]
+			# Replicate i draws from stream i spawned from the scenario seed
+			tasks = [RunTask(cfg=with_overrides(cfg, {"replicate": i}), out_dir=str(base / f"replicate_{i:03d}"), stream=i, outputs=outputs, chunk_days=chunk_days, checkpoint_every=args.checkpoint_every,
+				cache=cache, store_part=parts[i]) for i in range(args.mc)]
+			summaries = run_tasks(tasks, jobs=args.jobs, desc="MC runs", stats=cache_stats)
+			out = {"mc": args.mc}
+			if store:
+				store.record(group_id, ({"label": i, "params": {"replicate": i}, "summary": s, "out_dir": t.out_dir} for i, (s, t) in enumerate(zip(summaries, tasks))))
+				out.update(store=str(store.root), store_group=group_id)
+			else:
+				out["summaries"] = summaries
+			print(json.dumps({**out, "cache": cache_stats.to_dict()}, indent=2))
+	elif args.cmd == "solve":
+		from .config import load_yaml_config
+		from .sim.scenarios import build_scenario
+		from .sim.solve import solve_minimum
+		from .sim.summary import flatten_summary
+		scale_range = tuple(map(float, args.range.split(":"))) if args.range else None
+		try:
+			result = solve_minimum(build_scenario(load_yaml_config(args.scenario)), args.param, args.deadline_years, scale_range, rtol=args.rtol, points=args.points)
+		except ValueError as e:
+			parser.error(str(e))
+		out = result.to_dict()
+		store = _open_store(args)
+		if store:
+			cfg = load_yaml_config(args.scenario)
+			out["store_group"] = store.new_group("solve", cfg.get("name"), sys.argv[1:])
+			metrics = {**flatten_summary(result.summary), "feasible": result.feasible, "binding": result.binding.get("binding"), "deadline_years": result.deadline_years}
+			store.record(out["store_group"], [{"label": 0, "params": result.values or {}, "metrics": metrics, "out_dir": args.out}])
+		if args.out:
+			Path(args.out).mkdir(parents=True, exist_ok=True)
+			with (Path(args.out) / "solve.json").open("w", encoding="utf-8") as f:
+				json.dump(out, f, indent=2)
+		print(json.dumps(out, indent=2))
+	elif args.cmd == "sensitivity":
+		from .config import load_yaml_config
+		from .sim.scenarios import build_scenario
+		from .sim.sensitivity import SensitivitySpec, run_sensitivity, write_sensitivity
+		try:
+			spec = SensitivitySpec.from_dict(load_yaml_config(args.spec))
+			results = run_sensitivity(build_scenario(load_yaml_config(args.scenario)), spec, jobs=args.jobs)
+		except ValueError as e:
+			parser.error(str(e))
+		write_sensitivity(results, Path(args.out))
+		out = {"points": len(results.evaluations["point_id"])}
+		store = _open_store(args)
+		if store:
+			out["store_group"] = store.new_group("sensitivity", load_yaml_config(args.scenario).get("name"), sys.argv[1:])
+			store.record_table(out["store_group"], results.evaluations, label="point_id", params=[p.key for p in spec.params])
+		# Undefined indices (a metric without variance) are NaN; JSON has no NaN, so write null
+		indices = [{k: None if isinstance(v, float) and not math.isfinite(v) else v for k, v in r.items()} for r in results.indices]
+		print(json.dumps({**out, "indices": indices}, indent=2, default=float))
+	elif args.cmd == "query":
+		from .sim.store import ResultsStore, default_store_dir
+		root = Path(args.store) if args.store else default_store_dir()
+		if not (root / "index.sqlite").exists():
+			parser.error(f"No results store at {root}")
+		store = ResultsStore(root)
+		if args.list_columns:
+			print("\n".join(store.columns()))
+			return
+		try:
+			table = store.query(args.where, columns=args.columns.split(",") if args.columns else None, order_by=args.order_by, limit=args.limit)
+		except ValueError as e:
+			parser.error(str(e))
+		if args.timeseries:
+			table = store.timeseries(table["run_id"].tolist(), columns=args.timeseries.split(","))
+			if table is None:
+				parser.error("No stored timeseries for the matching runs")
+		if args.out and args.out.endswith(".parquet"):
+			table.to_parquet(args.out, index=False)
+		elif args.out:
+			table.to_csv(args.out, index=False)
+		else:
+			print(table.to_csv(index=False), end="")
+	elif args.cmd == "surrogate":
+		import pandas as pd
+		from .sim.surrogate import Surrogate
+		if args.action == "fit":
+			model = Surrogate.fit(pd.read_csv(args.results), inputs=args.inputs.split(",") if args.inputs else None)
+			model.save(Path(args.out))
+			print(json.dumps({"inputs": list(model.inputs), "outputs": list(model.models), "n_train": model.n_train, "model": args.out}, indent=2))
+		elif args.action == "predict":
+			model = Surrogate.load(Path(args.model))
+			queries = pd.read_csv(args.queries).to_dict("records") if args.queries else [dict((k, float(v)) for k, v in (kv.split("=", 1) for kv in args.set))]
+			missing = [k for k in model.inputs if any(k not in q for q in queries)]
+			if missing:
+				parser.error(f"queries need values for {missing}")
+			print(json.dumps(model.predict(queries), indent=2))
+		else:
+			import yaml
+			model = Surrogate.load(Path(args.model))
+			points = model.suggest(args.n)
+			with open(args.out, "w", encoding="utf-8") as f:
+				yaml.safe_dump({"design": "points", "points": points}, f, sort_keys=False)
+			print(json.dumps({"points": len(points), "spec": args.out}, indent=2))
 	elif args.cmd == "plot":
+		from .sim.outputs import plot_run
 		plot_run(Path(args.run))
+	elif args.cmd == "render":
+		from .sim.render import render_runs, DEFAULT_MAX_POINTS
+		max_points = DEFAULT_MAX_POINTS if args.max_points is None else args.max_points
+		written = render_runs(args.runs, jobs=args.jobs, max_points=max_points)
+		print(json.dumps({"runs": len(written), "figures": sum(len(w) for w in written)}, indent=2))
 	elif args.cmd == "sweep":
 		cfg = load_yaml_config(args.scenario)
+		if args.spec:
+			from .sim.designs import SweepSpec
+			from .sim.sweeps import run_sweep_spec
+			spec = SweepSpec.from_dict(load_yaml_config(args.spec))
+			group_id = store.new_group("sweep", cfg.get("name"), sys.argv[1:]) if store else None
+			table = run_sweep_spec(cfg, spec, Path(args.out), engine=args.engine, jobs=args.jobs, outputs=outputs, fork=args.fork, cache=cache, stats=cache_stats, store=store, group_id=group_id)
+			out = {"design": spec.design, "parameters": [p.key for p in spec.params], "points": len(table), "table": str(Path(args.out) / "results.csv")}
+			if store:
+				out.update(store=str(store.root), store_group=group_id)
+			print(json.dumps({**out, "cache": cache_stats.to_dict()}, indent=2))
+			return
+		if args.engine:
+			cfg["engine"] = args.engine
 		key, rng = args.param.split("=")
 		min_v, max_v, step_v = map(float, rng.split(":"))
 		vals = []
@@ -63,22 +333,36 @@ def main() -> None:
 			v += step_v
 		base_out = Path(args.out)
 		base_out.mkdir(parents=True, exist_ok=True)
-		summaries = []
-		for val in vals:
-			d = cfg
-			# nested set by dotted key
-			keys = key.split(".")
-			target = d
-			for k in keys[:-1]:
-				target = target.setdefault(k, {})
-			target[keys[-1]] = val
-			set_seed(d.get("seed", 0))
-			scenario = build_scenario(d)
-			out_dir = base_out / f"{key.replace('.', '_')}_{val:.3f}"
-			results = run_simulation(scenario)
-			write_outputs(results, out_dir)
-			summaries.append(results["summary"]) 
-		print(json.dumps({"sweep_param": key, "values": vals, "summaries": summaries}, indent=2))
+		out_dirs = [base_out / f"{key.replace('.', '_')}_{val:.3f}" for val in vals]
+		group_id = store.new_group("sweep", cfg.get("name"), sys.argv[1:]) if store else None
+		if cfg.get("engine") == "batch":
+			from .sim.outputs import write_summary
+			from .sim.summary import parameter_report
+			from .sim.sweeps import batch_summaries
+			scenarios = [build_scenario(with_overrides(cfg, {key: val})) for val in vals]
+			summaries = batch_summaries(scenarios)
+			for out_dir, summary, scenario in zip(out_dirs, summaries, scenarios):
+				write_summary(summary, parameter_report(scenario), out_dir)
+		else:
+			from .sim.sweeps import shares_trajectory
+			cfgs = [with_overrides(cfg, {key: val}) for val in vals]
+			reuse = shares_trajectory([build_scenario(c) for c in cfgs])
+			resume = None
+			if args.fork and not reuse:
+				from .sim.sweeps import prefix_checkpoint
+				if cfg.get("engine", "loop") != "loop":
+					parser.error("--fork needs the loop engine")
+				resume = str(prefix_checkpoint(cfg, cfgs, base_out / "prefix_checkpoint.npz"))
+			parts = [(str(store.timeseries_path(group_id, i)), store.run_id(group_id, i)) if store else None for i in range(len(cfgs))]
+			tasks = [RunTask(cfg=c, out_dir=str(out_dir), outputs=outputs, resume=resume, reuse_trajectory=reuse, cache=cache, store_part=part) for c, out_dir, part in zip(cfgs, out_dirs, parts)]
+			summaries = run_tasks(tasks, jobs=args.jobs, desc="Sweep", stats=cache_stats)
+		out = {"sweep_param": key, "values": vals}
+		if store:
+			store.record(group_id, ({"label": i, "params": {key: val}, "summary": s, "out_dir": d} for i, (val, s, d) in enumerate(zip(vals, summaries, out_dirs))))
+			out.update(store=str(store.root), store_group=group_id)
+		else:
+			out["summaries"] = summaries
+		print(json.dumps({**out, "cache": cache_stats.to_dict()}, indent=2))
 
 if __name__ == "__main__":
 	main()
@@ -1,9 +1,9 @@
 from __future__ import annotations
+import copy
 import yaml
-import random
 import numpy as np
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Mapping
 
 
 def load_yaml_config(path: str | Path) -> Dict[str, Any]:
@@ -13,6 +13,47 @@ def load_yaml_config(path: str | Path) -> Dict[str, Any]:
 	return cfg
 
 
-def set_seed(seed: int) -> None:
-	random.seed(seed)
-	np.random.seed(seed)
+def make_rng(seed: int, stream: int | None = None) -> np.random.Generator:
+	"""Independent RNG for one run.
+
+	`stream` selects the child spawned from `seed` (e.g. an MC replicate index),
+	so every worker gets the same stream whether runs execute serially or in a
+	process pool. No global RNG state is touched.
+	"""
+	seq = np.random.SeedSequence(int(seed)) if stream is None else np.random.SeedSequence(int(seed), spawn_key=(int(stream),))
+	return np.random.default_rng(seq)
+
+
+def set_dotted(cfg: Dict[str, Any], key: str, value: Any) -> None:
+	"""Nested set by dotted key, creating intermediate sections as needed."""
+	keys = key.split(".")
+	target = cfg
+	for k in keys[:-1]:
+		target = target.setdefault(k, {})
+	target[keys[-1]] = value
+
+
+def with_overrides(cfg: Dict[str, Any], overrides: Mapping[str, Any]) -> Dict[str, Any]:
+	"""Deep copy of `cfg` with dotted-key overrides applied; `cfg` itself is left untouched."""
+	out = copy.deepcopy(cfg)
+	for key, value in overrides.items():
+		set_dotted(out, key, value)
+	return out
+
+
+def shared_overrides(cfg: Dict[str, Any], overrides: Mapping[str, Any]) -> Dict[str, Any]:
+	"""Like `with_overrides`, but only the dicts along each dotted key are copied.
+
+	Untouched sections stay shared with `cfg`, so variants are cheap to make
+	in bulk; treat the result as read-only.
+	"""
+	out = dict(cfg)
+	for key, value in overrides.items():
+		keys = key.split(".")
+		target = out
+		for k in keys[:-1]:
+			child = target.get(k)
+			target[k] = dict(child) if isinstance(child, Mapping) else {}
+			target = target[k]
+		target[keys[-1]] = value
+	return out
@@ -1,7 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any
-from .manufacturing import Line, build_lines_from_config
+from typing import Dict, Tuple, TYPE_CHECKING
+import numpy as np
+from .flows import ENERGY, LAUNCH_PRODUCTS
+from .reliability import UnitPool
+
+if TYPE_CHECKING:
+	from ..sim.plan import ScenarioPlan, LinePlan
+
+
+# Mutable build-out state; everything else on a Factory comes from the plan
+FACTORY_STATE = ("elapsed_days", "growth_multiplier", "resource_used_kg", "md_progress_days", "num_mass_drivers")
 
 
 @dataclass
@@ -13,48 +22,67 @@ class ReplicationCfg:
 
 
 class Factory:
-	def __init__(self, nodes_cfg: Dict[str, Any], replication_cfg: Dict[str, Any], *, max_growth_multiplier: float | None = None, resource_limit_kg: float | None = None, collector_areal_density_kg_m2: float = 0.15):
-		self.lines: Dict[str, Line] = build_lines_from_config(nodes_cfg)
+	def __init__(self, plan: ScenarioPlan, reliability: UnitPool | None = None):
+		self.lines: Tuple[LinePlan, ...] = plan.lines
+		self.flows = plan.flows
+		# Stochastic mode: per-day up fractions replace the lines' steady-state availability
+		self.reliability = reliability
+		self._availability = np.array(plan.flow_availability)
+		pooled = [(i, reliability.names.index(n)) for i, n in enumerate(self.flows.names) if reliability is not None and n in reliability.names]
+		self._flow_pooled = np.array([i for i, _ in pooled], dtype=int)
+		self._pool_index = np.array([k for _, k in pooled], dtype=int)
+		# Expected mode: the flow solve at unit daily factor, scaled every day
+		self._unit_output = plan.unit_output()
+		self.md_availability: float = 1.0
 		self.rep_cfg = ReplicationCfg(
-			factory_kit_mass_kg=float(replication_cfg["factory_kit_mass_kg"]),
-			replication_factor=float(replication_cfg["replication_factor"]),
-			replication_cycle_days=float(replication_cfg["replication_cycle_days"]),
+			factory_kit_mass_kg=plan.factory_kit_mass_kg,
+			replication_factor=plan.replication_factor,
+			replication_cycle_days=plan.replication_cycle_days,
 		)
 		self.elapsed_days: float = 0.0
 		self.growth_multiplier: float = 1.0
-		self.max_growth_multiplier: float = float(max_growth_multiplier) if (max_growth_multiplier is not None and max_growth_multiplier > 0) else float("inf")
+		self.max_growth_multiplier: float = plan.max_growth_multiplier
 		# Resource constraint (usable in-situ mass)
-		self.resource_limit_kg: float | None = float(resource_limit_kg) if (resource_limit_kg is not None and resource_limit_kg >= 0) else None
+		self.resource_limit_kg: float | None = plan.resource_limit_kg if (plan.resource_limit_kg is not None and plan.resource_limit_kg >= 0) else None
 		self.resource_used_kg: float = 0.0
-		self.collector_areal_density_kg_m2: float = float(collector_areal_density_kg_m2)
+		self.collector_areal_density_kg_m2: float = plan.collector_areal_density_kg_m2
 		# Launch infrastructure build-out
-		md_cfg = nodes_cfg.get("mass_driver_build", {})
-		self.md_duration_days: float = float(md_cfg.get("duration_days", 120.0))
+		self.md_duration_days: float = plan.md_duration_days
 		self.md_progress_days: float = 0.0
 		self.num_mass_drivers: int = 0
 
+	def snapshot(self) -> Dict[str, float]:
+		state = {k: getattr(self, k) for k in FACTORY_STATE}
+		if self.reliability is not None:
+			state["reliability"] = self.reliability.snapshot()
+			state["md_availability"] = self.md_availability
+		return state
+
+	def restore(self, state: Dict[str, float]) -> None:
+		for k in FACTORY_STATE:
+			setattr(self, k, state[k])
+		self.num_mass_drivers = int(self.num_mass_drivers)
+		if self.reliability is not None:
+			if "reliability" not in state:
+				raise ValueError("Checkpoint has no stochastic reliability state")
+			self.reliability.restore(state["reliability"])
+			self.md_availability = state["md_availability"]
+
 	def tick_day(self, uptime_fraction: float, learning_b: float) -> Dict[str, float]:
 		self.elapsed_days += 1.0
 		learning_factor = (self.elapsed_days ** (1.0 - learning_b)) if learning_b > 0 else 1.0
-		outputs: Dict[str, float] = {"ore_kg": 0.0, "refined_kg": 0.0, "pv_m2": 0.0, "structure_kg": 0.0}
-		energy_kWh_total = 0.0
-		for name, line in self.lines.items():
-			th = line.effective_throughput(uptime_fraction, learning_factor) * self.growth_multiplier
-			# Approximate energy consumption scaled by same factors as throughput
-			avail = line.reliability.availability() if line.reliability else 1.0
-			energy_kWh_total += line.kW * 24.0 * uptime_fraction * learning_factor * avail * self.growth_multiplier
-			if name == "regolith_mining":
-				outputs["ore_kg"] += th
-			elif name == "beneficiation":
-				outputs["refined_kg"] += min(th, outputs["ore_kg"]) * 0.75
-			elif name == "smelter":
-				outputs["refined_kg"] += min(th, outputs["refined_kg"]) * 0.2
-			elif name == "pv_line":
-				outputs["pv_m2"] += th
-			elif name == "reflector_line":
-				outputs["pv_m2"] += th * 0.5
-			elif name == "structure_line":
-				outputs["structure_kg"] += th
+		unit = self._unit_output
+		if self.reliability is not None:
+			up = self.reliability.step(self.reliability.fleet_units(self.growth_multiplier, self.num_mass_drivers))
+			if self.reliability.is_mass_driver.any():
+				self.md_availability = float(up[-1])
+			avail = self._availability.copy()
+			avail[self._flow_pooled] = up[self._pool_index]
+			unit = self.flows.unit_output(avail, LAUNCH_PRODUCTS)
+		# Every line's throughput and (approximate) energy draw scale with the same daily factor
+		scale = uptime_fraction * learning_factor * self.growth_multiplier
+		outputs: Dict[str, float] = {k: v * scale for k, v in unit.items()}
+		energy_kWh_total = outputs.pop(ENERGY)
 		# Apply resource cap on outputs (based on usable mass remaining)
 		pv_mass_kg = outputs["pv_m2"] * self.collector_areal_density_kg_m2
 		total_mass_needed_kg = pv_mass_kg + outputs["structure_kg"]
@@ -0,0 +1,176 @@
+"""Material flow through the factory graph of `factories.json`.
+
+Nodes are production lines. A node with a `product` adds `product_yield`
+(default 1) units of it per unit of throughput. An edge `[a, b]` only orders
+the graph. An edge `[a, b, c]` makes `b` consume `c` units of `a`'s product
+per unit of its own throughput. Producers of a product always run before its
+consumers. Consumers of one product within a topological generation share the
+available supply in proportion to their demand. Later generations get what is
+left.
+
+`FlowNetwork` compiles the graph once (networkx) into arrays: capacities,
+yield matrix `Y` (nodes x products) and, per generation with consumers, its
+consumption matrix. Solving a day is a few array operations per such stage,
+over any leading axes (days, replicates). The solution scales linearly with
+the common daily factor (uptime x learning x growth). With steady-state
+availability, `unit_output` is therefore solved once per plan and every day
+is a multiplication.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Sequence, Tuple
+import networkx as nx
+import numpy as np
+
+# Products every solve reports, produced or not (the launch model reads them)
+LAUNCH_PRODUCTS = ("pv_m2", "structure_kg")
+ENERGY = "energy_kWh"
+
+
+@dataclass(frozen=True)
+class FlowNetwork:
+	# Nodes in topological order with their throughput per day and power draw
+	names: Tuple[str, ...]
+	throughput: Tuple[float, ...]
+	kW: Tuple[float, ...]
+	products: Tuple[str, ...]
+	# Per node: (product index, yield) or None
+	outputs: Tuple[Tuple[int, float] | None, ...]
+	# Per node: ((product index, units per unit throughput), ...)
+	inputs: Tuple[Tuple[Tuple[int, float], ...], ...]
+	# Derived arrays (not part of equality or hashing)
+	Y: np.ndarray = field(init=False, repr=False, compare=False)
+	stages: Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray], ...] = field(init=False, repr=False, compare=False)
+	_free: np.ndarray = field(init=False, repr=False, compare=False)
+	_stage_count: Dict[Tuple[str, ...], int] = field(init=False, repr=False, compare=False)
+
+	def __post_init__(self) -> None:
+		n, P = len(self.names), len(self.products)
+		Y = np.zeros((n, P))
+		for i, out in enumerate(self.outputs):
+			if out is not None:
+				Y[i, out[0]] = out[1]
+		C = np.zeros((n, P))
+		for i, ins in enumerate(self.inputs):
+			for p, c in ins:
+				C[i, p] = c
+		# Consumers grouped by topological generation: (node indices, their C rows, their Y rows)
+		stages = []
+		for gen in _generations(self.names, self.outputs, self.inputs):
+			idx = np.array([i for i in gen if self.inputs[i]], dtype=int)
+			if len(idx):
+				stages.append((idx, C[idx], Y[idx]))
+		free = np.ones(n, dtype=bool)
+		for idx, _, _ in stages:
+			free[idx] = False
+		object.__setattr__(self, "Y", Y)
+		object.__setattr__(self, "stages", tuple(stages))
+		object.__setattr__(self, "_free", free)
+		object.__setattr__(self, "_stage_count", {})
+
+	def stages_for(self, products: Tuple[str, ...]) -> int:
+		"""How many leading stages the flows of `products` depend on (0 when only unconstrained nodes make them)."""
+		if products not in self._stage_count:
+			pidx = {self.products.index(p) for p in products}
+			needed = {i for i, out in enumerate(self.outputs) if out is not None and out[0] in pidx}
+			todo = list(needed)
+			while todo:
+				i = todo.pop()
+				for p, _ in self.inputs[i]:
+					for j, out in enumerate(self.outputs):
+						if out is not None and out[0] == p and j not in needed:
+							needed.add(j)
+							todo.append(j)
+			last = [k for k, (idx, _, _) in enumerate(self.stages) if needed & set(idx.tolist())]
+			self._stage_count[products] = last[-1] + 1 if last else 0
+		return self._stage_count[products]
+
+	@classmethod
+	def from_config(cls, nodes: Dict[str, Dict[str, Any]], edges: Sequence[Sequence[Any]], throughput: Dict[str, float]) -> "FlowNetwork":
+		"""Compile `factories.json` nodes and edges; `throughput` maps node name to units per day."""
+		graph = nx.DiGraph()
+		graph.add_nodes_from(nodes)
+		consumes: Dict[str, Dict[str, float]] = {n: {} for n in nodes}
+		for edge in edges:
+			a, b = edge[0], edge[1]
+			if a not in nodes or b not in nodes:
+				raise ValueError(f"Factory edge {a!r} -> {b!r} names an unknown node")
+			graph.add_edge(a, b)
+			if len(edge) > 2:
+				product = nodes[a].get("product")
+				if product is None:
+					raise ValueError(f"Factory edge {a!r} -> {b!r} consumes from a node without a product")
+				c = float(edge[2])
+				if c < 0 or consumes[b].get(product, c) != c:
+					raise ValueError(f"Factory node {b!r} needs one non-negative rate for {product!r}")
+				consumes[b][product] = c
+		products = sorted({cfg["product"] for cfg in nodes.values() if cfg.get("product")} | set(LAUNCH_PRODUCTS))
+		producers = {p: [n for n, cfg in nodes.items() if cfg.get("product") == p] for p in products}
+		for b, ins in consumes.items():
+			for p in ins:
+				graph.add_edges_from((a, b) for a in producers[p] if a != b)
+		if not nx.is_directed_acyclic_graph(graph):
+			raise ValueError(f"Factory graph has a cycle: {nx.find_cycle(graph)}")
+		order = list(nx.lexicographical_topological_sort(graph, key=list(nodes).index))
+		pidx = {p: k for k, p in enumerate(products)}
+		return cls(
+			names=tuple(order),
+			throughput=tuple(float(throughput.get(n, 0.0)) for n in order),
+			kW=tuple(float(nodes[n].get("kW", 0.0)) for n in order),
+			products=tuple(products),
+			outputs=tuple((pidx[nodes[n]["product"]], float(nodes[n].get("product_yield", 1.0))) if nodes[n].get("product") else None for n in order),
+			inputs=tuple(tuple((pidx[p], c) for p, c in sorted(consumes[n].items()) if c > 0) for n in order),
+		)
+
+	def solve(self, capacity: np.ndarray, stages: int | None = None) -> np.ndarray:
+		"""Flow of every node (`(..., nodes)`) given its capacity for the day.
+
+		With `stages`, only the first that many consumer stages are solved;
+		later consumers keep their capacity as flow.
+		"""
+		flow = np.array(capacity, dtype=float)
+		run = self.stages if stages is None else self.stages[:stages]
+		if not run:
+			return flow
+		supply = (flow * self._free) @ self.Y
+		for idx, C, Y in run:
+			cap = flow[..., idx]
+			demand = cap @ C
+			ratio = np.divide(supply, demand, out=np.ones_like(demand), where=demand > 0)
+			limit = np.where(C > 0, np.minimum(ratio, 1.0)[..., None, :], np.inf).min(axis=-1)
+			f = cap * limit
+			flow[..., idx] = f
+			supply = supply - f @ C + f @ Y
+		return flow
+
+	def output(self, availability: np.ndarray, products: Tuple[str, ...] | None = None) -> Dict[str, np.ndarray]:
+		"""Gross production and energy at unit daily factor, for per-node `availability` (`(..., nodes)`).
+
+		`products` limits the result (and the stages solved) to those products.
+		"""
+		availability = np.asarray(availability, dtype=float)
+		products = self.products if products is None else products
+		flow = self.solve(availability * np.asarray(self.throughput), self.stages_for(products))
+		made = flow @ self.Y
+		out = {p: made[..., self.products.index(p)] for p in products}
+		out[ENERGY] = availability @ (24.0 * np.asarray(self.kW))
+		return out
+
+	def unit_output(self, availability: Sequence[float], products: Tuple[str, ...] | None = None) -> Dict[str, float]:
+		"""`output` as plain floats for one availability vector."""
+		return {k: float(v) for k, v in self.output(np.asarray(availability, dtype=float), products).items()}
+
+	def index(self, names: Sequence[str]) -> np.ndarray:
+		"""Positions of `names` in the network's node order."""
+		pos = {n: i for i, n in enumerate(self.names)}
+		return np.array([pos[n] for n in names], dtype=int)
+
+
+def _generations(names: Sequence[str], outputs, inputs) -> List[List[int]]:
+	"""Node indices by topological generation of the consumption graph (producers before consumers)."""
+	graph = nx.DiGraph()
+	graph.add_nodes_from(range(len(names)))
+	for b, ins in enumerate(inputs):
+		for p, _ in ins:
+			graph.add_edges_from((a, b) for a, out in enumerate(outputs) if out is not None and out[0] == p and a != b)
+	return [sorted(gen) for gen in nx.topological_generations(graph)]
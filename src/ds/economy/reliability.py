@@ -1,5 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Dict, List, Sequence, TYPE_CHECKING
+import math
+import numpy as np
+
+if TYPE_CHECKING:
+	from ..sim.plan import ScenarioPlan
+
+# Unit type name of the launch rails in a `UnitPool`
+MASS_DRIVER = "mercury_mass_driver"
+# Larger fleets are tracked as a representative sample of this many units
+MAX_TRACKED_UNITS = 2 ** 50
 
 
 @dataclass
@@ -7,7 +18,102 @@ class Reliability:
 	mtbf_h: float
 	mttr_h: float
 
-	def availability(self) -> float:
+	def availability(self, failure_rate_scale: float = 1.0) -> float:
 		if self.mtbf_h <= 0:
 			return 0.0
-		return self.mtbf_h / (self.mtbf_h + self.mttr_h)
+		return self.mtbf_h / (self.mtbf_h + failure_rate_scale * self.mttr_h)
+
+
+def transition_probabilities(mtbf_h: float, mttr_h: float, failure_rate_scale: float = 1.0, dt_h: float = 24.0) -> tuple[float, float]:
+	"""(P(up -> down), P(down -> up)) over `dt_h` hours for exponential failures and repairs.
+
+	Exact for the two-state continuous-time process, so the long-run up
+	fraction is the steady-state availability with the scaled failure rate.
+	"""
+	if mtbf_h <= 0:
+		return 1.0, 0.0
+	if mttr_h <= 0:
+		return 0.0, 1.0
+	lam = failure_rate_scale / mtbf_h
+	mu = 1.0 / mttr_h
+	settled = -math.expm1(-(lam + mu) * dt_h)
+	return lam / (lam + mu) * settled, mu / (lam + mu) * settled
+
+
+class UnitPool:
+	"""Counts of units up and in repair per unit type, advanced one day at a time.
+
+	Each day, failures among the units up and repairs among the units down
+	are binomial draws per type (one NumPy call for all of them), so a step
+	costs O(types) whatever the fleet size. New units join up; a shrinking
+	fleet loses units pro rata.
+	"""
+
+	def __init__(self, names: Sequence[str], mtbf_h: Sequence[float], mttr_h: Sequence[float], failure_rate_scale: float, rng: np.random.Generator):
+		self.names = tuple(names)
+		probs = [transition_probabilities(f, r, failure_rate_scale) for f, r in zip(mtbf_h, mttr_h)]
+		# Row 0: P(up -> down) of the units up; row 1: P(down -> up) of the units in repair
+		self.p_switch = np.array([[p for p, _ in probs], [q for _, q in probs]], dtype=float).reshape(2, len(probs))
+		self.is_mass_driver = np.array([n == MASS_DRIVER for n in self.names], dtype=bool)
+		self.counts = np.zeros((2, len(self.names)), dtype=np.int64)
+		self.rng = rng
+
+	@property
+	def up(self) -> np.ndarray:
+		return self.counts[0]
+
+	@property
+	def down(self) -> np.ndarray:
+		return self.counts[1]
+
+	@classmethod
+	def for_plan(cls, plan: ScenarioPlan, rng: np.random.Generator) -> "UnitPool | None":
+		"""Pool of the plan's lines with MTBF/MTTR plus the mass drivers; None unless `reliability_mode` is "stochastic"."""
+		if plan.reliability_mode != "stochastic":
+			return None
+		types = [(l.name, l.mtbf_h, l.mttr_h) for l in plan.lines if l.mtbf_h is not None]
+		if plan.md_mtbf_h is not None:
+			types.append((MASS_DRIVER, plan.md_mtbf_h, plan.md_mttr_h))
+		return cls([t[0] for t in types], [t[1] for t in types], [t[2] for t in types], plan.failure_rate_scale, rng)
+
+	def fleet_units(self, growth_multiplier, mass_drivers) -> np.ndarray:
+		"""Unit counts per type: one line per unit of growth multiplier, and the mass drivers built.
+
+		Scalars give a `(types,)` array; `(days,)` arrays give `(days, types)`.
+		"""
+		lines = np.maximum(1.0, np.rint(np.asarray(growth_multiplier, dtype=float)))[..., None]
+		return np.where(self.is_mass_driver, np.asarray(mass_drivers, dtype=float)[..., None], lines)
+
+	def step(self, units: np.ndarray) -> np.ndarray:
+		"""Resize to `units` per type, draw one day of failures and repairs; returns the up fraction per type."""
+		return self._advance(np.minimum(units, MAX_TRACKED_UNITS).astype(np.int64))
+
+	def _advance(self, units: np.ndarray) -> np.ndarray:
+		counts = self.counts
+		up, down = counts
+		total = up + down
+		shrink = units < total
+		if shrink.any():
+			down[shrink] = down[shrink] * units[shrink] // total[shrink]
+			up[shrink] = units[shrink] - down[shrink]
+			total = up + down
+		up += units - total
+		failed, repaired = self.rng.binomial(counts, self.p_switch)
+		moved = repaired - failed
+		up += moved
+		down -= moved
+		return np.divide(up, units, out=np.ones(len(units)), where=units > 0)
+
+	def step_days(self, units: np.ndarray) -> np.ndarray:
+		"""`step` over the rows of a `(days, types)` unit array; returns `(days, types)` up fractions."""
+		units = np.minimum(units, MAX_TRACKED_UNITS).astype(np.int64)
+		out = np.empty(units.shape, dtype=float)
+		for d in range(len(units)):
+			out[d] = self._advance(units[d])
+		return out
+
+	def snapshot(self) -> Dict[str, List[int]]:
+		return {"up": self.up.tolist(), "down": self.down.tolist()}
+
+	def restore(self, state: Dict[str, List[int]]) -> None:
+		self.counts = np.array([state["up"], state["down"]], dtype=np.int64).reshape(2, len(self.names))
@@ -13,9 +13,12 @@ class LaunchSystem:
 	muzzle_delta_v_m_s: float
 	reliability: Reliability | None = None
 
-	def cadence_per_day(self) -> float:
-		base = max(1.0, 86400.0 / self.cooldown_s)
-		avail = self.reliability.availability() if self.reliability else 1.0
+	def base_cadence_per_day(self) -> float:
+		return max(1.0, 86400.0 / self.cooldown_s)
+
+	def cadence_per_day(self, failure_rate_scale: float = 1.0) -> float:
+		base = self.base_cadence_per_day()
+		avail = self.reliability.availability(failure_rate_scale) if self.reliability else 1.0
 		return base * avail
 
 
@@ -0,0 +1,3 @@
+# Import-light constants shared with the CLI parser (no NumPy/pandas here)
+ENGINES = ("loop", "vectorized", "adaptive")
+OUTPUT_KINDS = ("csv", "parquet", "summary", "plots")
@@ -0,0 +1,281 @@
+"""Batched multi-scenario engine.
+
+Stacks N built scenarios that share a horizon into `(N, days)` arrays and
+advances factory growth, launch and transport caps, band OD and power for all
+of them at once. Per-band areas are carried as weights on the cumulative
+transported area (band i holds w_i of it), so the per-day state is independent
+of the number of bands. Results agree with the loop engine to
+`ds.sim.vectorized.RTOL`.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterator, List, Sequence, Tuple
+import numpy as np
+from ..economy.flows import ENERGY
+from .vectorized import growth_multiplier_series
+from .plan import compile_scenario
+from .recorder import TIMESERIES_COLUMNS
+from .summary import summarize, parameter_report
+from .vintage import fleet_factor
+
+# Upper bound on N * days per block; keeps each (block, days) array around 16 MB
+DEFAULT_MAX_ELEMENTS = 1 << 21
+
+# Headline metrics of `batch_outcomes`
+OUTCOMES = ("years_to_target", "total_area_m2", "delivered_power_GW_at_1AU_equiv", "energy_kWh_total", "transport_MWh_total", "resource_remaining_kg")
+
+CUBE_COLUMNS = (
+	"phase", "pv_m2", "structure_kg", "launched_m2", "cum_area_m2", "optical_depth", "power_GW_1AU_equiv",
+	"mass_drivers_online", "energy_kWh", "resource_remaining_kg", "used_mass_kg_day", "transport_MW_used", "transport_MWh",
+)
+
+
+@dataclass
+class BatchResults:
+	summaries: List[Dict[str, Any]]
+	parameters: List[Dict[str, Any]]
+	# Column name -> (N, days) array; "band_area_m2" is (N, days, max band columns), zero padded (radial grids have none)
+	timeseries: Dict[str, np.ndarray] | None = None
+	days: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=int))
+
+
+def scenario_params(scenario: Dict[str, Any], scale_availability: bool = False) -> Dict[str, Any]:
+	"""Per-scenario scalars of the daily model, taken from the compiled plan (see `compile_scenario`)."""
+	plan = compile_scenario(scenario, scale_availability)
+	if plan.reliability_mode != "expected":
+		raise ValueError("The batch engine uses steady-state availability; run stochastic reliability with the loop or vectorized engine")
+	unit = plan.unit_output()
+	return {
+		"horizon_days": plan.horizon_days,
+		"uptime": plan.uptime,
+		"learning_b": plan.learning_b,
+		"growth_key": (plan.replication_factor, plan.replication_cycle_days, plan.max_growth_multiplier),
+		"c_pv": unit["pv_m2"],
+		"c_structure": unit["structure_kg"],
+		"c_energy": unit[ENERGY],
+		"areal_density": plan.collector_areal_density_kg_m2,
+		"resource_limit": plan.resource_limit_kg if plan.resource_limit_kg is not None else np.inf,
+		"md_duration": plan.md_duration_days,
+		"launch_day": plan.launch_day,
+		"cadence_single": plan.launch_cadence_per_day,
+		"cadence_cap": plan.cadence_cap,
+		"package_area": plan.package_area_m2,
+		"transport_cap": plan.transport_cap_m2_per_day,
+		"area_per_MW": plan.area_per_MW_per_day,
+		"band_means": list(plan.band_means),
+		"band_weights": np.array(plan.band_weights),
+		"band_columns": plan.band_columns,
+		"irr_weighted": plan.irradiance_weighted,
+		"od_factor": plan.od_factor,
+		"od_cap": plan.od_cap,
+		"base_eff": plan.base_eff_1au,
+		"pv_efficiency_sigma": plan.pv_efficiency_sigma,
+		"yield_sigma": plan.yield_sigma,
+		"degradation": plan.degradation,
+		"eff_scale": plan.thermal_derate * plan.beaming_chain,
+		"target": plan.target_area_m2,
+		"phase0_days": plan.phase0_days,
+		"phase1_days": plan.phase1_days,
+	}
+
+
+def _per_unique(values: np.ndarray, fn) -> np.ndarray:
+	"""Evaluate a row-wise series only once per distinct parameter value (sweeps repeat values)."""
+	uniq, inverse = np.unique(values, return_inverse=True)
+	return np.stack([fn(float(v)) for v in uniq])[inverse.ravel()]
+
+
+def _simulate_block(params: List[Dict[str, Any]], H_days: int, full: bool) -> Dict[str, np.ndarray]:
+	"""Advance a block of scenarios over the horizon.
+
+	Always returns the cumulative area, the `(n, days)` PV efficiency and the
+	reductions the summaries need; with `full=True` also every `CUBE_COLUMNS` series.
+	"""
+	def col(key: str) -> np.ndarray:
+		return np.array([p[key] for p in params], dtype=float)[:, None]
+
+	n = len(params)
+	days = np.arange(H_days)
+	elapsed = days + 1.0
+	learning_factor = _per_unique(col("learning_b")[:, 0], lambda b: np.power(elapsed, 1.0 - b) if b > 0 else np.ones(H_days))
+	# Growth depends only on replication settings; evaluate once per distinct setting
+	g_used = np.empty((n, H_days))
+	md_progress = np.empty((n, H_days))
+	g_final = np.empty(n)
+	groups: Dict[Any, List[int]] = {}
+	for i, p in enumerate(params):
+		groups.setdefault(p["growth_key"], []).append(i)
+	for (factor, cycle, cap), rows in groups.items():
+		used, after = growth_multiplier_series(elapsed, factor, cycle, cap)
+		g_used[rows] = used
+		md_progress[rows] = np.cumsum(after)
+		g_final[rows] = after[-1]
+	# All line outputs share the per-day scale uptime * learning * growth
+	scale = col("uptime") * learning_factor
+	scale *= g_used
+	del g_used, learning_factor
+	pv = col("c_pv") * scale
+	# Resource cap per scenario: only rows whose total demand exceeds the limit need the daily check
+	mass_per_scale = col("c_pv") * col("areal_density") + col("c_structure")
+	limit = col("resource_limit")
+	scale_sum = scale.sum(axis=1, keepdims=True)
+	# Energy follows line activity and is not reduced by the resource cap
+	energy_scale_sum = scale_sum
+	energy_scale = scale if full else None
+	exhaust_day = np.full(n, H_days)
+	hit_rows = np.flatnonzero((scale_sum * mass_per_scale)[:, 0] > limit[:, 0] - 1e-9)
+	if len(hit_rows):
+		used = scale[hit_rows] * mass_per_scale[hit_rows]
+		used_cum = np.cumsum(used, axis=1)
+		remaining_before = np.maximum(0.0, limit[hit_rows] - (used_cum - used))
+		exceed = used > remaining_before + 1e-9
+		j = np.argmax(exceed, axis=1)
+		has = exceed.any(axis=1)
+		factor = np.ones((len(hit_rows), H_days))
+		factor[has[:, None] & (days[None, :] > j[:, None])] = 0.0
+		k = np.flatnonzero(has)
+		used_j = used[k, j[k]]
+		factor[k, j[k]] = np.where(used_j > 0, remaining_before[k, j[k]] / np.where(used_j > 0, used_j, 1.0), 0.0)
+		if full:
+			energy_scale = scale.copy()
+		scale[hit_rows] *= factor
+		pv[hit_rows] *= factor
+		scale_sum = scale.sum(axis=1, keepdims=True)
+		exhaust_day[hit_rows[has]] = j[has]
+	num_md = np.floor(md_progress / col("md_duration"))
+	del md_progress
+	# Launch and transport caps
+	launched = np.minimum(col("cadence_single") * num_md, col("cadence_cap"))
+	launched *= col("package_area")
+	gate = days[None, :] >= col("launch_day")
+	np.minimum(np.where(gate, pv, 0.0), launched, out=launched)
+	transported = np.minimum(launched, col("transport_cap"))
+	cum_area = np.cumsum(transported, axis=1)
+	apm = col("area_per_MW")
+	per_MW = np.where(apm > 0, 1.0 / np.where(apm > 0, apm, 1.0), 0.0)
+	# Vintage fleet efficiency, one recurrence per distinct collector mix
+	eff_now = np.empty((n, H_days))
+	mixes: Dict[Any, List[int]] = {}
+	for i, p in enumerate(params):
+		mixes.setdefault(p["degradation"], []).append(i)
+	for degradation, rows in mixes.items():
+		eff_now[rows] = fleet_factor(transported[rows], cum_area[rows], degradation)[0]
+	eff_now *= col("base_eff")
+	out = {
+		"cum_area_m2": cum_area,
+		"eff_now": eff_now[:, -1],
+		"eff_now_series": eff_now,
+		"growth_multiplier": g_final,
+		"final_power_GW": cum_area[:, -1] * col("irr_weighted")[:, 0] * (eff_now[:, -1] * col("eff_scale")[:, 0]) * 1e-9,
+		"energy_kWh_total": (col("c_energy") * energy_scale_sum)[:, 0],
+		"structure_kg_total": (col("c_structure") * scale_sum)[:, 0],
+		"used_mass_kg_total": (mass_per_scale * scale_sum)[:, 0],
+		"transport_MWh_total": transported.sum(axis=1) * per_MW[:, 0] * 24.0,
+		"resource_remaining_kg_final": np.where(exhaust_day < H_days, 0.0, np.maximum(0.0, limit - mass_per_scale * scale_sum)[:, 0]),
+	}
+	if full:
+		transport_MW_used = transported * per_MW
+		remaining = np.maximum(0.0, limit - np.cumsum(scale * mass_per_scale, axis=1))
+		remaining[days[None, :] >= exhaust_day[:, None]] = 0.0
+		out.update({
+			"phase": np.where(days[None, :] < col("phase0_days"), 0, np.where(days[None, :] < col("phase0_days") + col("phase1_days"), 1, 2)),
+			"pv_m2": pv,
+			"structure_kg": col("c_structure") * scale,
+			"launched_m2": launched,
+			"optical_depth": np.minimum(cum_area * col("od_factor"), col("od_cap")),
+			"power_GW_1AU_equiv": cum_area * col("irr_weighted") * (eff_now * col("eff_scale")) * 1e-9,
+			"mass_drivers_online": num_md,
+			"energy_kWh": col("c_energy") * energy_scale,
+			"resource_remaining_kg": np.where(np.isfinite(limit), remaining, np.nan),
+			"used_mass_kg_day": scale * mass_per_scale,
+			"transport_MW_used": transport_MW_used,
+			"transport_MWh": transport_MW_used * 24.0,
+		})
+	return out
+
+
+def simulate_blocks(params: List[Dict[str, Any]], H_days: int, full: bool = False, max_elements: int = DEFAULT_MAX_ELEMENTS) -> Iterator[Tuple[int, List[Dict[str, Any]], Dict[str, np.ndarray]]]:
+	"""`(start, params chunk, block results)` over `scenario_params` dicts in blocks of at most `max_elements` cells."""
+	block = max(1, max_elements // H_days)
+	for start in range(0, len(params), block):
+		chunk = params[start:start + block]
+		yield start, chunk, _simulate_block(chunk, H_days, full)
+
+
+def batch_outcomes(params: List[Dict[str, Any]], max_elements: int = DEFAULT_MAX_ELEMENTS) -> Dict[str, np.ndarray]:
+	"""`OUTCOMES` of `scenario_params` dicts sharing a horizon as `(N,)` arrays, without building summaries.
+
+	`years_to_target` is inf where the target is never met and
+	`resource_remaining_kg` is nan without a resource limit.
+	"""
+	if len({p["horizon_days"] for p in params}) > 1:
+		raise ValueError("batch_outcomes needs scenarios with one shared horizon_years")
+	out = {m: np.empty(len(params)) for m in OUTCOMES}
+	for start, chunk, res in simulate_blocks(params, params[0]["horizon_days"], max_elements=max_elements):
+		sl = slice(start, start + len(chunk))
+		cum_area = res["cum_area_m2"]
+		met = cum_area >= np.array([p["target"] for p in chunk])[:, None]
+		out["years_to_target"][sl] = np.where(met.any(axis=1), np.argmax(met, axis=1) / 365.0, np.inf)
+		out["total_area_m2"][sl] = cum_area[:, -1]
+		out["delivered_power_GW_at_1AU_equiv"][sl] = res["final_power_GW"]
+		out["energy_kWh_total"][sl] = res["energy_kWh_total"]
+		out["transport_MWh_total"][sl] = res["transport_MWh_total"]
+		out["resource_remaining_kg"][sl] = np.where(np.isfinite([p["resource_limit"] for p in chunk]), res["resource_remaining_kg_final"], np.nan)
+	return out
+
+
+def run_batch(scenarios: Sequence[Dict[str, Any]], timeseries: bool = False, max_elements: int = DEFAULT_MAX_ELEMENTS) -> BatchResults:
+	"""Simulate built scenarios sharing `horizon_years` as one array computation.
+
+	Returns per-scenario summaries and parameter reports in input order; with
+	`timeseries=True` also the stacked `(N, days)` cube of daily columns.
+	"""
+	if not scenarios:
+		return BatchResults(summaries=[], parameters=[])
+	params = [scenario_params(s) for s in scenarios]
+	horizons = {p["horizon_days"] // 365 for p in params}
+	if len(horizons) != 1:
+		raise ValueError(f"run_batch needs scenarios with one shared horizon_years, got {sorted(horizons)}")
+	H_days = params[0]["horizon_days"]
+	n = len(params)
+	max_bands = max(p["band_columns"] for p in params)
+	cube: Dict[str, np.ndarray] | None = None
+	if timeseries:
+		# Same column dtypes as the loop engine's recorder (e.g. integer phase)
+		dtypes = dict(TIMESERIES_COLUMNS)
+		cube = {c: np.empty((n, H_days), dtype=dtypes.get(c, np.float64)) for c in CUBE_COLUMNS}
+		cube["band_area_m2"] = np.zeros((n, H_days, max_bands))
+	summaries: List[Dict[str, Any]] = []
+	for start, chunk, res in simulate_blocks(params, H_days, full=cube is not None, max_elements=max_elements):
+		cum_area = res["cum_area_m2"]
+		met = cum_area >= np.array([p["target"] for p in chunk])[:, None]
+		met_any = met.any(axis=1)
+		met_day = np.argmax(met, axis=1)
+		for k, p in enumerate(chunk):
+			i = start + k
+			limited = np.isfinite(p["resource_limit"])
+			totals = {
+				"day_target_met": int(met_day[k]) if met_any[k] else None,
+				"final_area_m2": float(cum_area[k, -1]),
+				"final_power_GW": float(res["final_power_GW"][k]),
+				"energy_kWh": float(res["energy_kWh_total"][k]),
+				"transport_MWh": float(res["transport_MWh_total"][k]),
+				"used_mass_kg": float(res["used_mass_kg_total"][k]),
+				"structure_kg": float(res["structure_kg_total"][k]),
+				"resource_remaining_kg": float(res["resource_remaining_kg_final"][k]) if limited else None,
+			}
+			bands_final = (p["band_weights"] * cum_area[k, -1]).tolist()
+			summaries.append(summarize(scenarios[i], totals, bands_final, p["band_means"], float(res["eff_now"][k]), float(res["growth_multiplier"][k])))
+		if cube is not None:
+			sl = slice(start, start + len(chunk))
+			for c in CUBE_COLUMNS:
+				cube[c][sl] = res[c]
+			for k, p in enumerate(chunk):
+				w = p["band_weights"][:p["band_columns"]]
+				cube["band_area_m2"][start + k, :, :len(w)] = cum_area[k][:, None] * w[None, :]
+	return BatchResults(
+		summaries=summaries,
+		parameters=[parameter_report(s) for s in scenarios],
+		timeseries=cube,
+		days=np.arange(H_days),
+	)
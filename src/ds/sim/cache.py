@@ -0,0 +1,148 @@
+"""Content-addressed cache of full run results.
+
+A run's key is the SHA-256 of three things: the canonical JSON of its built
+scenario (the base data sections included), its RNG stream and
+`engine_version()`. That version digests the package version and every
+module's source, so a code change starts a fresh keyspace instead of serving
+stale results. Entries are pickled `run_simulation` results stored under
+`root/<key[:2]>/<key>.pkl`. A hit refreshes the entry's mtime. `put` writes
+atomically, so concurrent workers never see a partial entry. It then evicts
+the least recently used entries until the cache fits `max_bytes`.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+from typing import Callable, Dict, Any, Tuple
+import json
+import os
+import pickle
+import tempfile
+import numpy as np
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+
+
+def default_cache_dir() -> Path:
+	"""`$DS_CACHE_DIR`, else `~/.cache/ds/runs`."""
+	env = os.environ.get("DS_CACHE_DIR")
+	return Path(env) if env else Path.home() / ".cache" / "ds" / "runs"
+
+
+@lru_cache(maxsize=None)
+def engine_version() -> str:
+	"""Package version plus a digest of its sources."""
+	from .. import __version__
+	h = sha256(__version__.encode())
+	for path in sorted(PACKAGE_DIR.rglob("*.py")):
+		h.update(path.relative_to(PACKAGE_DIR).as_posix().encode())
+		h.update(path.read_bytes())
+	return f"{__version__}+{h.hexdigest()[:12]}"
+
+
+def _canonical(obj: Any) -> Any:
+	if isinstance(obj, np.ndarray):
+		return obj.tolist()
+	if isinstance(obj, np.generic):
+		return obj.item()
+	if isinstance(obj, (set, frozenset)):
+		return sorted(obj, key=repr)
+	return f"{type(obj).__name__}:{obj!r}"
+
+
+def run_key(scenario: Dict[str, Any], stream: int | None = None) -> str:
+	"""Cache key of a built scenario run on RNG `stream` (None = the seed's root stream)."""
+	payload = {"scenario": scenario, "stream": stream, "engine": engine_version()}
+	text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_canonical)
+	return sha256(text.encode()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+	hits: int = 0
+	misses: int = 0
+	evictions: int = 0
+
+	def add(self, other: "CacheStats") -> None:
+		self.hits += other.hits
+		self.misses += other.misses
+		self.evictions += other.evictions
+
+	def to_dict(self) -> Dict[str, int]:
+		return asdict(self)
+
+
+@dataclass(frozen=True)
+class RunCache:
+	"""On-disk LRU store of run results; cheap to pickle into worker processes."""
+	root: Path
+	max_bytes: int = DEFAULT_MAX_BYTES
+
+	def path(self, key: str) -> Path:
+		return self.root / key[:2] / f"{key}.pkl"
+
+	def get(self, key: str) -> Dict[str, Any] | None:
+		path = self.path(key)
+		try:
+			with path.open("rb") as f:
+				results = pickle.load(f)
+		except FileNotFoundError:
+			return None
+		except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+			# Unreadable entry (e.g. from an interrupted copy): drop it and recompute
+			path.unlink(missing_ok=True)
+			return None
+		os.utime(path)
+		return results
+
+	def put(self, key: str, results: Dict[str, Any]) -> int:
+		"""Store `results`; returns the number of entries evicted to stay within `max_bytes`."""
+		path = self.path(key)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+		try:
+			with os.fdopen(fd, "wb") as f:
+				pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+			os.replace(tmp, path)
+		except BaseException:
+			Path(tmp).unlink(missing_ok=True)
+			raise
+		return self.evict()
+
+	def entries(self) -> list:
+		"""(mtime, size, path) of every entry, least recently used first."""
+		out = []
+		for path in self.root.glob("*/*.pkl"):
+			try:
+				st = path.stat()
+			except FileNotFoundError:
+				continue
+			out.append((st.st_mtime, st.st_size, path))
+		return sorted(out)
+
+	def evict(self) -> int:
+		entries = self.entries()
+		total = sum(size for _, size, _ in entries)
+		evicted = 0
+		for _, size, path in entries:
+			if total <= self.max_bytes:
+				break
+			path.unlink(missing_ok=True)
+			total -= size
+			evicted += 1
+		return evicted
+
+	def clear(self) -> None:
+		for _, _, path in self.entries():
+			path.unlink(missing_ok=True)
+
+	def fetch(self, scenario: Dict[str, Any], stream: int | None, compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], CacheStats]:
+		"""Cached results of the run, or `compute()` stored under its key."""
+		key = run_key(scenario, stream)
+		results = self.get(key)
+		if results is not None:
+			return results, CacheStats(hits=1)
+		results = compute()
+		return results, CacheStats(misses=1, evictions=self.put(key, results))
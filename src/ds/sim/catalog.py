@@ -0,0 +1,99 @@
+"""Process-wide cache of the base data files (bodies, collectors, factories, ...).
+
+Each file is parsed once per process and re-read only when its mtime
+changes. Callers get read-only views that every scenario shares; copying a
+view (`copy.deepcopy`, or `with_overrides`) gives plain mutable containers,
+so nothing can corrupt another scenario's data. Pool workers receive the
+parent's loaded entries through `install` instead of parsing the files again.
+"""
+from __future__ import annotations
+import copy
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+
+def _readonly(self, *args, **kwargs):
+	raise TypeError("Catalog data is read-only; copy.deepcopy() it to modify")
+
+
+class FrozenDict(dict):
+	__setitem__ = __delitem__ = __ior__ = _readonly
+	clear = pop = popitem = setdefault = update = _readonly
+
+	def __reduce__(self):
+		return (FrozenDict, (dict(self),))
+
+	def __copy__(self) -> Dict[str, Any]:
+		return dict(self)
+
+	def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+		return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+
+class FrozenList(list):
+	__setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+	append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+	def __reduce__(self):
+		return (FrozenList, (list(self),))
+
+	def __copy__(self) -> list:
+		return list(self)
+
+	def __deepcopy__(self, memo: Dict[int, Any]) -> list:
+		return [copy.deepcopy(v, memo) for v in self]
+
+
+def freeze(obj: Any) -> Any:
+	"""Recursively wrap parsed JSON in read-only containers."""
+	if isinstance(obj, dict):
+		return FrozenDict({k: freeze(v) for k, v in obj.items()})
+	if isinstance(obj, list):
+		return FrozenList(freeze(v) for v in obj)
+	return obj
+
+
+class DataCatalog:
+	"""Parsed JSON files keyed by resolved path, invalidated by mtime."""
+
+	def __init__(self):
+		self._entries: Dict[str, Tuple[int, FrozenDict]] = {}
+		self._resolved: Dict[str, str] = {}
+		self.hits = 0
+		self.misses = 0
+
+	def load(self, path: str | Path) -> FrozenDict:
+		raw = str(path)
+		key = self._resolved.get(raw)
+		if key is None:
+			key = self._resolved[raw] = str(Path(raw).resolve())
+		mtime = os.stat(key).st_mtime_ns
+		entry = self._entries.get(key)
+		if entry is not None and entry[0] == mtime:
+			self.hits += 1
+			return entry[1]
+		self.misses += 1
+		with open(key, "r", encoding="utf-8") as f:
+			data = freeze(json.load(f))
+		self._entries[key] = (mtime, data)
+		return data
+
+	def snapshot(self) -> Dict[str, Tuple[int, FrozenDict]]:
+		return dict(self._entries)
+
+	def install(self, entries: Dict[str, Tuple[int, FrozenDict]]) -> None:
+		"""Adopt entries loaded elsewhere (e.g. by the parent of a pool worker)."""
+		self._entries.update(entries)
+
+	def clear(self) -> None:
+		self._entries.clear()
+		self.hits = self.misses = 0
+
+
+CATALOG = DataCatalog()
+
+
+def load_data(path: str | Path) -> FrozenDict:
+	return CATALOG.load(path)
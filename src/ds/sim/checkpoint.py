@@ -0,0 +1,122 @@
+"""Checkpoints of a loop-engine run at a day boundary.
+
+A `Checkpoint` holds everything the day loop carries forward: the factory
+build-out state, per-band deployed area, the RNG state, the event log and
+the timeseries rows recorded so far. It is saved as one `.npz` file (arrays
+plus a JSON "meta" entry; no pickles) and resumed with
+`run_simulation(scenario, resume=checkpoint)`.
+
+Resuming with a different scenario forks the run. Fields that shaped the
+build-out before the checkpoint (`PREFIX_FIELDS`) must be unchanged; launch,
+transport, band and efficiency settings may differ and apply from the
+checkpoint day on. A checkpoint at `plan.launch_day` comes before the first
+launch, so a fork from it matches a from-scratch run of the variant.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+import json
+import numpy as np
+from .events import EventLog
+from .plan import ScenarioPlan
+
+# Plan fields that determine the factory build-out (and so every day before launch)
+PREFIX_FIELDS = (
+	"phase0_days", "phase1_days", "uptime", "learning_b", "lines", "flows", "factory_kit_mass_kg",
+	"replication_factor", "replication_cycle_days", "max_growth_multiplier", "md_duration_days",
+	"resource_limit_kg", "collector_areal_density_kg_m2", "reliability_mode", "failure_rate_scale",
+)
+
+
+def prefix_of(plan: ScenarioPlan) -> Dict[str, Any]:
+	"""JSON-normalised values of `PREFIX_FIELDS` for fork compatibility checks."""
+	values = {k: getattr(plan, k) for k in PREFIX_FIELDS}
+	values["lines"] = [asdict(l) for l in plan.lines]
+	f = plan.flows
+	values["flows"] = {"names": f.names, "products": f.products, "outputs": f.outputs, "inputs": f.inputs}
+	return json.loads(json.dumps(values))
+
+
+@dataclass(frozen=True)
+class CheckpointPolicy:
+	"""When a run writes checkpoints: every `every_days` days and/or at `at_days`."""
+	out_dir: Path
+	every_days: int | None = None
+	at_days: Tuple[int, ...] = ()
+
+	def days(self, horizon_days: int) -> set:
+		"""Day boundaries (first day still to simulate) that get a checkpoint."""
+		if self.every_days is not None and self.every_days < 1:
+			raise ValueError("every_days must be >= 1")
+		days = set(range(self.every_days, horizon_days + 1, self.every_days)) if self.every_days else set()
+		return days | {d for d in self.at_days if 0 < d <= horizon_days}
+
+	def path(self, day: int) -> Path:
+		return self.out_dir / f"checkpoint_day{day:06d}.npz"
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+	"""Loop state before simulating `day` (days `0 .. day-1` are done)."""
+	day: int
+	scenario_name: str
+	prefix: Dict[str, Any]
+	factory: Dict[str, float]
+	cum_area_bands: List[float]
+	eff_now: float
+	rng_state: Dict[str, Any]
+	# Timeseries rows [0, day): columns plus `(bands, day)` band blocks
+	columns: Dict[str, np.ndarray]
+	band_area: np.ndarray
+	band_od: np.ndarray
+	events: Dict[str, np.ndarray]
+	systems: List[str] = field(default_factory=list)
+	# Vintage sums of the degrading collector types and the degradation rates they were built with
+	retained: List[float] = field(default_factory=list)
+	retained_rates: List[float] = field(default_factory=list)
+
+	def event_log(self) -> EventLog:
+		"""A fresh, independently growable copy of the checkpointed events."""
+		return EventLog.from_arrays(self.events, self.systems)
+
+	def check_fork(self, plan: ScenarioPlan) -> None:
+		"""Raise ValueError if `plan` cannot continue from this checkpoint."""
+		if plan.horizon_days < self.day:
+			raise ValueError(f"Checkpoint is at day {self.day}, past the {plan.horizon_days}-day horizon")
+		new = prefix_of(plan)
+		# Checkpoints written before a field joined the prefix do not constrain it
+		changed = [k for k in PREFIX_FIELDS if k in self.prefix and new[k] != self.prefix[k]]
+		if changed:
+			raise ValueError(f"Cannot fork from day {self.day}: {changed} shaped the run before the checkpoint")
+		if len(plan.band_means) != len(self.cum_area_bands) and any(self.cum_area_bands):
+			raise ValueError(f"Cannot fork from day {self.day}: band count changed after area was deployed")
+
+	def save(self, path: Path) -> Path:
+		path.parent.mkdir(parents=True, exist_ok=True)
+		meta = {
+			"day": self.day,
+			"scenario_name": self.scenario_name,
+			"prefix": self.prefix,
+			"factory": self.factory,
+			"cum_area_bands": self.cum_area_bands,
+			"eff_now": self.eff_now,
+			"rng_state": self.rng_state,
+			"systems": self.systems,
+			"retained": self.retained,
+			"retained_rates": self.retained_rates,
+		}
+		arrays = {f"ts_{k}": v for k, v in self.columns.items()}
+		arrays.update({f"ev_{k}": v for k, v in self.events.items()})
+		with path.open("wb") as f:
+			np.savez_compressed(f, meta=np.array(json.dumps(meta)), band_area=self.band_area, band_od=self.band_od, **arrays)
+		return path
+
+	@classmethod
+	def load(cls, path: str | Path) -> "Checkpoint":
+		with np.load(path, allow_pickle=False) as z:
+			meta = json.loads(str(z["meta"]))
+			columns = {k[3:]: z[k] for k in z.files if k.startswith("ts_")}
+			events = {k[3:]: z[k] for k in z.files if k.startswith("ev_")}
+			band_area, band_od = z["band_area"], z["band_od"]
+		return cls(columns=columns, band_area=band_area, band_od=band_od, events=events, **meta)
@@ -0,0 +1,186 @@
+"""Sampling designs for multi-parameter sweeps: full grid, Latin hypercube, Sobol sequences and explicit point lists."""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Any, List, Sequence
+import itertools
+import numpy as np
+
+DESIGNS = ("grid", "lhs", "sobol", "points")
+
+# Primitive polynomial degree s, coefficients a and initial direction numbers m_i
+# for Sobol dimensions 2..21 (Joe & Kuo, new-joe-kuo-6.21201)
+_SOBOL_DIRECTIONS = [
+	(1, 0, (1,)),
+	(2, 1, (1, 3)),
+	(3, 1, (1, 3, 1)),
+	(3, 2, (1, 1, 1)),
+	(4, 1, (1, 1, 3, 3)),
+	(4, 4, (1, 3, 5, 13)),
+	(5, 2, (1, 1, 5, 5, 17)),
+	(5, 4, (1, 1, 5, 5, 5)),
+	(5, 7, (1, 1, 7, 11, 19)),
+	(5, 11, (1, 1, 5, 1, 1)),
+	(5, 13, (1, 1, 1, 3, 11)),
+	(5, 14, (1, 3, 5, 5, 31)),
+	(6, 1, (1, 3, 3, 9, 7, 49)),
+	(6, 13, (1, 1, 1, 15, 21, 21)),
+	(6, 16, (1, 3, 1, 13, 27, 49)),
+	(6, 19, (1, 1, 1, 15, 7, 5)),
+	(6, 22, (1, 3, 1, 15, 13, 25)),
+	(6, 25, (1, 1, 5, 5, 19, 61)),
+	(7, 1, (1, 3, 7, 11, 23, 15, 103)),
+	(7, 4, (1, 3, 7, 13, 13, 15, 69)),
+]
+SOBOL_MAX_DIMS = len(_SOBOL_DIRECTIONS) + 1
+_SOBOL_BITS = 32
+
+
+def _sobol_direction_numbers(d: int) -> np.ndarray:
+	L = _SOBOL_BITS
+	V = np.zeros((d, L + 1), dtype=np.uint64)
+	V[0, 1:] = [1 << (L - i) for i in range(1, L + 1)]
+	for j in range(1, d):
+		s, a, m = _SOBOL_DIRECTIONS[j - 1]
+		v = [0] * (L + 1)
+		for i in range(1, min(s, L) + 1):
+			v[i] = m[i - 1] << (L - i)
+		for i in range(s + 1, L + 1):
+			v[i] = v[i - s] ^ (v[i - s] >> s)
+			for k in range(1, s):
+				v[i] ^= ((a >> (s - 1 - k)) & 1) * v[i - k]
+		V[j] = v
+	return V
+
+
+def sobol(n: int, d: int, skip: int = 0) -> np.ndarray:
+	"""First `n` points (after `skip`) of the d-dimensional Sobol sequence in [0, 1)^d."""
+	if not 1 <= d <= SOBOL_MAX_DIMS:
+		raise ValueError(f"Sobol design supports 1..{SOBOL_MAX_DIMS} dimensions, got {d}")
+	if n + skip >= 1 << _SOBOL_BITS:
+		raise ValueError("Too many Sobol points requested")
+	V = _sobol_direction_numbers(d)
+	idx = np.arange(skip, skip + n, dtype=np.uint64)
+	# Gray-code form: point i is the XOR of direction numbers over the set bits of gray(i)
+	gray = idx ^ (idx >> np.uint64(1))
+	X = np.zeros((n, d), dtype=np.uint64)
+	for b in range(_SOBOL_BITS):
+		bit = ((gray >> np.uint64(b)) & np.uint64(1)).astype(bool)
+		if bit.any():
+			X[bit] ^= V[:, b + 1]
+	return X.astype(float) / float(1 << _SOBOL_BITS)
+
+
+def latin_hypercube(n: int, d: int, rng: np.random.Generator) -> np.ndarray:
+	"""Random Latin hypercube: each dimension has exactly one point per 1/n stratum."""
+	u = rng.random((n, d))
+	perms = np.argsort(rng.random((n, d)), axis=0)
+	return (perms + u) / n
+
+
+@dataclass(frozen=True)
+class ParamSpec:
+	key: str
+	min: float | None = None
+	max: float | None = None
+	step: float | None = None
+	num: int | None = None
+	values: tuple | None = None
+	log: bool = False
+
+	@classmethod
+	def from_dict(cls, key: str, d: Any) -> "ParamSpec":
+		if isinstance(d, list):
+			return cls(key=key, values=tuple(d))
+		if not isinstance(d, dict):
+			raise ValueError(f"Sweep parameter {key!r}: expected a mapping or a list of values")
+		if "values" in d:
+			return cls(key=key, values=tuple(d["values"]))
+		if "min" not in d or "max" not in d:
+			raise ValueError(f"Sweep parameter {key!r}: needs 'values' or 'min'/'max'")
+		spec = cls(
+			key=key,
+			min=float(d["min"]),
+			max=float(d["max"]),
+			step=float(d["step"]) if "step" in d else None,
+			num=int(d["num"]) if "num" in d else None,
+			log=str(d.get("scale", "linear")) == "log",
+		)
+		if spec.max < spec.min:
+			raise ValueError(f"Sweep parameter {key!r}: max < min")
+		if spec.log and spec.min <= 0:
+			raise ValueError(f"Sweep parameter {key!r}: log scale needs min > 0")
+		return spec
+
+	def grid_values(self) -> List[Any]:
+		if self.values is not None:
+			return list(self.values)
+		if self.step is not None:
+			vals = []
+			v = self.min
+			while v <= self.max + 1e-12:
+				vals.append(v)
+				v += self.step
+			return vals
+		return self.from_unit(np.linspace(0.0, 1.0, self.num or 5)).tolist()
+
+	def from_unit(self, u: np.ndarray) -> np.ndarray:
+		"""Map unit-interval samples onto the parameter range."""
+		if self.values is not None:
+			idx = np.minimum((u * len(self.values)).astype(int), len(self.values) - 1)
+			return np.asarray(self.values, dtype=object)[idx]
+		if self.log:
+			lo, hi = np.log(self.min), np.log(self.max)
+			return np.exp(lo + u * (hi - lo))
+		return self.min + u * (self.max - self.min)
+
+
+@dataclass(frozen=True)
+class SweepSpec:
+	design: str
+	params: Sequence[ParamSpec]
+	samples: int = 0
+	seed: int = 0
+	engine: str | None = None
+	# Explicit dotted-key override dicts of the "points" design (e.g. `ds.sim.surrogate` suggestions)
+	points: tuple = ()
+
+	@classmethod
+	def from_dict(cls, d: Dict[str, Any]) -> "SweepSpec":
+		design = str(d.get("design", "grid"))
+		if design not in DESIGNS:
+			raise ValueError(f"Unknown sweep design {design!r}; expected one of {DESIGNS}")
+		if design == "points":
+			points = d.get("points")
+			if not isinstance(points, list) or not points or not all(isinstance(p, dict) for p in points):
+				raise ValueError("Design 'points' needs a non-empty 'points' list of dotted-key mappings")
+			keys = list(dict.fromkeys(k for p in points for k in p))
+			params = [ParamSpec(key=k, values=tuple(dict.fromkeys(p[k] for p in points if k in p))) for k in keys]
+			return cls(design=design, params=params, samples=len(points), engine=d.get("engine"), points=tuple(dict(p) for p in points))
+		params_cfg = d.get("parameters")
+		if not isinstance(params_cfg, dict) or not params_cfg:
+			raise ValueError("Sweep spec needs a non-empty 'parameters' mapping of dotted keys")
+		params = [ParamSpec.from_dict(k, v) for k, v in params_cfg.items()]
+		samples = int(d.get("samples", 0))
+		if design != "grid" and samples <= 0:
+			raise ValueError(f"Design {design!r} needs 'samples' > 0")
+		return cls(design=design, params=params, samples=samples, seed=int(d.get("seed", 0)), engine=d.get("engine"))
+
+
+def generate_points(spec: SweepSpec) -> List[Dict[str, Any]]:
+	"""Design points as dotted-key override dicts (may contain duplicates)."""
+	if spec.design == "points":
+		return [dict(p) for p in spec.points]
+	keys = [p.key for p in spec.params]
+	if spec.design == "grid":
+		return [dict(zip(keys, combo)) for combo in itertools.product(*(p.grid_values() for p in spec.params))]
+	d = len(spec.params)
+	if spec.design == "lhs":
+		u = latin_hypercube(spec.samples, d, np.random.default_rng(spec.seed))
+	else:
+		u = sobol(spec.samples, d)
+	cols = [p.from_unit(u[:, j]) for j, p in enumerate(spec.params)]
+	return [{k: _plain(cols[j][i]) for j, k in enumerate(keys)} for i in range(spec.samples)]
+
+
+def _plain(v: Any) -> Any:
+	return v.item() if isinstance(v, np.generic) else v
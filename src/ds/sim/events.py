@@ -0,0 +1,224 @@
+"""Compact columnar event log.
+
+Events are kept per kind in typed, growable NumPy columns instead of one
+dict per event. Event types and launch-system names are interned to small
+integer codes. Infrastructure records repeat the mass-driver count every
+`INFRASTRUCTURE_PERIOD_DAYS` days, so runs of an unchanged count are stored
+run-length encoded as (first day, last day, count). Counts are float64:
+uncapped replication grows them past the int64 range.
+
+`EventLog.query` selects one kind over a half-open day range as arrays;
+`to_frame` rebuilds the long event table (one row per event, engine order)
+only for writing.
+"""
+from __future__ import annotations
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+EVENT_TYPES = ("launch", "infrastructure")
+LAUNCH, INFRASTRUCTURE = 0, 1
+# Infrastructure state is recorded on days divisible by this period
+INFRASTRUCTURE_PERIOD_DAYS = 7
+# Columns of the long event table written to events.csv / events.parquet
+EVENT_COLUMNS = ("day", "type", "area_m2", "system", "mass_drivers_online")
+
+
+class _Columns:
+	"""Named typed columns sharing a row count; capacity doubles when full."""
+
+	def __init__(self, spec: Sequence[Tuple[str, type]], capacity: int):
+		capacity = max(1, capacity)
+		self.data: Dict[str, np.ndarray] = {name: np.empty(capacity, dtype=dtype) for name, dtype in spec}
+		self.rows = 0
+
+	def _reserve(self, n: int) -> None:
+		cap = len(next(iter(self.data.values())))
+		if n <= cap:
+			return
+		cap = max(n, 2 * cap)
+		for name, a in self.data.items():
+			grown = np.empty(cap, dtype=a.dtype)
+			grown[:self.rows] = a[:self.rows]
+			self.data[name] = grown
+
+	def append(self, *values) -> None:
+		r = self.rows
+		self._reserve(r + 1)
+		for a, v in zip(self.data.values(), values):
+			a[r] = v
+		self.rows = r + 1
+
+	def extend(self, **arrays: np.ndarray) -> None:
+		n = len(next(iter(arrays.values())))
+		r = self.rows
+		self._reserve(r + n)
+		for name, a in self.data.items():
+			a[r:r + n] = arrays[name]
+		self.rows = r + n
+
+	def __getitem__(self, name: str) -> np.ndarray:
+		return self.data[name][:self.rows]
+
+	def nbytes(self) -> int:
+		return sum(a.nbytes for a in self.data.values())
+
+
+def _day_mask(days: np.ndarray, start: int | None, stop: int | None) -> np.ndarray | slice:
+	if start is None and stop is None:
+		return slice(None)
+	mask = np.ones(len(days), dtype=bool)
+	if start is not None:
+		mask &= days >= start
+	if stop is not None:
+		mask &= days < stop
+	return mask
+
+
+class EventLog:
+	"""Launch and infrastructure events of one run (or one streamed chunk).
+
+	Launches are stored one row each (day, area, interned system code).
+	Infrastructure records are stored as runs; `len()` and every query count
+	them expanded, one per recorded day, as the engines emit them.
+	"""
+
+	def __init__(self, capacity: int = 1024):
+		self.systems: List[str] = []
+		self._system_codes: Dict[str, int] = {}
+		self.launches = _Columns((("day", np.int64), ("area_m2", np.float64), ("system", np.int16)), capacity)
+		self.infrastructure_runs = _Columns((("first_day", np.int64), ("last_day", np.int64), ("mass_drivers_online", np.float64)), capacity // 16)
+
+	def intern(self, system: str) -> int:
+		"""Integer code of a launch-system name (`self.systems[code]` decodes it)."""
+		code = self._system_codes.get(system)
+		if code is None:
+			code = self._system_codes[system] = len(self.systems)
+			self.systems.append(system)
+		return code
+
+	def launch(self, day: int, area_m2: float, system: str) -> None:
+		self.launches.append(day, area_m2, self.intern(system))
+
+	def infrastructure(self, day: int, mass_drivers_online: float) -> None:
+		runs = self.infrastructure_runs
+		r = runs.rows - 1
+		if r >= 0:
+			last = runs.data["last_day"]
+			if runs.data["mass_drivers_online"][r] == mass_drivers_online and day - last[r] == INFRASTRUCTURE_PERIOD_DAYS:
+				last[r] = day
+				return
+		runs.append(day, day, mass_drivers_online)
+
+	def extend_launches(self, days: np.ndarray, area_m2: np.ndarray, system: str) -> None:
+		if len(days):
+			self.launches.extend(day=days, area_m2=area_m2, system=np.full(len(days), self.intern(system), dtype=np.int16))
+
+	def extend_infrastructure(self, days: np.ndarray, mass_drivers_online: np.ndarray) -> None:
+		"""Bulk `infrastructure` for ascending record days; run-length encodes in one pass."""
+		days = np.asarray(days, dtype=np.int64)
+		md = np.asarray(mass_drivers_online, dtype=np.float64)
+		if not len(days):
+			return
+		starts = np.ones(len(days), dtype=bool)
+		starts[1:] = (md[1:] != md[:-1]) | (np.diff(days) != INFRASTRUCTURE_PERIOD_DAYS)
+		runs = self.infrastructure_runs
+		r = runs.rows - 1
+		if r >= 0 and runs.data["mass_drivers_online"][r] == md[0] and days[0] - runs.data["last_day"][r] == INFRASTRUCTURE_PERIOD_DAYS:
+			# Leading block continues the previous run
+			starts[0] = False
+		first = np.flatnonzero(starts)
+		if not starts[0]:
+			runs.data["last_day"][r] = days[(first[0] if len(first) else len(days)) - 1]
+		if len(first):
+			last = np.append(first[1:] - 1, len(days) - 1)
+			runs.extend(first_day=days[first], last_day=days[last], mass_drivers_online=md[first])
+
+	def clear(self) -> None:
+		"""Drop all events, keeping buffers and interned names (reused per streamed chunk)."""
+		self.launches.rows = 0
+		self.infrastructure_runs.rows = 0
+
+	def arrays(self) -> Dict[str, np.ndarray]:
+		"""Copies of the stored columns, keyed "launch_<col>" / "runs_<col>" (see `from_arrays`)."""
+		out = {f"launch_{k}": self.launches[k].copy() for k in self.launches.data}
+		out.update({f"runs_{k}": self.infrastructure_runs[k].copy() for k in self.infrastructure_runs.data})
+		return out
+
+	@classmethod
+	def from_arrays(cls, arrays: Dict[str, np.ndarray], systems: Sequence[str]) -> "EventLog":
+		"""Rebuild a log from `arrays()` output and its interned system names."""
+		log = cls(capacity=len(arrays["launch_day"]))
+		for name in systems:
+			log.intern(name)
+		log.launches.extend(**{k: arrays[f"launch_{k}"] for k in log.launches.data})
+		log.infrastructure_runs.extend(**{k: arrays[f"runs_{k}"] for k in log.infrastructure_runs.data})
+		return log
+
+	def _run_counts(self) -> np.ndarray:
+		runs = self.infrastructure_runs
+		return (runs["last_day"] - runs["first_day"]) // INFRASTRUCTURE_PERIOD_DAYS + 1
+
+	def count(self, type: str | None = None) -> int:
+		n_launch = self.launches.rows
+		n_infra = int(self._run_counts().sum())
+		if type is None:
+			return n_launch + n_infra
+		return {"launch": n_launch, "infrastructure": n_infra}[_check_type(type)]
+
+	def __len__(self) -> int:
+		return self.count()
+
+	def nbytes(self) -> int:
+		return self.launches.nbytes() + self.infrastructure_runs.nbytes()
+
+	def _infrastructure_expanded(self) -> Dict[str, np.ndarray]:
+		runs = self.infrastructure_runs
+		counts = self._run_counts()
+		offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+		return {
+			"day": np.repeat(runs["first_day"], counts) + INFRASTRUCTURE_PERIOD_DAYS * offsets,
+			"mass_drivers_online": np.repeat(runs["mass_drivers_online"], counts),
+		}
+
+	def query(self, type: str, start: int | None = None, stop: int | None = None) -> Dict[str, np.ndarray]:
+		"""Columns of one event type with `start <= day < stop` (either bound optional).
+
+		"launch" gives `day`, `area_m2` and `system` codes; "infrastructure"
+		gives `day` and `mass_drivers_online`, one row per recorded day.
+		"""
+		if _check_type(type) == "launch":
+			cols = {k: self.launches[k] for k in ("day", "area_m2", "system")}
+		else:
+			cols = self._infrastructure_expanded()
+		keep = _day_mask(cols["day"], start, stop)
+		return {k: v[keep] for k, v in cols.items()}
+
+	def to_frame(self, start: int | None = None, stop: int | None = None) -> pd.DataFrame:
+		"""Long event table (`EVENT_COLUMNS`), ordered by day with launches first."""
+		launch = self.query("launch", start, stop)
+		infra = self.query("infrastructure", start, stop)
+		n_l, n_i = len(launch["day"]), len(infra["day"])
+		day = np.concatenate((launch["day"], infra["day"]))
+		type_code = np.repeat(np.array([LAUNCH, INFRASTRUCTURE], dtype=np.int8), [n_l, n_i])
+		order = np.lexsort((type_code, day))
+		systems = np.array(self.systems + [None], dtype=object)
+		area = np.concatenate((launch["area_m2"], np.full(n_i, np.nan)))
+		system = systems[np.concatenate((launch["system"], np.full(n_i, -1, dtype=np.int16)))]
+		md = np.concatenate((np.full(n_l, np.nan), infra["mass_drivers_online"]))
+		# Nullable integers while every count is exact in float64, plain floats beyond
+		if not n_i or infra["mass_drivers_online"].max() < 2.0 ** 53:
+			md = pd.array(md, dtype="Int64")
+		return pd.DataFrame({
+			"day": day[order],
+			"type": np.array(EVENT_TYPES, dtype=object)[type_code[order]],
+			"area_m2": area[order],
+			"system": system[order],
+			"mass_drivers_online": md[order],
+		})
+
+
+def _check_type(type: str) -> str:
+	if type not in EVENT_TYPES:
+		raise ValueError(f"Unknown event type {type!r}; expected one of {EVENT_TYPES}")
+	return type
@@ -0,0 +1,461 @@
+"""Vectorized Monte Carlo over the scenario's `uncertainty` block.
+
+Every replicate samples the collector efficiency (`pv_efficiency_sigma`,
+absolute normal), a mean-one lognormal line yield factor (`yield_sigma`) and
+any `monte_carlo.distributions` on dotted scenario keys; `failure_rate_scale`
+scales the replicates' compiled availabilities. All replicates then run through
+the batch engine as one `(replicates, days)` computation and reduce to
+per-day quantile bands of area and power plus the years-to-target
+distribution, instead of one output directory per replicate.
+
+Replicate i draws from its own stream `make_rng(seed, i)`, so its values do
+not depend on the replicate count or the block size. That lets a
+`monte_carlo.stopping` block run replicates in batches and stop as soon as
+the confidence intervals of chosen outcome statistics are narrow enough:
+the first n replicates of a sequential run are the same as in a fixed run
+of n.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, Any, List, Sequence, Tuple
+import json
+import math
+import time
+import numpy as np
+from ..config import make_rng, with_overrides
+from .adaptive import output_days
+from .batch import DEFAULT_MAX_ELEMENTS, scenario_params, simulate_blocks
+
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+# Distribution name -> its required parameters
+DISTRIBUTIONS = {
+	"normal": ("mean", "sd"),
+	"lognormal": ("median", "sigma"),
+	"uniform": ("min", "max"),
+	"loguniform": ("min", "max"),
+	"triangular": ("min", "mode", "max"),
+	"choice": (),
+}
+# Draws per replicate for the built-in uncertainties (PV efficiency, yield) ahead of the user distributions
+BUILTIN_DIMS = 2
+BAND_METRICS = ("cum_area_m2", "power_GW_1AU_equiv")
+# Per-replicate outcomes (years_to_target is inf while the target is never met)
+OUTCOMES = ("years_to_target", "total_area_m2", "delivered_power_GW_at_1AU_equiv")
+
+
+def quantile_label(q: float) -> str:
+	return f"p{100.0 * q:g}"
+
+
+@dataclass(frozen=True)
+class Distribution:
+	"""Sampled value of one dotted scenario key.
+
+	`normal` and `lognormal` may be clipped to optional `min`/`max`.
+	"""
+	key: str
+	dist: str
+	params: Tuple[float, ...] = ()
+	values: tuple | None = None
+	min: float | None = None
+	max: float | None = None
+
+	@classmethod
+	def from_dict(cls, key: str, d: Any) -> "Distribution":
+		if isinstance(d, list):
+			d = {"dist": "choice", "values": d}
+		if not isinstance(d, dict):
+			raise ValueError(f"Distribution {key!r}: expected a mapping or a list of values")
+		dist = str(d.get("dist", "normal"))
+		if dist not in DISTRIBUTIONS:
+			raise ValueError(f"Distribution {key!r}: unknown dist {dist!r}; expected one of {tuple(DISTRIBUTIONS)}")
+		if dist == "choice":
+			values = tuple(d.get("values") or ())
+			if not values:
+				raise ValueError(f"Distribution {key!r}: choice needs a non-empty 'values' list")
+			return cls(key=key, dist=dist, values=values)
+		missing = [k for k in DISTRIBUTIONS[dist] if k not in d]
+		if missing:
+			raise ValueError(f"Distribution {key!r}: {dist} needs {missing}")
+		params = tuple(float(d[k]) for k in DISTRIBUTIONS[dist])
+		clip = dist in ("normal", "lognormal")
+		spec = cls(key=key, dist=dist, params=params,
+			min=float(d["min"]) if clip and "min" in d else None, max=float(d["max"]) if clip and "max" in d else None)
+		if clip and params[1] < 0:
+			raise ValueError(f"Distribution {key!r}: spread must be >= 0")
+		if dist == "lognormal" and params[0] <= 0:
+			raise ValueError(f"Distribution {key!r}: lognormal median must be > 0")
+		if not clip and list(params) != sorted(params):
+			raise ValueError(f"Distribution {key!r}: needs min <= {'mode <= ' if dist == 'triangular' else ''}max")
+		if dist == "loguniform" and params[0] <= 0:
+			raise ValueError(f"Distribution {key!r}: loguniform needs min > 0")
+		return spec
+
+	def sample(self, z: np.ndarray, u: np.ndarray) -> np.ndarray:
+		"""Values from standard normals `z` (normal, lognormal) or uniforms `u` (the others)."""
+		if self.dist == "choice":
+			idx = np.minimum((u * len(self.values)).astype(int), len(self.values) - 1)
+			return np.asarray(self.values, dtype=object)[idx]
+		p = self.params
+		if self.dist == "normal":
+			x = p[0] + p[1] * z
+		elif self.dist == "lognormal":
+			x = p[0] * np.exp(p[1] * z)
+		elif self.dist == "uniform":
+			x = p[0] + u * (p[1] - p[0])
+		elif self.dist == "loguniform":
+			x = np.exp(np.log(p[0]) + u * np.log(p[1] / p[0]))
+		else:
+			lo, mode, hi = p
+			c = (mode - lo) / (hi - lo) if hi > lo else 0.0
+			x = np.where(u < c, lo + np.sqrt(u * (hi - lo) * (mode - lo)), hi - np.sqrt((1.0 - u) * (hi - lo) * (hi - mode)))
+		if self.min is not None or self.max is not None:
+			x = np.clip(x, self.min, self.max)
+		return x
+
+	def cdf(self, x: np.ndarray) -> np.ndarray:
+		"""P(value <= x) of a numeric distribution, clipping included."""
+		if self.dist == "choice":
+			raise ValueError(f"Distribution {self.key!r}: choice has no cdf")
+		x = np.asarray(x, dtype=float)
+		p = self.params
+		if self.dist in ("normal", "lognormal"):
+			z = x - p[0] if self.dist == "normal" else np.log(np.maximum(x, 1e-300) / p[0])
+			if p[1] > 0:
+				c = np.vectorize(NormalDist(0.0, p[1]).cdf, otypes=[float])(z)
+			else:
+				c = (z >= 0).astype(float)
+			if self.dist == "lognormal":
+				c = np.where(x > 0, c, 0.0)
+		elif self.dist == "uniform":
+			c = np.clip((x - p[0]) / (p[1] - p[0]), 0.0, 1.0) if p[1] > p[0] else (x >= p[0]).astype(float)
+		elif self.dist == "loguniform":
+			c = np.clip(np.log(np.maximum(x, 1e-300) / p[0]) / np.log(p[1] / p[0]), 0.0, 1.0) if p[1] > p[0] else (x >= p[0]).astype(float)
+		else:
+			lo, mode, hi = p
+			if hi <= lo:
+				return (x >= lo).astype(float)
+			t = np.clip(x, lo, hi)
+			left = (t - lo) ** 2 / ((hi - lo) * (mode - lo)) if mode > lo else np.zeros_like(t)
+			right = 1.0 - (hi - t) ** 2 / ((hi - lo) * (hi - mode)) if hi > mode else np.ones_like(t)
+			c = np.where(t < mode, left, right)
+		if self.min is not None:
+			c = np.where(x < self.min, 0.0, c)
+		if self.max is not None:
+			c = np.where(x >= self.max, 1.0, c)
+		return c
+
+
+@dataclass(frozen=True)
+class StoppingTarget:
+	"""Stop once the CI half-width of `stat` ("mean" or "pNN") of `metric` is within `abs` and/or `rel` of the estimate."""
+	metric: str
+	stat: str
+	rel: float | None = None
+	abs: float | None = None
+
+	@classmethod
+	def from_dict(cls, d: Any) -> "StoppingTarget":
+		if not isinstance(d, dict) or "metric" not in d:
+			raise ValueError("Stopping target needs a mapping with 'metric', 'stat' and 'rel' and/or 'abs'")
+		target = cls(metric=str(d["metric"]), stat=str(d.get("stat", "mean")),
+			rel=float(d["rel"]) if "rel" in d else None, abs=float(d["abs"]) if "abs" in d else None)
+		if target.metric not in OUTCOMES:
+			raise ValueError(f"Stopping metric {target.metric!r}: expected one of {OUTCOMES}")
+		if target.stat != "mean":
+			try:
+				q = target.q
+			except ValueError:
+				q = -1.0
+			if not 0.0 < q < 1.0:
+				raise ValueError(f"Stopping stat {target.stat!r}: expected 'mean' or a percentile such as 'p90'")
+		if target.rel is None and target.abs is None:
+			raise ValueError(f"Stopping target {target.label}: needs 'rel' and/or 'abs' half-width")
+		return target
+
+	@property
+	def q(self) -> float:
+		return float(self.stat[1:]) / 100.0 if self.stat.startswith("p") else float("nan")
+
+	@property
+	def label(self) -> str:
+		return f"{self.metric}_{self.stat}"
+
+	def estimate(self, moments: "RunningMoments", ordered: np.ndarray, z: float) -> Tuple[float, float]:
+		"""(Estimate, CI half-width) from the metric's running moments and sorted values; the half-width is inf until the interval is finite."""
+		n = len(ordered)
+		if self.stat == "mean":
+			est, half = moments.mean, z * math.sqrt(moments.variance / n) if n > 1 else math.inf
+		else:
+			# Distribution-free interval between the order statistics around rank n*q
+			q = self.q
+			est = float(ordered[max(math.ceil(n * q), 1) - 1])
+			spread = z * math.sqrt(n * q * (1.0 - q))
+			lo, hi = math.floor(n * q - spread), math.ceil(n * q + spread)
+			half = max(est - float(ordered[lo - 1]), float(ordered[hi - 1]) - est) if lo >= 1 and hi <= n else math.inf
+		return est, half if math.isfinite(half) else math.inf
+
+	def met(self, est: float, half: float) -> bool:
+		"""Never met while the estimate or its half-width is infinite (e.g. a target year no replicate reaches)."""
+		if not (math.isfinite(est) and math.isfinite(half)):
+			return False
+		return (self.abs is None or half <= self.abs) and (self.rel is None or half <= self.rel * abs(est))
+
+
+@dataclass(frozen=True)
+class StoppingSpec:
+	targets: Tuple[StoppingTarget, ...]
+	batch: int = 100
+	confidence: float = 0.95
+	max_seconds: float | None = None
+
+	@classmethod
+	def from_dict(cls, d: Dict[str, Any]) -> "StoppingSpec":
+		targets = d.get("targets") or ()
+		if isinstance(targets, dict):
+			targets = [targets]
+		if not targets:
+			raise ValueError("monte_carlo.stopping needs at least one target")
+		spec = cls(targets=tuple(StoppingTarget.from_dict(t) for t in targets), batch=int(d.get("batch", 100)),
+			confidence=float(d.get("confidence", 0.95)), max_seconds=float(d["max_seconds"]) if d.get("max_seconds") is not None else None)
+		if spec.batch < 1 or not 0.0 < spec.confidence < 1.0:
+			raise ValueError("monte_carlo.stopping needs batch >= 1 and 0 < confidence < 1")
+		return spec
+
+
+class RunningMoments:
+	"""Streaming mean and variance, merged batch by batch (Chan et al.)."""
+
+	def __init__(self):
+		self.n = 0
+		self.mean = 0.0
+		self.m2 = 0.0
+
+	def update(self, x: np.ndarray) -> None:
+		nb = len(x)
+		if not nb:
+			return
+		mb = float(x.mean())
+		n = self.n + nb
+		delta = mb - self.mean
+		with np.errstate(invalid="ignore"):
+			self.m2 += float(((x - mb) ** 2).sum()) + delta * delta * self.n * nb / n
+		self.mean += delta * nb / n
+		self.n = n
+
+	@property
+	def variance(self) -> float:
+		return self.m2 / (self.n - 1) if self.n > 1 else math.inf
+
+
+class ConvergenceTracker:
+	"""Outcome values so far and the estimate/half-width of every stopping target after each batch."""
+
+	def __init__(self, spec: StoppingSpec):
+		self.spec = spec
+		self.z = NormalDist().inv_cdf(0.5 + spec.confidence / 2.0)
+		self.metrics = tuple(dict.fromkeys(t.metric for t in spec.targets))
+		self._moments = {m: RunningMoments() for m in self.metrics}
+		self._ordered = {m: np.zeros(0) for m in self.metrics}
+		self._last: Dict[str, Tuple[float, float]] = {}
+		self.trace: List[Dict[str, Any]] = []
+
+	def update(self, batch: Dict[str, np.ndarray], elapsed_s: float) -> None:
+		for m in self.metrics:
+			self._moments[m].update(batch[m])
+			ordered = self._ordered[m]
+			new = np.sort(batch[m])
+			self._ordered[m] = np.insert(ordered, np.searchsorted(ordered, new), new)
+		row: Dict[str, Any] = {"replicates": self._moments[self.metrics[0]].n, "elapsed_s": elapsed_s}
+		for t in self.spec.targets:
+			est, half = self._last[t.label] = t.estimate(self._moments[t.metric], self._ordered[t.metric], self.z)
+			row[t.label] = est
+			row[f"{t.label}_half_width"] = half
+		row["converged"] = self.converged
+		self.trace.append(row)
+
+	@property
+	def converged(self) -> bool:
+		return bool(self._last) and all(t.met(*self._last[t.label]) for t in self.spec.targets)
+
+	def estimates(self) -> Dict[str, Dict[str, Any]]:
+		out = {}
+		for t in self.spec.targets:
+			est, half = self._last[t.label]
+			out[t.label] = {"estimate": est if math.isfinite(est) else None, "half_width": half if math.isfinite(half) else None, "rel": t.rel, "abs": t.abs, "met": t.met(est, half)}
+		return out
+
+
+@dataclass(frozen=True)
+class MonteCarloSpec:
+	# Replicates to run (the budget when `stopping` is set)
+	replicates: int
+	seed: int = 0
+	quantiles: Tuple[float, ...] = DEFAULT_QUANTILES
+	distributions: Tuple[Distribution, ...] = ()
+	stopping: StoppingSpec | None = None
+
+	@classmethod
+	def from_dict(cls, d: Dict[str, Any] | None, seed: int = 0, replicates: int | None = None) -> "MonteCarloSpec":
+		"""Spec from a scenario `monte_carlo:` block; `replicates` overrides the block's count."""
+		d = d or {}
+		n = int(replicates if replicates is not None else d.get("replicates", 0))
+		if n < 1:
+			raise ValueError("Monte Carlo needs replicates >= 1")
+		quantiles = tuple(float(q) for q in d.get("quantiles", DEFAULT_QUANTILES))
+		if not quantiles or any(not 0.0 <= q <= 1.0 for q in quantiles):
+			raise ValueError("Monte Carlo quantiles must lie in [0, 1]")
+		dists = d.get("distributions") or {}
+		if not isinstance(dists, dict):
+			raise ValueError("monte_carlo.distributions must map dotted keys to distributions")
+		stopping = StoppingSpec.from_dict(d["stopping"]) if d.get("stopping") else None
+		return cls(replicates=n, seed=int(seed), quantiles=quantiles, distributions=tuple(Distribution.from_dict(k, v) for k, v in dists.items()), stopping=stopping)
+
+
+@dataclass
+class MonteCarloResults:
+	spec: MonteCarloSpec
+	# Output days and metric -> (quantiles, len(days)) bands
+	days: np.ndarray
+	bands: Dict[str, np.ndarray]
+	# Column -> (replicates,) values: sampled inputs and per-replicate outcomes
+	samples: Dict[str, np.ndarray]
+	summary: Dict[str, Any]
+	# Stopping-target estimates after each batch (sequential runs only)
+	trace: List[Dict[str, Any]] | None = None
+
+
+def replicate_draws(seed: int, replicates: Sequence[int], dims: int) -> Tuple[np.ndarray, np.ndarray]:
+	"""`(n, dims)` standard normals and uniforms, row k from stream `replicates[k]` of `seed`."""
+	z = np.empty((len(replicates), dims))
+	u = np.empty((len(replicates), dims))
+	for k, i in enumerate(replicates):
+		rng = make_rng(seed, i)
+		z[k] = rng.standard_normal(dims)
+		u[k] = rng.random(dims)
+	return z, u
+
+
+def _plain(v: Any) -> Any:
+	return v.item() if isinstance(v, np.generic) else v
+
+
+def replicate_params(scenario: Dict[str, Any], spec: MonteCarloSpec, replicates: Sequence[int]) -> Tuple[List[Dict[str, Any]], Dict[str, np.ndarray]]:
+	"""Batch-engine parameters of the given replicates of a built scenario, and the sampled inputs."""
+	z, u = replicate_draws(spec.seed, replicates, BUILTIN_DIMS + len(spec.distributions))
+	drawn = {d.key: d.sample(z[:, BUILTIN_DIMS + j], u[:, BUILTIN_DIMS + j]) for j, d in enumerate(spec.distributions)}
+	base = None if drawn else scenario_params(scenario, scale_availability=True)
+	params: List[Dict[str, Any]] = []
+	eff = np.empty(len(replicates))
+	yield_factor = np.empty(len(replicates))
+	for k in range(len(replicates)):
+		p = dict(base) if base is not None else scenario_params(with_overrides(scenario, {key: _plain(v[k]) for key, v in drawn.items()}), scale_availability=True)
+		p["base_eff"] = eff[k] = min(1.0, max(0.0, p["base_eff"] + p["pv_efficiency_sigma"] * z[k, 0]))
+		s = p["yield_sigma"]
+		yield_factor[k] = np.exp(s * z[k, 1] - 0.5 * s * s)
+		p["c_pv"] *= yield_factor[k]
+		p["c_structure"] *= yield_factor[k]
+		params.append(p)
+	return params, {"pv_efficiency": eff, "yield_factor": yield_factor, **drawn}
+
+
+def _quantiles(x: np.ndarray, qs: Sequence[float]) -> Dict[str, float | None]:
+	"""Empirical (inverted-CDF) quantiles; infinite values (never met) report as None."""
+	out = np.quantile(x, qs, method="inverted_cdf")
+	return {quantile_label(q): float(v) if np.isfinite(v) else None for q, v in zip(qs, out)}
+
+
+def _simulate_replicates(scenario: Dict[str, Any], spec: MonteCarloSpec, replicates: np.ndarray, max_elements: int) -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+	"""Output days, `(n, len(days))` `BAND_METRICS` series and per-replicate columns (years never met are inf)."""
+	params, samples = replicate_params(scenario, spec, replicates)
+	H_days = params[0]["horizon_days"]
+	if any(p["horizon_days"] != H_days for p in params):
+		raise ValueError("Monte Carlo distributions must not change horizon_years")
+	days = output_days(H_days, int(scenario.get("output_every_days", 1)))
+	n = len(params)
+	series = {m: np.empty((n, len(days))) for m in BAND_METRICS}
+	outcomes = {m: np.empty(n) for m in OUTCOMES}
+	for start, chunk, res in simulate_blocks(params, H_days, max_elements=max_elements):
+		sl = slice(start, start + len(chunk))
+		cum_area = res["cum_area_m2"]
+		col = {k: np.array([p[k] for p in chunk])[:, None] for k in ("irr_weighted", "eff_scale", "target")}
+		series["cum_area_m2"][sl] = cum_area[:, days]
+		series["power_GW_1AU_equiv"][sl] = cum_area[:, days] * col["irr_weighted"] * (res["eff_now_series"][:, days] * col["eff_scale"]) * 1e-9
+		met = cum_area >= col["target"]
+		outcomes["years_to_target"][sl] = np.where(met.any(axis=1), np.argmax(met, axis=1) / 365.0, np.inf)
+		outcomes["total_area_m2"][sl] = cum_area[:, -1]
+		outcomes["delivered_power_GW_at_1AU_equiv"][sl] = res["final_power_GW"]
+	return days, series, {"replicate": replicates, **samples, **outcomes}
+
+
+def run_monte_carlo(scenario: Dict[str, Any], spec: MonteCarloSpec, max_elements: int = DEFAULT_MAX_ELEMENTS) -> MonteCarloResults:
+	"""Run up to `spec.replicates` samples of a built scenario as batched array computations.
+
+	Bands are kept on the scenario's `output_every_days` rows; each replicate's
+	target day is found on the full daily series. With `spec.stopping`,
+	replicates run in batches until every stopping target is met or a budget
+	runs out, and `results.trace` holds the estimates after each batch.
+	"""
+	stop = spec.stopping
+	batch = stop.batch if stop is not None else spec.replicates
+	started = time.perf_counter()
+	series: Dict[str, List[np.ndarray]] = {m: [] for m in BAND_METRICS}
+	columns: Dict[str, List[np.ndarray]] = {}
+	tracker = ConvergenceTracker(stop) if stop is not None else None
+	reason = "replicates"
+	for start in range(0, spec.replicates, batch):
+		replicates = np.arange(start, min(start + batch, spec.replicates))
+		days, block, cols = _simulate_replicates(scenario, spec, replicates, max_elements)
+		for m in BAND_METRICS:
+			series[m].append(block[m])
+		for k, v in cols.items():
+			columns.setdefault(k, []).append(v)
+		if tracker is not None:
+			tracker.update({m: cols[m] for m in tracker.metrics}, time.perf_counter() - started)
+			if tracker.converged:
+				reason = "converged"
+				break
+			if stop.max_seconds is not None and time.perf_counter() - started >= stop.max_seconds:
+				reason = "max_seconds"
+				break
+	samples = {k: np.concatenate(v) for k, v in columns.items()}
+	qs = list(spec.quantiles)
+	bands = {m: np.quantile(np.concatenate(series[m]), qs, axis=0) for m in BAND_METRICS}
+	years = samples["years_to_target"]
+	met = np.isfinite(years)
+	summary = {
+		"replicates": len(years),
+		"seed": spec.seed,
+		"quantiles": qs,
+		"sampled": [k for k in samples if k != "replicate" and k not in OUTCOMES],
+		"years_to_target": {
+			**_quantiles(years, qs),
+			"mean": float(years[met].mean()) if met.any() else None,
+			"fraction_met": float(met.mean()),
+		},
+		"total_area_m2": _quantiles(samples["total_area_m2"], qs),
+		"delivered_power_GW_at_1AU_equiv": _quantiles(samples["delivered_power_GW_at_1AU_equiv"], qs),
+	}
+	if tracker is not None:
+		summary["stopping"] = {"reason": reason, "converged": tracker.converged, "confidence": stop.confidence, "estimates": tracker.estimates()}
+	samples["years_to_target"] = np.where(met, years, np.nan)
+	return MonteCarloResults(spec=spec, days=days, bands=bands, samples=samples, summary=summary, trace=tracker.trace if tracker is not None else None)
+
+
+def write_monte_carlo(results: MonteCarloResults, out_dir: Path) -> None:
+	"""`mc_bands.csv` (per-day quantiles), `mc_samples.csv` (one row per replicate), `mc_summary.json`
+	and, for sequential runs, `mc_convergence.csv` (one row per batch)."""
+	import pandas as pd
+	out_dir.mkdir(parents=True, exist_ok=True)
+	bands = {"day": results.days}
+	for m, b in results.bands.items():
+		for q, row in zip(results.spec.quantiles, b):
+			bands[f"{m}_{quantile_label(q)}"] = row
+	pd.DataFrame(bands).to_csv(out_dir / "mc_bands.csv", index=False)
+	pd.DataFrame(results.samples).to_csv(out_dir / "mc_samples.csv", index=False)
+	if results.trace is not None:
+		pd.DataFrame(results.trace).to_csv(out_dir / "mc_convergence.csv", index=False)
+	with (out_dir / "mc_summary.json").open("w", encoding="utf-8") as f:
+		json.dump(results.summary, f, indent=2)
@@ -1,113 +1,79 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable
 import pandas as pd
 import json
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-plt.style.use("seaborn-v0_8-darkgrid")
+from . import OUTPUT_KINDS
 
 
-def write_outputs(results: Dict[str, Any], out_dir: Path) -> None:
+def parse_outputs(spec: str | None, no_plots: bool = False) -> tuple:
+	"""Parse a comma-separated `--outputs` selection (default: all kinds; only "plots" loads matplotlib)."""
+	kinds = OUTPUT_KINDS if not spec else tuple(k.strip() for k in spec.split(",") if k.strip())
+	unknown = [k for k in kinds if k not in OUTPUT_KINDS]
+	if unknown:
+		raise ValueError(f"Unknown output kind(s) {unknown}; expected a subset of {OUTPUT_KINDS}")
+	return tuple(k for k in kinds if not (no_plots and k == "plots"))
+
+
+def _pyplot():
+	# Deferred so headless runs never import matplotlib
+	import matplotlib.pyplot as plt
+	if not getattr(_pyplot, "_styled", False):
+		plt.style.use("seaborn-v0_8-darkgrid")
+		_pyplot._styled = True
+	return plt
+
+
+def write_outputs(results: Dict[str, Any], out_dir: Path, outputs: Iterable[str] = OUTPUT_KINDS) -> None:
+	outputs = set(outputs)
 	out_dir.mkdir(parents=True, exist_ok=True)
-	fig_dir = out_dir / "figs"
-	fig_dir.mkdir(parents=True, exist_ok=True)
-	# Write timeseries
 	ts: pd.DataFrame = results["timeseries"]
-	ts.to_csv(out_dir / "timeseries.csv", index=False)
+	if "csv" in outputs or "parquet" in outputs:
+		events_df = results["events"].to_frame()
+	# Write timeseries and events
+	if "csv" in outputs:
+		ts.to_csv(out_dir / "timeseries.csv", index=False)
+		events_df.to_csv(out_dir / "events.csv", index=False)
+		if results.get("vintages") is not None:
+			results["vintages"].to_csv(out_dir / "vintages.csv", index=False)
+	# Radial grid: the (days, shells) area matrix instead of per-shell columns
+	if results.get("shell_grid") is not None and ("csv" in outputs or "parquet" in outputs):
+		from .shells import write_shells
+		write_shells(out_dir / "shells", results["shell_grid"], ts)
 	# Optional parquet outputs if pyarrow/fastparquet available
-	try:
-		ts.to_parquet(out_dir / "timeseries.parquet", index=False)
-	except Exception:
-		pass
-	# Events
-	events_df = pd.DataFrame(results["events"]) if results.get("events") else pd.DataFrame(columns=["type"]) 
-	events_df.to_csv(out_dir / "events.csv", index=False)
-	try:
-		events_df.to_parquet(out_dir / "events.parquet", index=False)
-	except Exception:
-		pass
+	if "parquet" in outputs:
+		try:
+			ts.to_parquet(out_dir / "timeseries.parquet", index=False)
+		except Exception:
+			pass
+		try:
+			events_df.to_parquet(out_dir / "events.parquet", index=False)
+		except Exception:
+			pass
+	if "summary" in outputs:
+		write_summary(results["summary"], results.get("parameters"), out_dir)
+		# Per-band CSV summary if available
+		if "bands" in results.get("summary", {}):
+			bands = results["summary"]["bands"] or []
+			if bands:
+				pd.DataFrame(bands).to_csv(out_dir / "band_summary.csv", index=False)
+	if "plots" in outputs:
+		from .render import render_figures
+		render_figures(ts, out_dir / "figs")
+
+
+def write_summary(summary: Dict[str, Any], parameters: Dict[str, Any] | None, out_dir: Path) -> None:
+	out_dir.mkdir(parents=True, exist_ok=True)
 	with (out_dir / "summary.json").open("w", encoding="utf-8") as f:
-		json.dump(results["summary"], f, indent=2)
+		json.dump(summary, f, indent=2)
 	# Write parameter docs/values for interpretability if present
-	if "parameters" in results:
+	if parameters is not None:
 		with (out_dir / "parameters.json").open("w", encoding="utf-8") as f:
-			json.dump(results["parameters"], f, indent=2)
-	# Per-band CSV summary if available
-	if "bands" in results.get("summary", {}):
-		bands = results["summary"]["bands"] or []
-		if bands:
-			pd.DataFrame(bands).to_csv(out_dir / "band_summary.csv", index=False)
-	# Plots
-	plt.figure(figsize=(9,4.8))
-	plt.plot(ts["day"] / 365.0, ts["cum_area_m2"] / 1e6)
-	plt.xlabel("Years")
-	plt.ylabel("Cumulative area (km^2)")
-	plt.grid(True)
-	plt.tight_layout()
-	plt.savefig(fig_dir / "area_vs_time.png", dpi=150)
-	plt.close()
-
-	plt.figure(figsize=(9,4.8))
-	plt.plot(ts["day"] / 365.0, ts["power_GW_1AU_equiv"])
-	plt.xlabel("Years")
-	plt.ylabel("Power (GW @1AU)")
-	plt.grid(True)
-	plt.tight_layout()
-	plt.savefig(fig_dir / "power_vs_time.png", dpi=150)
-	plt.close()
-
-	# Optional: per-band area if present
-	band_cols = [c for c in ts.columns if c.startswith("band_") and c.endswith("_area_m2")]
-	if band_cols:
-		plt.figure(figsize=(9,4.8))
-		for c in sorted(band_cols):
-			plt.plot(ts["day"] / 365.0, ts[c] / 1e6, label=c)
-		plt.xlabel("Years")
-		plt.ylabel("Band cumulative area (km^2)")
-		plt.legend(loc="best", fontsize=8)
-		plt.grid(True)
-		plt.tight_layout()
-		plt.savefig(fig_dir / "band_areas_vs_time.png", dpi=150)
-		plt.close()
-
-	# Additional plot: launched area per day (cadence proxy)
-	plt.figure(figsize=(9,4.8))
-	launch_km2_per_day = ts["launched_m2"] / 1e6
-	plt.plot(ts["day"] / 365.0, launch_km2_per_day)
-	ax = plt.gca()
-	ax.ticklabel_format(style="plain", axis="y", useOffset=False, scilimits=(0,0))
-	plt.xlabel("Years")
-	plt.ylabel("Launched area per day (km^2/day)")
-	plt.grid(True)
-	plt.tight_layout()
-	plt.savefig(fig_dir / "launch_cadence_vs_time.png", dpi=150)
-	plt.close()
-
-	# Additional plot: mass drivers online over time
-	if "mass_drivers_online" in ts.columns:
-		plt.figure(figsize=(9,4.8))
-		x_years = ts["day"] / 365.0
-		y_md = ts["mass_drivers_online"].astype(float)
-		scale = 1.0
-		y_label = "Mass drivers online"
-		if y_md.max() >= 1e6:
-			scale = 1e6
-			y_label += " (millions)"
-		plt.step(x_years, y_md / scale, where="post")
-		ax = plt.gca()
-		ax.ticklabel_format(style="plain", axis="y", useOffset=False, scilimits=(0,0))
-		if scale == 1.0:
-			ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
-		plt.xlabel("Years")
-		plt.ylabel(y_label)
-		plt.grid(True)
-		plt.tight_layout()
-		plt.savefig(fig_dir / "mass_drivers_vs_time.png", dpi=150)
-		plt.close()
+			json.dump(parameters, f, indent=2)
 
 
 def plot_run(out_dir: Path) -> None:
+	plt = _pyplot()
 	ts = pd.read_csv(out_dir / "timeseries.csv")
 	plt.figure(figsize=(8,4))
 	plt.plot(ts["day"] / 365.0, ts["cum_area_m2"] / 1e9)
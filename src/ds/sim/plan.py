@@ -0,0 +1,244 @@
+"""Compiled scenario plan.
+
+`compile_scenario` validates a built scenario dict once (pydantic models in
+`ds.sim.scenario_schema` and `ds.bodies.bodies_schema`) and resolves every
+constant the daily model needs into an immutable `ScenarioPlan`. Engines,
+`Scheduler` and `Factory` read only the plan, so nothing in the day loop
+touches the raw config and bad configs fail before a run starts.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
+import numpy as np
+from ..bodies.bodies_schema import BodiesFile
+from ..economy.flows import FlowNetwork
+from ..economy.manufacturing import build_lines_from_config
+from ..mission.launch_strategy import mercury_mass_driver
+from ..physics.constants import AU_M, SOLAR_CONSTANT_1AU_W_M2
+from .scenario_schema import ScenarioCfg
+from .summary import collector_mix, resolve_bands, transport_limits, beaming_chain, thermal_derate
+
+
+@dataclass(frozen=True, slots=True)
+class LinePlan:
+	name: str
+	kW: float
+	throughput_per_day: float
+	unit: str
+	# Reliability availability, 1.0 for lines without MTBF/MTTR
+	availability: float
+	mtbf_h: float | None = None
+	mttr_h: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ScenarioPlan:
+	name: str
+	seed: int
+	horizon_days: int
+	phase0_days: int
+	phase1_days: int
+	phase2_days: int
+	# Production
+	uptime: float
+	learning_b: float
+	lines: Tuple[LinePlan, ...]
+	# Factory graph compiled for the daily flow solve (`ds.economy.flows`)
+	flows: FlowNetwork
+	factory_kit_mass_kg: float
+	replication_factor: float
+	replication_cycle_days: float
+	max_growth_multiplier: float
+	md_duration_days: float
+	resource_limit_kg: float | None
+	# "expected" (steady-state availability factors) or "stochastic" (`ds.economy.reliability.UnitPool`)
+	reliability_mode: str
+	failure_rate_scale: float
+	# Sampled only by `ds.sim.montecarlo`: absolute sd of `base_eff_1au`, log-sd of line yields
+	pv_efficiency_sigma: float
+	yield_sigma: float
+	# Launched collector types and their area fractions; density and package area are mix averages
+	collector_mix: Tuple[Tuple[str, float], ...]
+	collector_areal_density_kg_m2: float
+	# Launch and transport
+	launch_system: str
+	launch_cadence_per_day: float
+	# Rail cadence before availability, and the rail MTBF/MTTR (None without reliability data)
+	launch_cadence_base_per_day: float
+	md_mtbf_h: float | None
+	md_mttr_h: float | None
+	cadence_cap: float
+	package_area_m2: float
+	fleet_MW: float
+	area_per_MW_per_day: float
+	# Deployment bands: mean radius, weight, sphere area (OD denominator) and irradiance
+	band_means: Tuple[float, ...]
+	band_weights: Tuple[float, ...]
+	band_sphere_area_m2: Tuple[float, ...]
+	band_irradiance_W_m2: Tuple[float, ...]
+	# Shell boundaries of a radial grid (`ds.sim.shells`), whose shells are the bands; empty for plain bands
+	shell_edges_AU: Tuple[float, ...]
+	od_cap: float
+	# Efficiency chain: mix efficiency of new collectors, and per mix type its
+	# (efficiency share, degradation per year) for the vintage sums (`ds.sim.vintage`)
+	base_eff_1au: float
+	degradation: Tuple[Tuple[float, float], ...]
+	thermal_derate: float
+	beaming_chain: float
+	target_area_m2: float
+	# Output
+	output_every_days: int = 1
+	vintage_snapshot_days: Tuple[int, ...] = ()
+
+	@property
+	def launch_day(self) -> int:
+		return self.phase0_days + self.phase1_days
+
+	@property
+	def flow_availability(self) -> Tuple[float, ...]:
+		"""Steady-state availability of each `flows` node."""
+		avail = {l.name: l.availability for l in self.lines}
+		return tuple(avail.get(n, 1.0) for n in self.flows.names)
+
+	def unit_output(self) -> Dict[str, float]:
+		"""Daily production per product and energy at unit uptime, learning and growth (steady-state availability)."""
+		return self.flows.unit_output(self.flow_availability)
+
+	@property
+	def irradiance_weighted(self) -> float:
+		"""Sum over bands of weight * irradiance: power per m2 of deployed area at unit efficiency."""
+		return float(np.dot(self.band_weights, self.band_irradiance_W_m2))
+
+	@property
+	def od_factor(self) -> float:
+		"""Max over bands of weight / sphere area: the peak band OD per m2 of deployed area."""
+		return float(np.max(np.divide(self.band_weights, self.band_sphere_area_m2)))
+
+	@property
+	def band_columns(self) -> int:
+		"""Bands written as `band_{i}_*` timeseries columns (none for a radial grid)."""
+		return 0 if self.shell_edges_AU else len(self.band_means)
+
+	def band_blocks(self, cum_area: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		"""`(band_columns, days)` area and uncapped OD blocks of the bands for the cumulative area."""
+		n = self.band_columns
+		area = np.array(self.band_weights[:n])[:, None] * np.asarray(cum_area, dtype=float)[None, :]
+		return area, area / np.array(self.band_sphere_area_m2[:n])[:, None]
+
+	@property
+	def transport_cap_m2_per_day(self) -> float:
+		return self.fleet_MW * self.area_per_MW_per_day
+
+	def phase(self, day: int) -> int:
+		if day < self.phase0_days:
+			return 0
+		if day < self.phase0_days + self.phase1_days:
+			return 1
+		return 2
+
+
+def usable_mass_limit_kg(bodies: Dict[str, Any] | None) -> float | None:
+	"""Resource cap of the production model: Fe + 0.2 * SiO2 in a 10 m shell of the first body."""
+	mercury = bodies.get("bodies", [])[0] if isinstance(bodies, dict) else None
+	if not isinstance(mercury, dict):
+		return None
+	comp = mercury.get("composition_mass_frac", {})
+	# Assume usable: Fe + 0.2*SiO2 (rough proxy for PV structure/silicon fraction)
+	usable_frac = float(comp.get("Fe", 0.0)) + 0.2 * float(comp.get("SiO2", 0.0))
+	# Mining depth slice proxy: 10 m average over planet surface at density
+	radius_m = float(mercury.get("radius_m", 2.4397e6))
+	density = float(mercury.get("mean_density_kg_m3", 5427.0))
+	volume_shell_m3 = 4.0 * 3.141592653589793 * (radius_m ** 2) * 10.0
+	return usable_frac * density * volume_shell_m3
+
+
+def compile_scenario(scenario: Dict[str, Any], scale_availability: bool = False) -> ScenarioPlan:
+	"""Validate a built scenario and resolve it into a `ScenarioPlan`.
+
+	`scale_availability` applies `uncertainty.failure_rate_scale` to the
+	steady-state availabilities too (Monte Carlo replicates); otherwise it
+	only scales stochastic failure draws.
+
+	Raises `pydantic.ValidationError` (a `ValueError`) naming every invalid field.
+	"""
+	cfg = ScenarioCfg.model_validate(scenario)
+	failure_scale = cfg.uncertainty.failure_rate_scale if scale_availability else 1.0
+	bodies = scenario.get("bodies")
+	if isinstance(bodies, dict):
+		BodiesFile.model_validate(bodies)
+	vehicles = scenario.get("vehicles")
+	if not isinstance(vehicles, dict) or "mercury_mass_driver" not in vehicles.get("launchers", {}):
+		raise ValueError("Scenario needs vehicles.launchers.mercury_mass_driver")
+
+	nodes = cfg.factories.nodes
+	lines = tuple(
+		LinePlan(name=l.name, kW=l.kW, throughput_per_day=l.throughput_per_day, unit=l.unit, availability=l.reliability.availability(failure_scale) if l.reliability else 1.0,
+			mtbf_h=l.reliability.mtbf_h if l.reliability else None, mttr_h=l.reliability.mttr_h if l.reliability else None)
+		for l in build_lines_from_config(nodes).values()
+	)
+	flows = FlowNetwork.from_config(nodes, cfg.factories.edges, {l.name: l.throughput_per_day for l in lines})
+	rep = cfg.factories.replication
+	max_growth = cfg.caps.max_growth_multiplier
+	mix = [(name, f, cfg.collectors.collector_types[name]) for name, f, _ in collector_mix(scenario)]
+	base_eff = _mix_mean(mix, "efficiency_1AU", 0.25)
+	snapshots = tuple(sorted(set(cfg.vintage_snapshot_days)))
+	if snapshots and not 0 <= snapshots[0] <= snapshots[-1] < cfg.horizon_years * 365:
+		raise ValueError(f"vintage_snapshot_days must lie in [0, {cfg.horizon_years * 365 - 1}]")
+	launcher = mercury_mass_driver(vehicles)
+	fleet_MW, area_per_MW_per_day = transport_limits(scenario)
+	bands, band_means, w = resolve_bands(scenario)
+	grid = cfg.launch_strategy.radial_grid
+	return ScenarioPlan(
+		name=cfg.name,
+		seed=cfg.seed,
+		horizon_days=cfg.horizon_years * 365,
+		phase0_days=cfg.phases.phase0_days,
+		phase1_days=cfg.phases.phase1_days,
+		phase2_days=cfg.phases.phase2_days,
+		uptime=cfg.production.uptime_fraction,
+		learning_b=cfg.production.learning_curve_b,
+		lines=lines,
+		flows=flows,
+		factory_kit_mass_kg=rep.factory_kit_mass_kg,
+		replication_factor=rep.replication_factor,
+		replication_cycle_days=rep.replication_cycle_days,
+		max_growth_multiplier=float(max_growth) if (max_growth is not None and max_growth > 0) else float("inf"),
+		md_duration_days=float(nodes.get("mass_driver_build", {}).get("duration_days", 120.0)),
+		resource_limit_kg=usable_mass_limit_kg(bodies),
+		reliability_mode=cfg.reliability_mode,
+		failure_rate_scale=cfg.uncertainty.failure_rate_scale,
+		pv_efficiency_sigma=cfg.uncertainty.pv_efficiency_sigma,
+		yield_sigma=cfg.uncertainty.yield_sigma,
+		collector_mix=tuple((name, f) for name, f, _ in mix),
+		collector_areal_density_kg_m2=_mix_mean(mix, "areal_density_kg_m2", 0.15),
+		launch_system=launcher.name,
+		launch_cadence_per_day=launcher.cadence_per_day(failure_scale),
+		launch_cadence_base_per_day=launcher.base_cadence_per_day(),
+		md_mtbf_h=launcher.reliability.mtbf_h if launcher.reliability else None,
+		md_mttr_h=launcher.reliability.mttr_h if launcher.reliability else None,
+		cadence_cap=cfg.launch_strategy.cadence_per_day,
+		# Packages hold one type each, so the mean area per package is the harmonic mix mean
+		package_area_m2=1.0 / sum(f / c.area_m2 for _, f, c in mix) if len(mix) > 1 else (mix[0][2].area_m2 if mix else 5000.0),
+		fleet_MW=fleet_MW,
+		area_per_MW_per_day=area_per_MW_per_day,
+		band_means=tuple(float(a) for a in band_means),
+		band_weights=tuple(w.tolist()),
+		band_sphere_area_m2=tuple(4.0 * np.pi * (a ** 2) * (AU_M ** 2) for a in band_means),
+		band_irradiance_W_m2=tuple(SOLAR_CONSTANT_1AU_W_M2 / (a ** 2) for a in band_means),
+		shell_edges_AU=(bands[0].amin_AU, *(b.amax_AU for b in bands)) if grid is not None else (),
+		od_cap=cfg.targets.optical_depth_max,
+		base_eff_1au=base_eff,
+		degradation=tuple((f * c.efficiency_1AU / base_eff if base_eff > 0 else f, c.degradation_per_year) for _, f, c in mix) or ((1.0, 0.0),),
+		thermal_derate=thermal_derate(scenario),
+		beaming_chain=beaming_chain(scenario),
+		target_area_m2=cfg.targets.total_collector_area_m2,
+		output_every_days=cfg.output_every_days,
+		vintage_snapshot_days=snapshots,
+	)
+
+
+def _mix_mean(mix, key: str, default: float) -> float:
+	"""Area-weighted mean of a `CollectorType` attribute over the mix."""
+	if not mix:
+		return default
+	return getattr(mix[0][2], key) if len(mix) == 1 else sum(f * getattr(c, key) for _, f, c in mix)
@@ -0,0 +1,76 @@
+"""Preallocated columnar storage for the daily timeseries."""
+from __future__ import annotations
+from typing import Dict, Any
+import numpy as np
+import pandas as pd
+
+# Column order and dtype of the daily timeseries (per-band columns follow)
+TIMESERIES_COLUMNS = (
+	("day", np.int64),
+	("phase", np.int64),
+	("pv_m2", np.float64),
+	("structure_kg", np.float64),
+	("launched_m2", np.float64),
+	("cum_area_m2", np.float64),
+	("optical_depth", np.float64),
+	("power_GW_1AU_equiv", np.float64),
+	# Float: uncapped replication grows the count past the int64 range
+	("mass_drivers_online", np.float64),
+	("energy_kWh", np.float64),
+	("resource_remaining_kg", np.float64),
+	("used_mass_kg_day", np.float64),
+	("transport_MW_used", np.float64),
+	("transport_MWh", np.float64),
+)
+
+
+def frame_from_columns(columns: Dict[str, np.ndarray], band_area: np.ndarray, band_od: np.ndarray) -> pd.DataFrame:
+	"""Wrap column arrays (and `(bands, days)` band blocks) in a DataFrame without copying them."""
+	cols: Dict[str, Any] = {name: columns[name] for name, _ in TIMESERIES_COLUMNS}
+	for i in range(band_area.shape[0]):
+		cols[f"band_{i}_area_m2"] = band_area[i]
+	for i in range(band_od.shape[0]):
+		cols[f"band_{i}_od"] = band_od[i]
+	return pd.DataFrame(cols, copy=False)
+
+
+class TimeseriesRecorder:
+	"""One typed NumPy column per metric, written by day index.
+
+	Band metrics live in `(bands, days)` blocks so every band column is
+	contiguous; `band_area`/`band_od` expose them as `(days, bands)` views.
+	Engines write only the columns and fill the blocks with `fill_bands`.
+	"""
+
+	def __init__(self, n_days: int, n_bands: int):
+		self.n_days = n_days
+		self.n_bands = n_bands
+		self.columns: Dict[str, np.ndarray] = {name: np.zeros(n_days, dtype=dtype) for name, dtype in TIMESERIES_COLUMNS}
+		self.band_area_T = np.zeros((n_bands, n_days))
+		self.band_od_T = np.zeros((n_bands, n_days))
+		self.rows = 0
+
+	@property
+	def band_area(self) -> np.ndarray:
+		return self.band_area_T[:, :self.rows].T
+
+	@property
+	def band_od(self) -> np.ndarray:
+		return self.band_od_T[:, :self.rows].T
+
+	def fill_bands(self, plan) -> None:
+		"""Derive the band blocks of the recorded rows from `cum_area_m2` (`ScenarioPlan.band_blocks`)."""
+		n = self.rows
+		self.band_area_T[:, :n], self.band_od_T[:, :n] = plan.band_blocks(self.columns["cum_area_m2"][:n])
+
+	def nbytes(self) -> int:
+		return sum(c.nbytes for c in self.columns.values()) + self.band_area_T.nbytes + self.band_od_T.nbytes
+
+	def arrays(self) -> tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray]:
+		"""Views of the recorded rows: (columns, `(bands, rows)` band area, band OD)."""
+		n = self.rows
+		return {k: v[:n] for k, v in self.columns.items()}, self.band_area_T[:, :n], self.band_od_T[:, :n]
+
+	def to_frame(self) -> pd.DataFrame:
+		"""DataFrame over the recorded rows; shares memory with the recorder."""
+		return frame_from_columns(*self.arrays())
@@ -0,0 +1,164 @@
+"""Figure render stage.
+
+Figures are drawn with matplotlib's object-oriented API (`Figure` +
+Agg canvas, no pyplot state), so runs can be rendered in parallel worker
+processes. Rendering can happen inside `write_outputs` (output kind "plots") or
+later from saved run directories (`render_runs`, CLI `render`). Every series is
+decimated with largest-triangle-three-buckets to about two points per pixel
+of figure width before plotting.
+"""
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Mapping, Sequence
+import numpy as np
+
+FIGSIZE = (9, 4.8)
+DPI = 150
+STYLE = "seaborn-v0_8-darkgrid"
+# Two points per horizontal pixel keeps peaks visible after decimation
+DEFAULT_MAX_POINTS = 2 * int(FIGSIZE[0] * DPI)
+FIGURE_COLUMNS = ("day", "cum_area_m2", "power_GW_1AU_equiv", "launched_m2", "mass_drivers_online")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+	"""Indices of the `n_out` points largest-triangle-three-buckets keeps (all points if fewer)."""
+	n = len(x)
+	if n_out >= n or n_out < 3:
+		return np.arange(n)
+	# n_out - 2 interior buckets over points 1..n-2; first and last points always kept
+	edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+	idx = np.empty(n_out, dtype=np.int64)
+	idx[0], idx[-1] = 0, n - 1
+	a = 0
+	for i in range(n_out - 2):
+		lo, hi = edges[i], edges[i + 1]
+		nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+		avg_x = x[nlo:nhi].mean()
+		avg_y = y[nlo:nhi].mean()
+		ax, ay = x[a], y[a]
+		area = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay))
+		a = lo + int(np.argmax(area))
+		idx[i + 1] = a
+	return idx
+
+
+def _decimate(x: np.ndarray, y: np.ndarray, max_points: int | None) -> tuple[np.ndarray, np.ndarray]:
+	if not max_points:
+		return x, y
+	idx = lttb(x, y, max_points)
+	return x[idx], y[idx]
+
+
+def _new_axes():
+	from matplotlib.figure import Figure
+	from matplotlib.backends.backend_agg import FigureCanvasAgg
+	fig = Figure(figsize=FIGSIZE)
+	FigureCanvasAgg(fig)
+	return fig, fig.add_subplot()
+
+
+def _save(fig, path: Path) -> Path:
+	fig.tight_layout()
+	fig.savefig(path, dpi=DPI)
+	return path
+
+
+def render_figures(ts: Mapping[str, Any], fig_dir: Path, max_points: int | None = DEFAULT_MAX_POINTS) -> List[Path]:
+	"""Draw the standard run figures from timeseries columns into `fig_dir`; returns the written paths."""
+	import matplotlib.style
+	import matplotlib.ticker as mticker
+	fig_dir.mkdir(parents=True, exist_ok=True)
+	col = lambda c: np.asarray(ts[c], dtype=float)
+	years = col("day") / 365.0
+	written: List[Path] = []
+	with matplotlib.style.context(STYLE):
+		fig, ax = _new_axes()
+		ax.plot(*_decimate(years, col("cum_area_m2") / 1e6, max_points))
+		ax.set_xlabel("Years")
+		ax.set_ylabel("Cumulative area (km^2)")
+		ax.grid(True)
+		written.append(_save(fig, fig_dir / "area_vs_time.png"))
+
+		fig, ax = _new_axes()
+		ax.plot(*_decimate(years, col("power_GW_1AU_equiv"), max_points))
+		ax.set_xlabel("Years")
+		ax.set_ylabel("Power (GW @1AU)")
+		ax.grid(True)
+		written.append(_save(fig, fig_dir / "power_vs_time.png"))
+
+		# Optional: per-band area if present
+		band_cols = sorted(c for c in ts.keys() if c.startswith("band_") and c.endswith("_area_m2"))
+		if band_cols:
+			fig, ax = _new_axes()
+			for c in band_cols:
+				ax.plot(*_decimate(years, col(c) / 1e6, max_points), label=c)
+			ax.set_xlabel("Years")
+			ax.set_ylabel("Band cumulative area (km^2)")
+			ax.legend(loc="best", fontsize=8)
+			ax.grid(True)
+			written.append(_save(fig, fig_dir / "band_areas_vs_time.png"))
+
+		# Launched area per day (cadence proxy)
+		fig, ax = _new_axes()
+		ax.plot(*_decimate(years, col("launched_m2") / 1e6, max_points))
+		ax.ticklabel_format(style="plain", axis="y", useOffset=False, scilimits=(0,0))
+		ax.set_xlabel("Years")
+		ax.set_ylabel("Launched area per day (km^2/day)")
+		ax.grid(True)
+		written.append(_save(fig, fig_dir / "launch_cadence_vs_time.png"))
+
+		# Mass drivers online over time
+		if "mass_drivers_online" in ts.keys():
+			y_md = col("mass_drivers_online")
+			scale = 1.0
+			y_label = "Mass drivers online"
+			if len(y_md) and y_md.max() >= 1e6:
+				scale = 1e6
+				y_label += " (millions)"
+			fig, ax = _new_axes()
+			ax.step(*_decimate(years, y_md / scale, max_points), where="post")
+			ax.ticklabel_format(style="plain", axis="y", useOffset=False, scilimits=(0,0))
+			if scale == 1.0:
+				ax.yaxis.set_major_locator(mticker.MaxNLocator(integer=True))
+			ax.set_xlabel("Years")
+			ax.set_ylabel(y_label)
+			ax.grid(True)
+			written.append(_save(fig, fig_dir / "mass_drivers_vs_time.png"))
+	return written
+
+
+def load_timeseries(run_dir: Path) -> Dict[str, np.ndarray]:
+	"""Columns the figures need from a saved run (parquet if present, else CSV)."""
+	import pandas as pd
+	wanted = lambda c: c in FIGURE_COLUMNS or (c.startswith("band_") and c.endswith("_area_m2"))
+	pq = run_dir / "timeseries.parquet"
+	if pq.exists():
+		try:
+			df = pd.read_parquet(pq)
+			return {c: df[c].to_numpy() for c in df.columns if wanted(c)}
+		except Exception:
+			pass
+	df = pd.read_csv(run_dir / "timeseries.csv", usecols=wanted)
+	return {c: df[c].to_numpy() for c in df.columns}
+
+
+def render_run(run_dir: str | Path, max_points: int | None = DEFAULT_MAX_POINTS) -> List[str]:
+	"""Render figures for one saved run directory into its `figs/`."""
+	run_dir = Path(run_dir)
+	return [str(p) for p in render_figures(load_timeseries(run_dir), run_dir / "figs", max_points)]
+
+
+def _render_run_args(args: tuple) -> List[str]:
+	return render_run(*args)
+
+
+def render_runs(run_dirs: Sequence[str | Path], jobs: int = 1, max_points: int | None = DEFAULT_MAX_POINTS) -> List[List[str]]:
+	"""Deferred render stage: figures for many saved runs, optionally in a process pool."""
+	from .runner import resolve_jobs
+	work = [(str(d), max_points) for d in run_dirs]
+	jobs = min(resolve_jobs(jobs), max(1, len(work)))
+	if jobs == 1:
+		return [_render_run_args(w) for w in work]
+	with ProcessPoolExecutor(max_workers=jobs) as pool:
+		return list(pool.map(_render_run_args, work))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Sequence, Tuple
+import os
+from tqdm import tqdm
+from ..config import make_rng
+from . import OUTPUT_KINDS
+from .cache import CacheStats, RunCache
+from .catalog import CATALOG
+from .scenarios import build_scenario, load_base_data
+from .checkpoint import Checkpoint, CheckpointPolicy
+from .engine import run_simulation
+from .outputs import write_outputs
+from .store import write_timeseries_part
+from .streaming import run_streaming
+from .trajectory import TRAJECTORIES, with_post
+
+
+@dataclass(frozen=True)
+class RunTask:
+	"""One independent run: config, output directory, RNG stream (None = the seed's root stream), output kinds
+	and, for streaming runs, the day-chunk size. `resume` is a checkpoint file to continue or fork from;
+	`checkpoint_every` writes checkpoints to `out_dir/checkpoints/`. With `reuse_trajectory` the run is
+	evaluated from this process's cached deployment trajectory (`ds.sim.trajectory`) when one matches. With a
+	`cache` (`ds.sim.cache.RunCache`), in-memory runs without checkpoints are looked up there first.
+	`store_part` is the (Parquet path, run id) of the run's timeseries in a `ds.sim.store.ResultsStore`."""
+	cfg: Dict[str, Any]
+	out_dir: str
+	stream: int | None = None
+	outputs: Tuple[str, ...] = OUTPUT_KINDS
+	chunk_days: int | None = None
+	resume: str | None = None
+	checkpoint_every: int | None = None
+	reuse_trajectory: bool = False
+	cache: RunCache | None = None
+	store_part: Tuple[str, str] | None = None
+
+
+def execute(task: RunTask) -> Dict[str, Any]:
+	"""Build, run and write one task; returns its summary."""
+	return _execute(task)[0]
+
+
+def _execute(task: RunTask) -> Tuple[Dict[str, Any], CacheStats]:
+	"""Summary and cache statistics of one task. Runs in worker processes."""
+	scenario = build_scenario(task.cfg)
+	rng = make_rng(task.cfg.get("seed", 0), task.stream)
+	if task.chunk_days:
+		return run_streaming(scenario, Path(task.out_dir), rng=rng, outputs=task.outputs, chunk_days=task.chunk_days)["summary"], CacheStats()
+	stats = CacheStats()
+	if task.reuse_trajectory:
+		results = with_post(TRAJECTORIES.get(scenario), scenario)
+	elif task.resume or task.checkpoint_every:
+		resume = Checkpoint.load(task.resume) if task.resume else None
+		checkpoints = CheckpointPolicy(Path(task.out_dir) / "checkpoints", every_days=task.checkpoint_every) if task.checkpoint_every else None
+		results = run_simulation(scenario, rng=rng, resume=resume, checkpoints=checkpoints)
+	elif task.cache is not None:
+		results, stats = task.cache.fetch(scenario, task.stream, lambda: run_simulation(scenario, rng=rng))
+	else:
+		results = run_simulation(scenario, rng=rng)
+	write_outputs(results, Path(task.out_dir), task.outputs)
+	if task.store_part:
+		write_timeseries_part(results["timeseries"], *task.store_part)
+	return results["summary"], stats
+
+
+def _init_worker(catalog_entries: Dict[str, Any]) -> None:
+	# Workers reuse the parent's parsed base data instead of re-reading the files
+	CATALOG.install(catalog_entries)
+
+
+def resolve_jobs(jobs: int) -> int:
+	"""`jobs <= 0` means one worker per CPU."""
+	return max(1, os.cpu_count() or 1) if jobs <= 0 else jobs
+
+
+def map_jobs(fn: Callable[[Any], Any], items: Sequence[Any], jobs: int = 1, desc: str = "Runs") -> List[Any]:
+	"""`fn` over `items` serially or in a process pool sharing the parent's base data; results in item order.
+
+	`fn` must be a module-level function (picklable).
+	"""
+	jobs = min(resolve_jobs(jobs), max(1, len(items)))
+	if jobs == 1:
+		return [fn(t) for t in tqdm(items, desc=desc)]
+	load_base_data()
+	with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(CATALOG.snapshot(),)) as pool:
+		return list(tqdm(pool.map(fn, items), total=len(items), desc=desc))
+
+
+def run_tasks(tasks: Sequence[RunTask], jobs: int = 1, desc: str = "Runs", stats: CacheStats | None = None) -> List[Dict[str, Any]]:
+	"""Execute tasks serially or in a process pool; summaries come back in task order.
+
+	Cache hits and misses of the tasks are added to `stats`.
+	"""
+	out = map_jobs(_execute, tasks, jobs=jobs, desc=desc)
+	if stats is not None:
+		for _, s in out:
+			stats.add(s)
+	return [summary for summary, _ in out]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+
+class Section(BaseModel):
+	# Scenario files carry descriptive keys the model does not read; keep them
+	model_config = ConfigDict(extra="allow")
+
+
+class PhasesCfg(Section):
+	phase0_days: int = Field(365, ge=0)
+	phase1_days: int = Field(3 * 365, ge=0)
+	phase2_days: int = Field(21 * 365, ge=0)
+
+
+class ProductionCfg(Section):
+	uptime_fraction: float = Field(0.85, ge=0.0, le=1.0)
+	learning_curve_b: float = 0.85
+
+
+class CapsCfg(Section):
+	max_growth_multiplier: Optional[float] = None
+
+
+class UncertaintyCfg(Section):
+	# Absolute sd of the collector efficiency and log-sd of line yields, sampled by `ds.sim.montecarlo`
+	pv_efficiency_sigma: float = Field(0.0, ge=0.0)
+	yield_sigma: float = Field(0.0, ge=0.0)
+	# Multiplies every MTBF-derived failure rate: stochastic draws, and steady-state availability in `--mc` replicates
+	failure_rate_scale: float = Field(1.0, ge=0.0)
+
+
+class TargetsCfg(Section):
+	total_collector_area_m2: float = Field(0.0, ge=0.0)
+	optical_depth_max: float = Field(1.0, ge=0.0)
+
+
+class TransportCfg(Section):
+	fleet_power_MW: Optional[float] = Field(None, ge=0.0)
+	area_per_MW_per_day: float = Field(1.0e4, ge=0.0)
+
+
+class RadialGridCfg(Section):
+	r_min_AU: float = Field(gt=0.0)
+	r_max_AU: float = Field(gt=0.0)
+	shells: int = Field(ge=1, le=1_000_000)
+	# Radius distribution ({dist, ...} as in monte_carlo.distributions) or piecewise-linear [[r_AU, weight], ...]
+	distribution: Optional[Dict[str, Any]] = None
+	profile: Optional[List[Tuple[float, float]]] = None
+
+
+class LaunchStrategyCfg(Section):
+	cadence_per_day: float = Field(1e9, ge=0.0)
+	target_a_AU_range: Tuple[float, float] = (0.35, 0.45)
+	target_bands_AU: Optional[List[Tuple[float, float]]] = None
+	band_weights: Optional[List[float]] = None
+	# Area fraction per collector type (normalized); default: the first collector type only
+	collector_mix: Optional[Dict[str, float]] = None
+	# Many thin shells instead of the bands (`ds.sim.shells`)
+	radial_grid: Optional[RadialGridCfg] = None
+
+
+class BeamingCfg(Section):
+	tx_conversion: float = Field(0.85, ge=0.0, le=1.0)
+	pointing: float = Field(0.97, ge=0.0, le=1.0)
+	rx_conversion: float = Field(0.85, ge=0.0, le=1.0)
+	earth_atmosphere: float = Field(0.92, ge=0.0, le=1.0)
+
+
+class MercurySiteCfg(Section):
+	radiator_area_m2: float = Field(1e5, ge=0.0)
+
+
+class ReplicationCfg(Section):
+	factory_kit_mass_kg: float = Field(ge=0.0)
+	replication_factor: float = Field(gt=0.0)
+	replication_cycle_days: float = Field(gt=0.0)
+
+
+class FactoriesFile(Section):
+	nodes: Dict[str, Dict]
+	# [from, to] orders the graph; [from, to, rate] also consumes `rate` of from's product per unit of to's throughput
+	edges: List[Tuple[str, str] | Tuple[str, str, float]] = []
+	replication: ReplicationCfg
+
+
+class CollectorType(Section):
+	area_m2: float = Field(5000.0, gt=0.0)
+	areal_density_kg_m2: float = Field(0.15, ge=0.0)
+	efficiency_1AU: float = Field(0.25, ge=0.0, le=1.0)
+	degradation_per_year: float = Field(0.0, ge=0.0, le=1.0)
+
+
+class CollectorsFile(Section):
+	collector_types: Dict[str, CollectorType] = {}
+
+
+class ScenarioCfg(Section):
+	"""Sections of a built scenario the model reads, with their defaults and valid ranges."""
+	name: str = "scenario"
+	seed: int = 0
+	horizon_years: int = Field(25, ge=1)
+	# Timeseries row spacing of the adaptive engine (the daily engines always write every day)
+	output_every_days: int = Field(1, ge=1)
+	# Days at which `vintages.csv` reports area by launch year (`ds.sim.vintage`)
+	vintage_snapshot_days: List[int] = []
+	reliability_mode: Literal["expected", "stochastic"] = "expected"
+	phases: PhasesCfg = PhasesCfg()
+	production: ProductionCfg = ProductionCfg()
+	caps: CapsCfg = CapsCfg()
+	uncertainty: UncertaintyCfg = UncertaintyCfg()
+	targets: TargetsCfg = TargetsCfg()
+	transport: TransportCfg = TransportCfg()
+	launch_strategy: LaunchStrategyCfg = LaunchStrategyCfg()
+	beaming: BeamingCfg = BeamingCfg()
+	mercury_site: MercurySiteCfg = MercurySiteCfg()
+	factories: FactoriesFile
+	collectors: CollectorsFile = CollectorsFile()
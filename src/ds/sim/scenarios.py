@@ -2,25 +2,19 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Dict, Any
 import yaml
-from ..bodies.loaders import load_json
+from .catalog import load_data
 
+DATA_DIR = Path(__file__).resolve().parents[3] / "data" # git/data
+BASE_DATA_FILES = ("bodies", "materials", "factories", "vehicles", "collectors")
+_BASE_PATHS = tuple((name, str(DATA_DIR / f"{name}.json")) for name in BASE_DATA_FILES)
 
-def build_scenario(cfg: Dict[str, Any]) -> Dict[str, Any]:
-	root = Path(__file__).resolve().parents[3] # git/
+
+def load_base_data() -> Dict[str, Any]:
+	"""Read-only base data sections, parsed once per process (see `ds.sim.catalog`)."""
+	return {name: load_data(path) for name, path in _BASE_PATHS}
 
 
-	data_dir = root / "data"
-	bodies = load_json(data_dir / "bodies.json")
-	materials = load_json(data_dir / "materials.json")
-	factories = load_json(data_dir / "factories.json")
-	vehicles = load_json(data_dir / "vehicles.json")
-	collectors = load_json(data_dir / "collectors.json")
+def build_scenario(cfg: Dict[str, Any]) -> Dict[str, Any]:
 	scenario = dict(cfg)
-	scenario.update({
-		"bodies": bodies,
-		"materials": materials,
-		"factories": factories,
-		"vehicles": vehicles,
-		"collectors": collectors,
-	})
+	scenario.update(load_base_data())
 	return scenario
@@ -0,0 +1,154 @@
+"""Global sensitivity analysis: Sobol indices from a Saltelli design.
+
+With d parameters and N base samples, the design has N * (d + 2) points.
+Those are matrices A and B of independent samples, plus A with column i
+taken from B for each i. Every point is scored by `batch_outcomes`, which
+skips summary building. Points are split into chunks that run as batched
+array computations, spread over worker processes with `jobs`.
+
+First-order indices use the Saltelli (2010) estimator and total indices the
+Jansen estimator. Confidence intervals come from a bootstrap over the N base
+rows.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Sequence, Tuple
+import warnings
+import numpy as np
+from ..config import shared_overrides
+from .batch import OUTCOMES, batch_outcomes, scenario_params
+from .designs import SOBOL_MAX_DIMS, ParamSpec, sobol
+from .runner import map_jobs, resolve_jobs
+
+DEFAULT_METRICS = ("years_to_target", "delivered_power_GW_at_1AU_equiv")
+# Design points per worker task (each task is one set of batched array computations)
+CHUNK_POINTS = 2048
+
+
+@dataclass(frozen=True)
+class SensitivitySpec:
+	params: Sequence[ParamSpec]
+	samples: int
+	metrics: Tuple[str, ...] = DEFAULT_METRICS
+	bootstrap: int = 200
+	confidence: float = 0.95
+	seed: int = 0
+
+	@classmethod
+	def from_dict(cls, d: Dict[str, Any]) -> "SensitivitySpec":
+		params_cfg = d.get("parameters")
+		if not isinstance(params_cfg, dict) or len(params_cfg) < 2:
+			raise ValueError("Sensitivity spec needs a 'parameters' mapping of at least two dotted keys")
+		params = [ParamSpec.from_dict(k, v) for k, v in params_cfg.items()]
+		metrics = tuple(d.get("metrics", DEFAULT_METRICS))
+		unknown = [m for m in metrics if m not in OUTCOMES]
+		if unknown:
+			raise ValueError(f"Unknown sensitivity metrics {unknown}; expected some of {OUTCOMES}")
+		spec = cls(params=params, samples=int(d.get("samples", 1024)), metrics=metrics, bootstrap=int(d.get("bootstrap", 200)),
+			confidence=float(d.get("confidence", 0.95)), seed=int(d.get("seed", 0)))
+		if spec.samples < 2 or spec.bootstrap < 0 or not 0.0 < spec.confidence < 1.0:
+			raise ValueError("Sensitivity spec needs samples >= 2, bootstrap >= 0 and 0 < confidence < 1")
+		return spec
+
+
+def saltelli_design(n: int, d: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""Unit-cube matrices A, B `(n, d)` and AB `(d, n, d)` (A with column i from B).
+
+	A and B are the two halves of a 2d-dimensional Sobol sequence, or
+	uniform random draws beyond `SOBOL_MAX_DIMS`.
+	"""
+	if 2 * d <= SOBOL_MAX_DIMS:
+		base = sobol(n, 2 * d, skip=1)
+	else:
+		base = np.random.default_rng(seed).random((n, 2 * d))
+	A, B = base[:, :d], base[:, d:]
+	AB = np.repeat(A[None], d, axis=0)
+	for i in range(d):
+		AB[i, :, i] = B[:, i]
+	return A, B, AB
+
+
+def _evaluate_chunk(task: Tuple[Dict[str, Any], Tuple[str, ...], List[tuple]]) -> Dict[str, np.ndarray]:
+	"""`batch_outcomes` of one chunk of design points (runs in worker processes)."""
+	scenario, keys, rows = task
+	return batch_outcomes([scenario_params(shared_overrides(scenario, dict(zip(keys, row)))) for row in rows])
+
+
+def evaluate_points(scenario: Dict[str, Any], keys: Sequence[str], rows: Sequence[tuple], jobs: int = 1) -> Dict[str, np.ndarray]:
+	"""`OUTCOMES` of a built scenario at each row of override values, in chunks of at most `CHUNK_POINTS` (one per worker or more)."""
+	size = min(CHUNK_POINTS, -(-len(rows) // resolve_jobs(jobs)))
+	tasks = [(scenario, tuple(keys), list(rows[i:i + size])) for i in range(0, len(rows), size)]
+	parts = map_jobs(_evaluate_chunk, tasks, jobs=jobs, desc="Sensitivity chunks")
+	return {m: np.concatenate([p[m] for p in parts]) for m in OUTCOMES}
+
+
+def sobol_indices(fA: np.ndarray, fB: np.ndarray, fAB: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+	"""First-order and total indices per parameter from `(n,)` fA, fB and `(d, n)` fAB.
+
+	The last axis holds the samples, so a leading bootstrap axis broadcasts.
+	"""
+	var = np.concatenate([fA, fB], axis=-1).var(axis=-1)
+	var = np.where(var > 0, var, np.nan)
+	first = (fB[..., None, :] * (fAB - fA[..., None, :])).mean(axis=-1) / var[..., None]
+	total = 0.5 * ((fA[..., None, :] - fAB) ** 2).mean(axis=-1) / var[..., None]
+	return first, total
+
+
+@dataclass
+class SensitivityResults:
+	spec: SensitivitySpec
+	# Long table rows: metric, parameter, S1/ST with CI bounds
+	indices: List[Dict[str, Any]]
+	# Every design point with its inputs and metrics
+	evaluations: Dict[str, np.ndarray]
+
+
+def run_sensitivity(scenario: Dict[str, Any], spec: SensitivitySpec, jobs: int = 1) -> SensitivityResults:
+	"""Evaluate the Saltelli design of `spec` on a built scenario and estimate Sobol indices per metric.
+
+	`years_to_target` of points that never meet the target counts as the
+	horizon, so the index describes the censored time to target. A metric
+	that does not vary over the design gets NaN indices and a warning.
+	"""
+	keys = [p.key for p in spec.params]
+	d, n = len(keys), spec.samples
+	A, B, AB = saltelli_design(n, d, spec.seed)
+	unit = np.concatenate([A, B, AB.reshape(d * n, d)])
+	cols = [p.from_unit(unit[:, j]) for j, p in enumerate(spec.params)]
+	rows = [tuple(c[i].item() if isinstance(c[i], np.generic) else c[i] for c in cols) for i in range(len(unit))]
+	out = evaluate_points(scenario, keys, rows, jobs=jobs)
+	horizon_years = float(scenario.get("horizon_years", 25))
+	rng = np.random.default_rng(spec.seed)
+	boot = rng.integers(0, n, size=(spec.bootstrap, n))
+	alpha = 0.5 * (1.0 - spec.confidence)
+	indices: List[Dict[str, Any]] = []
+	for m in spec.metrics:
+		f = out[m]
+		if m == "years_to_target":
+			f = np.minimum(f, horizon_years)
+		if not np.isfinite(f).all():
+			raise ValueError(f"Metric {m} is not finite at every design point")
+		fA, fB, fAB = f[:n], f[n:2 * n], f[2 * n:].reshape(d, n)
+		constant = not np.concatenate([fA, fB]).var() > 0
+		if constant:
+			warnings.warn(f"Metric {m} has zero variance over the design; its Sobol indices are undefined (NaN)", stacklevel=2)
+		first, total = sobol_indices(fA, fB, fAB)
+		if spec.bootstrap and not constant:
+			bf, bt = sobol_indices(fA[boot], fB[boot], fAB[:, boot].transpose(1, 0, 2))
+			f_lo, f_hi = np.nanquantile(bf, [alpha, 1.0 - alpha], axis=0)
+			t_lo, t_hi = np.nanquantile(bt, [alpha, 1.0 - alpha], axis=0)
+		else:
+			f_lo = f_hi = t_lo = t_hi = np.full(d, np.nan)
+		for i, key in enumerate(keys):
+			indices.append({"metric": m, "parameter": key, "S1": first[i], "S1_lo": f_lo[i], "S1_hi": f_hi[i], "ST": total[i], "ST_lo": t_lo[i], "ST_hi": t_hi[i]})
+	evaluations = {"point_id": np.arange(len(rows)), **{k: np.asarray(c) for k, c in zip(keys, cols)}, **out}
+	return SensitivityResults(spec=spec, indices=indices, evaluations=evaluations)
+
+
+def write_sensitivity(results: SensitivityResults, out_dir: Path) -> None:
+	"""`sobol_indices.csv` (one row per metric and parameter) and `evaluations.csv` (every design point)."""
+	import pandas as pd
+	out_dir.mkdir(parents=True, exist_ok=True)
+	pd.DataFrame(results.indices).to_csv(out_dir / "sobol_indices.csv", index=False)
+	pd.DataFrame(results.evaluations).to_csv(out_dir / "evaluations.csv", index=False)
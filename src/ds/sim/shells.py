@@ -0,0 +1,169 @@
+"""Radial shell grid: deployment over many thin shells.
+
+`launch_strategy.radial_grid` replaces the deployment bands with `shells`
+equal-width shells between `r_min_AU` and `r_max_AU`. A shell's weight is the
+probability a radius `distribution` (one of `ds.sim.montecarlo.DISTRIBUTIONS`
+other than `choice`) puts in it, or the integral of a piecewise-linear
+`profile` `[[r_AU, weight], ...]` over it. Without either, every shell weighs
+the same.
+
+Every shell receives the same fraction of each day's area, so shell area is
+`weight * cum_area_m2`. The engines therefore carry only the deployed total
+and two aggregates of the grid (`ScenarioPlan.irradiance_weighted`,
+`ScenarioPlan.od_factor`). A day costs the same for three shells or three
+thousand, and the timeseries gets no per-shell columns. The per-shell output
+is a `(days, shells)` matrix `shells/area_m2.npy`, written in row chunks
+through a memory map (`ShellWriter`). Next to it are `grid.csv` (radii,
+weight, sphere area and irradiance per shell), `day.npy` and the total
+`power_GW.npy`. `load_shells` maps the matrix back without reading it; OD and
+power per shell are derived from the area for any row slice.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Tuple
+import numpy as np
+import pandas as pd
+from ..physics.constants import AU_M, SOLAR_CONSTANT_1AU_W_M2
+from .scenario_schema import RadialGridCfg
+
+# Matrix elements written per block (32 MB of float64)
+BLOCK_ELEMENTS = 1 << 22
+
+
+def radial_shells(grid: Dict[str, Any] | RadialGridCfg) -> Tuple[np.ndarray, np.ndarray]:
+	"""(shell edges in AU, normalized shell weights) of a `launch_strategy.radial_grid` block."""
+	cfg = grid if isinstance(grid, RadialGridCfg) else RadialGridCfg.model_validate(grid)
+	if cfg.r_max_AU <= cfg.r_min_AU:
+		raise ValueError("launch_strategy.radial_grid needs r_min_AU < r_max_AU")
+	if cfg.distribution is not None and cfg.profile is not None:
+		raise ValueError("launch_strategy.radial_grid takes a distribution or a profile, not both")
+	edges = np.linspace(cfg.r_min_AU, cfg.r_max_AU, cfg.shells + 1)
+	if cfg.distribution is not None:
+		from .montecarlo import Distribution
+		mass = np.diff(Distribution.from_dict("launch_strategy.radial_grid.distribution", cfg.distribution).cdf(edges))
+	elif cfg.profile is not None:
+		mass = _profile_mass(cfg.profile, edges)
+	else:
+		mass = np.ones(cfg.shells)
+	total = mass.sum()
+	if not total > 0:
+		raise ValueError(f"launch_strategy.radial_grid puts no weight between {cfg.r_min_AU} and {cfg.r_max_AU} AU")
+	return edges, mass / total
+
+
+def _profile_mass(profile, edges: np.ndarray) -> np.ndarray:
+	"""Integral over each shell of the piecewise-linear profile (zero outside its radii)."""
+	r = np.array([p[0] for p in profile], dtype=float)
+	v = np.array([p[1] for p in profile], dtype=float)
+	if len(r) < 2 or (np.diff(r) <= 0).any() or (v < 0).any():
+		raise ValueError("launch_strategy.radial_grid.profile needs two or more increasing radii with non-negative weights")
+	at = np.clip(edges, r[0], r[-1])
+	x = np.union1d(r, at)
+	y = np.interp(x, r, v)
+	cum = np.concatenate(([0.0], np.cumsum(np.diff(x) * (y[1:] + y[:-1]) * 0.5)))
+	return np.diff(np.interp(at, x, cum))
+
+
+def grid_table(plan) -> pd.DataFrame | None:
+	"""Per-shell radii, weight, sphere area and irradiance of a radial-grid plan (None for bands)."""
+	if not plan.shell_edges_AU:
+		return None
+	edges = np.array(plan.shell_edges_AU)
+	return pd.DataFrame({
+		"r_inner_AU": edges[:-1],
+		"r_outer_AU": edges[1:],
+		"a_AU_mean": plan.band_means,
+		"weight": plan.band_weights,
+		"sphere_area_m2": plan.band_sphere_area_m2,
+		"irradiance_W_m2": plan.band_irradiance_W_m2,
+	})
+
+
+class ShellWriter:
+	"""Writes the shell matrix of `rows` days into `out_dir` as timeseries chunks arrive."""
+
+	def __init__(self, out_dir: Path, grid: pd.DataFrame, rows: int):
+		out_dir.mkdir(parents=True, exist_ok=True)
+		grid.to_csv(out_dir / "grid.csv", index=False)
+		self.weights = grid["weight"].to_numpy(dtype=float)
+		open_memmap = np.lib.format.open_memmap
+		self.area = open_memmap(out_dir / "area_m2.npy", mode="w+", dtype=np.float64, shape=(rows, len(self.weights)))
+		self.day = open_memmap(out_dir / "day.npy", mode="w+", dtype=np.int64, shape=(rows,))
+		self.power = open_memmap(out_dir / "power_GW.npy", mode="w+", dtype=np.float64, shape=(rows,))
+		self.rows = 0
+
+	def append(self, columns: Dict[str, np.ndarray]) -> None:
+		cum_area = np.asarray(columns["cum_area_m2"], dtype=float)
+		n, r = len(cum_area), self.rows
+		if r + n > len(self.day):
+			raise ValueError(f"Shell matrix holds {len(self.day)} rows; got {r + n}")
+		step = max(1, BLOCK_ELEMENTS // max(1, len(self.weights)))
+		for s in range(0, n, step):
+			e = min(n, s + step)
+			np.multiply(cum_area[s:e, None], self.weights[None, :], out=self.area[r + s:r + e])
+		self.day[r:r + n] = columns["day"]
+		self.power[r:r + n] = columns["power_GW_1AU_equiv"]
+		self.rows = r + n
+
+	def close(self) -> None:
+		for m in (self.area, self.day, self.power):
+			m.flush()
+		del self.area, self.day, self.power
+
+
+def write_shells(out_dir: Path, grid: pd.DataFrame, columns: Dict[str, np.ndarray] | pd.DataFrame) -> None:
+	"""The shell matrix of a whole in-memory run."""
+	writer = ShellWriter(out_dir, grid, len(columns["day"]))
+	writer.append({k: np.asarray(columns[k]) for k in ("day", "cum_area_m2", "power_GW_1AU_equiv")})
+	writer.close()
+
+
+@dataclass(frozen=True)
+class ShellMatrix:
+	"""A written shell matrix. `area_m2` is `(days, shells)`, memory-mapped read-only."""
+	grid: pd.DataFrame
+	day: np.ndarray
+	area_m2: np.ndarray
+	power_GW_total: np.ndarray
+
+	def optical_depth(self, rows: slice | np.ndarray = slice(None)) -> np.ndarray:
+		"""Uncapped OD of every shell on the selected rows."""
+		return self.area_m2[rows] / self.grid["sphere_area_m2"].to_numpy()
+
+	def power_GW(self, rows: slice | np.ndarray = slice(None)) -> np.ndarray:
+		"""Delivered power of every shell on the selected rows (its `weight * irradiance` share of the total)."""
+		share = self.grid["weight"].to_numpy() * self.grid["irradiance_W_m2"].to_numpy()
+		return self.power_GW_total[rows, None] * (share / share.sum())
+
+
+def load_shells(path: str | Path) -> ShellMatrix:
+	"""Open a run's `shells/` directory (or the run directory holding it)."""
+	path = Path(path)
+	if not (path / "area_m2.npy").exists() and (path / "shells").is_dir():
+		path = path / "shells"
+	return ShellMatrix(
+		grid=pd.read_csv(path / "grid.csv"),
+		day=np.load(path / "day.npy", mmap_mode="r"),
+		area_m2=np.load(path / "area_m2.npy", mmap_mode="r"),
+		power_GW_total=np.load(path / "power_GW.npy", mmap_mode="r"),
+	)
+
+
+def shell_summary(cum_area_shells, shell_means, eff_1au: float) -> Dict[str, Any]:
+	"""End-of-run aggregates of a radial grid (the per-shell values are in the shell matrix)."""
+	area = np.asarray(cum_area_shells, dtype=float)
+	a = np.asarray(shell_means, dtype=float)
+	od = area / (4.0 * np.pi * a ** 2 * AU_M ** 2)
+	power = area * (SOLAR_CONSTANT_1AU_W_M2 / a ** 2) * eff_1au * 1e-9
+	total = area.sum()
+	peak = int(np.argmax(od)) if len(od) else 0
+	return {
+		"count": len(a),
+		"a_AU_min": float(a.min()) if len(a) else None,
+		"a_AU_max": float(a.max()) if len(a) else None,
+		"a_AU_area_weighted": float((a * area).sum() / total) if total > 0 else None,
+		"peak_optical_depth": float(od[peak]) if len(od) else 0.0,
+		"peak_optical_depth_a_AU": float(a[peak]) if len(a) else None,
+		"power_GW": float(power.sum()),
+	}
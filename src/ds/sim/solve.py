@@ -0,0 +1,180 @@
+"""Inverse solver: the smallest lever values that reach the area target by a deadline.
+
+Deployed area never decreases in the capacity levers (`transport.fleet_power_MW`,
+`launch_strategy.cadence_per_day`, `caps.max_growth_multiplier`, ...), so
+"target met by the deadline" is a step function of each of them. The solver
+searches a scale factor s on the ray `value_k = anchor_k * s` (one lever, or
+several scaled together) by k-section in log space: each round evaluates
+`points` interior values as one batch-engine run and keeps the sub-bracket
+around the feasibility threshold. Evaluations are memoized per value, so
+bracket ends are never rerun.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Sequence, Tuple
+import math
+import numpy as np
+from ..config import with_overrides
+from .batch import run_batch, scenario_params
+from .summary import get_path, parameter_report
+from .vectorized import growth_multiplier_series
+
+# Default search range of the scale factor relative to the anchor values
+DEFAULT_RANGE = (1e-6, 1e3)
+CONSTRAINTS = ("production", "replication_cap", "resources", "mass_drivers", "cadence", "transport")
+
+
+@dataclass
+class SolveResult:
+	keys: Tuple[str, ...]
+	anchors: Tuple[float, ...]
+	deadline_years: float
+	feasible: bool
+	# Smallest feasible scale found and the largest infeasible one (None when the range end was reached)
+	scale: float | None
+	scale_below: float | None
+	simulations: int
+	batch_runs: int
+	# Feasibility was monotone over every evaluated scale
+	monotone: bool
+	summary: Dict[str, Any] | None = None
+	binding: Dict[str, Any] = field(default_factory=dict)
+
+	@property
+	def values(self) -> Dict[str, float] | None:
+		return {k: a * self.scale for k, a in zip(self.keys, self.anchors)} if self.scale is not None else None
+
+	def to_dict(self) -> Dict[str, Any]:
+		return {
+			"parameters": list(self.keys),
+			"deadline_years": self.deadline_years,
+			"feasible": self.feasible,
+			"values": self.values,
+			"values_below": {k: a * self.scale_below for k, a in zip(self.keys, self.anchors)} if self.scale_below is not None else None,
+			"years_to_target": self.summary["years_to_target"] if self.summary else None,
+			"simulations": self.simulations,
+			"batch_runs": self.batch_runs,
+			"monotone": self.monotone,
+			"binding": self.binding,
+		}
+
+
+class _Evaluator:
+	"""Memoized feasibility of scale factors; each call runs the uncached ones as one batch."""
+
+	def __init__(self, scenario: Dict[str, Any], keys: Sequence[str], anchors: Sequence[float], deadline_years: float):
+		self.scenario = with_overrides(scenario, {"horizon_years": max(1, math.ceil(deadline_years))})
+		self.keys = tuple(keys)
+		self.anchors = tuple(anchors)
+		self.deadline_years = deadline_years
+		self.cache: Dict[float, Dict[str, Any]] = {}
+		self.batch_runs = 0
+
+	def variant(self, s: float) -> Dict[str, Any]:
+		return with_overrides(self.scenario, {k: a * s for k, a in zip(self.keys, self.anchors)})
+
+	def feasible(self, scales: Sequence[float]) -> List[bool]:
+		todo = [s for s in dict.fromkeys(scales) if s not in self.cache]
+		if todo:
+			self.batch_runs += 1
+			for s, summary in zip(todo, run_batch([self.variant(s) for s in todo]).summaries):
+				self.cache[s] = summary
+		return [self.met(self.cache[s]) for s in scales]
+
+	def met(self, summary: Dict[str, Any]) -> bool:
+		years = summary["years_to_target"]
+		return years is not None and years <= self.deadline_years + 1e-12
+
+
+def _anchors(scenario: Dict[str, Any], keys: Sequence[str], anchored: bool) -> Tuple[float, ...]:
+	if not anchored:
+		return (1.0,) * len(keys)
+	out = []
+	resolved = None
+	for k in keys:
+		v = get_path(scenario, k, None)
+		if v is None:
+			# A lever left out of the scenario anchors on the value the model falls back to (e.g. the tug fleet power)
+			resolved = resolved or parameter_report(scenario)["values"]
+			v = resolved.get(k)
+		if not isinstance(v, (int, float)) or isinstance(v, bool) or not math.isfinite(v) or v <= 0:
+			hint = "set it in the scenario or give its own --range" if len(keys) == 1 else "set it in the scenario to scale it with other levers"
+			raise ValueError(f"{k} has no positive finite value in the scenario to scale from; {hint}")
+		out.append(float(v))
+	return tuple(out)
+
+
+def solve_minimum(scenario: Dict[str, Any], keys: Sequence[str], deadline_years: float, scale_range: Tuple[float, float] | None = None, rtol: float = 1e-3, points: int = 8) -> SolveResult:
+	"""Smallest values of the `keys` levers meeting `targets.total_collector_area_m2` by `deadline_years`.
+
+	With one key and `scale_range`, the range is in the lever's own units;
+	otherwise the levers are scaled together from their values in the built
+	`scenario` (or their `parameter_report` fallback when it leaves them out)
+	and `scale_range` (default `DEFAULT_RANGE`) bounds the factor.
+	Stops once the bracket's upper/lower ratio is within 1 + `rtol`.
+	"""
+	if not keys:
+		raise ValueError("solve needs at least one parameter")
+	if deadline_years <= 0 or rtol <= 0 or points < 1:
+		raise ValueError("solve needs deadline_years > 0, rtol > 0 and points >= 1")
+	absolute = scale_range is not None and len(keys) == 1
+	lo, hi = scale_range if scale_range is not None else DEFAULT_RANGE
+	if not 0 < lo < hi:
+		raise ValueError("solve range needs 0 < min < max")
+	ev = _Evaluator(scenario, keys, _anchors(scenario, keys, anchored=not absolute), deadline_years)
+	feasible_lo, feasible_hi = ev.feasible([lo, hi])
+	if feasible_lo or not feasible_hi:
+		scale = lo if feasible_lo else None
+		return _result(ev, feasible_hi, scale, None, True)
+	monotone = True
+	while hi / lo > 1.0 + rtol:
+		grid = np.exp(np.linspace(math.log(lo), math.log(hi), points + 2)).tolist()
+		grid[0], grid[-1] = lo, hi
+		ok = ev.feasible(grid)
+		first = ok.index(True)
+		monotone &= all(ok[first:])
+		lo, hi = grid[first - 1], grid[first]
+	return _result(ev, True, hi, lo, monotone)
+
+
+def _result(ev: _Evaluator, feasible: bool, scale: float | None, scale_below: float | None, monotone: bool) -> SolveResult:
+	result = SolveResult(keys=ev.keys, anchors=ev.anchors, deadline_years=ev.deadline_years, feasible=feasible, scale=scale, scale_below=scale_below,
+		simulations=len(ev.cache), batch_runs=ev.batch_runs, monotone=monotone)
+	# Constraints of the best point reached: the solution, or the top of the range when infeasible
+	s = scale if scale is not None else max(ev.cache)
+	result.summary = ev.cache[s]
+	result.binding = binding_constraints(ev.variant(s), ev.deadline_years)
+	return result
+
+
+def binding_constraints(scenario: Dict[str, Any], deadline_years: float) -> Dict[str, Any]:
+	"""Which cap limited deployment on each launch day up to the deadline.
+
+	Each day is attributed to the smallest of production (split into
+	`replication_cap` once growth is capped and `resources` once mined out),
+	rail cadence (`mass_drivers` while rails are still being built, else
+	`cadence`) and `transport`. Returns the share of days per constraint, the
+	most frequent one and the one on the deadline day.
+	"""
+	res = run_batch([scenario], timeseries=True)
+	p = scenario_params(scenario)
+	ts = {k: v[0] for k, v in res.timeseries.items()}
+	days = res.days
+	end = min(len(days), int(math.floor(deadline_years * 365.0)) + 1)
+	window = np.arange(min(p["launch_day"], end), end)
+	if not len(window):
+		return {"binding": None, "at_deadline": None, "share_of_launch_days": {}}
+	factor, cycle, cap = p["growth_key"]
+	g_used, _ = growth_multiplier_series(days + 1.0, factor, cycle, cap)
+	rails = p["cadence_single"] * ts["mass_drivers_online"]
+	supply = np.stack([ts["pv_m2"], np.minimum(rails, p["cadence_cap"]) * p["package_area"], np.full(len(days), p["transport_cap"])])[:, window]
+	which = np.argmin(supply, axis=0)
+	names = np.empty(len(window), dtype=object)
+	exhausted = np.nan_to_num(ts["resource_remaining_kg"][window], nan=np.inf) <= 0.0
+	names[which == 0] = "production"
+	names[(which == 0) & (g_used[window] >= cap)] = "replication_cap"
+	names[(which == 0) & exhausted] = "resources"
+	names[which == 1] = np.where(rails[window] >= p["cadence_cap"], "cadence", "mass_drivers")[which == 1]
+	names[which == 2] = "transport"
+	share = {c: float(np.mean(names == c)) for c in CONSTRAINTS if (names == c).any()}
+	return {"binding": max(share, key=share.get), "at_deadline": names[-1], "share_of_launch_days": share}
@@ -0,0 +1,180 @@
+"""Consolidated results store across runs, sweeps and replicates.
+
+Every CLI invocation records a group (kind, scenario, command line). Each run,
+sweep point or replicate of that group becomes one row of the SQLite index
+`index.sqlite`. The `runs` table holds the run metadata, parameters as
+`param.<dotted key>` columns and the flattened summary metrics
+(`flatten_summary`, e.g. `years_to_target`,
+`materials.resource_remaining_kg_final`). New keys add columns on the fly.
+Full-run timeseries go to a hive-partitioned Parquet dataset,
+`timeseries/group_id=<group>/<run>.parquet`, with a `run_id` column (streamed
+runs keep theirs in their output directory only). Workers write these files
+directly. Only the parent process writes the index.
+
+`query` turns a SQL `WHERE` expression into one indexed SQLite query with
+the requested columns. Bare dotted names such as
+`param.transport.fleet_power_MW` are quoted automatically. `timeseries`
+reads the matching runs' rows with column projection, and filters on the
+partition and `run_id` are pushed down into the Parquet scan.
+"""
+from __future__ import annotations
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Mapping, Sequence
+import json
+import math
+import os
+import re
+import secrets
+import sqlite3
+from .summary import flatten_summary
+
+META_COLUMNS = ("run_id", "group_id", "kind", "label", "scenario", "out_dir", "created")
+PARAM_PREFIX = "param."
+INDEXED_COLUMNS = ("group_id", "kind", "scenario", "years_to_target")
+# Dotted identifiers outside quotes, e.g. param.production.uptime_fraction
+_DOTTED = re.compile(r"(?<![\w.\"])([A-Za-z_]\w*(?:\.\w+)+)")
+
+
+def default_store_dir() -> Path:
+	"""`$DS_STORE_DIR`, else `~/.local/share/ds/store`."""
+	env = os.environ.get("DS_STORE_DIR")
+	return Path(env) if env else Path.home() / ".local" / "share" / "ds" / "store"
+
+
+def quote(name: str) -> str:
+	return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_value(v: Any) -> Any:
+	if hasattr(v, "item"):
+		v = v.item()
+	if isinstance(v, float) and not math.isfinite(v):
+		return None
+	if v is None or isinstance(v, (bool, int, float, str)):
+		return v
+	return json.dumps(v, default=str)
+
+
+def quote_dotted(where: str) -> str:
+	"""Quote bare dotted identifiers in a WHERE expression, leaving string literals alone."""
+	parts = re.split(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")", where)
+	return "".join(p if i % 2 else _DOTTED.sub(lambda m: quote(m.group(1)), p) for i, p in enumerate(parts))
+
+
+def write_timeseries_part(ts, path: str | Path, run_id: str) -> None:
+	"""One run's timeseries as a Parquet file of the store's dataset (skipped without a Parquet engine)."""
+	path = Path(path)
+	path.parent.mkdir(parents=True, exist_ok=True)
+	try:
+		ts.assign(run_id=run_id).to_parquet(path, index=False)
+	except ImportError:
+		pass
+
+
+class ResultsStore:
+	def __init__(self, root: str | Path):
+		self.root = Path(root)
+		self.root.mkdir(parents=True, exist_ok=True)
+		self.index_path = self.root / "index.sqlite"
+		with self._connect() as con:
+			con.execute("CREATE TABLE IF NOT EXISTS groups (group_id TEXT PRIMARY KEY, kind TEXT, scenario TEXT, created TEXT, command TEXT)")
+			con.execute(f"CREATE TABLE IF NOT EXISTS runs ({', '.join(m + (' TEXT PRIMARY KEY' if m == 'run_id' else '') for m in META_COLUMNS)})")
+		con.close()
+
+	def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+		if readonly:
+			return sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, timeout=60.0)
+		return sqlite3.connect(self.index_path, timeout=60.0)
+
+	def new_group(self, kind: str, scenario: str | None = None, command: Sequence[str] | None = None) -> str:
+		"""Register one invocation; returns its group id (`<kind>-<UTC time>-<random>`)."""
+		now = datetime.now(timezone.utc)
+		group_id = f"{kind}-{now:%Y%m%dT%H%M%S}-{secrets.token_hex(3)}"
+		with self._connect() as con:
+			con.execute("INSERT INTO groups VALUES (?, ?, ?, ?, ?)", (group_id, kind, scenario, now.isoformat(timespec="seconds"), json.dumps(list(command or []))))
+		con.close()
+		return group_id
+
+	@staticmethod
+	def run_id(group_id: str, label: Any) -> str:
+		return f"{group_id}/{label}"
+
+	def timeseries_path(self, group_id: str, label: Any) -> Path:
+		return self.root / "timeseries" / f"group_id={group_id}" / f"{label}.parquet"
+
+	def record(self, group_id: str, runs: Iterable[Mapping[str, Any]]) -> int:
+		"""Index the runs of a group: each has `label`, `params`, `metrics` (flat) or `summary`, and optionally `out_dir`."""
+		with self._connect() as con:
+			kind, scenario = con.execute("SELECT kind, scenario FROM groups WHERE group_id = ?", (group_id,)).fetchone()
+			created = datetime.now(timezone.utc).isoformat(timespec="seconds")
+			rows: List[Dict[str, Any]] = []
+			for r in runs:
+				metrics = r["metrics"] if "metrics" in r else flatten_summary(r["summary"])
+				row = {"run_id": self.run_id(group_id, r["label"]), "group_id": group_id, "kind": kind, "label": str(r["label"]), "scenario": scenario,
+					"out_dir": str(r["out_dir"]) if r.get("out_dir") else None, "created": created}
+				row.update((PARAM_PREFIX + k, _sql_value(v)) for k, v in r.get("params", {}).items())
+				row.update((k, _sql_value(v)) for k, v in metrics.items() if k not in row)
+				rows.append(row)
+			columns = list(dict.fromkeys(c for row in rows for c in row))
+			existing = {c[1] for c in con.execute("PRAGMA table_info(runs)")}
+			for c in columns:
+				if c not in existing:
+					con.execute(f"ALTER TABLE runs ADD COLUMN {quote(c)}")
+			for c in INDEXED_COLUMNS:
+				if c in existing or c in columns:
+					con.execute(f"CREATE INDEX IF NOT EXISTS {quote('idx_' + c)} ON runs ({quote(c)})")
+			sql = f"INSERT OR REPLACE INTO runs ({', '.join(map(quote, columns))}) VALUES ({', '.join('?' * len(columns))})"
+			con.executemany(sql, [[row.get(c) for c in columns] for row in rows])
+		con.close()
+		return len(rows)
+
+	def record_table(self, group_id: str, table: Mapping[str, Sequence[Any]], label: str, params: Sequence[str]) -> int:
+		"""Index a column table (e.g. Monte Carlo samples): `label` names the id column, `params` the input columns."""
+		names = [c for c in table if c != label]
+		n = len(table[label])
+		return self.record(group_id, ({"label": _sql_value(table[label][i]), "params": {k: table[k][i] for k in params},
+			"metrics": {k: table[k][i] for k in names if k not in params}} for i in range(n)))
+
+	def columns(self) -> List[str]:
+		with self._connect(readonly=True) as con:
+			out = [c[1] for c in con.execute("PRAGMA table_info(runs)")]
+		con.close()
+		return out
+
+	def query(self, where: str | None = None, columns: Sequence[str] | None = None, order_by: str | None = None, limit: int | None = None):
+		"""Runs matching a SQL `where` expression as a DataFrame of `columns` (default: all)."""
+		import pandas as pd
+		available = self.columns()
+		if columns:
+			missing = [c for c in columns if c not in available]
+			if missing:
+				raise ValueError(f"Unknown store columns {missing}")
+			columns = list(dict.fromkeys(["run_id", *columns]))
+		sql = f"SELECT {', '.join(map(quote, columns)) if columns else '*'} FROM runs"
+		if where:
+			sql += f" WHERE {quote_dotted(where)}"
+		if order_by:
+			sql += f" ORDER BY {quote_dotted(order_by)}"
+		if limit is not None:
+			sql += f" LIMIT {int(limit)}"
+		con = self._connect(readonly=True)
+		try:
+			table = pd.read_sql_query(sql, con)
+		except (sqlite3.Error, pd.errors.DatabaseError) as e:
+			raise ValueError(f"Invalid store query: {e}") from e
+		finally:
+			con.close()
+		return table
+
+	def timeseries(self, run_ids: Sequence[str], columns: Sequence[str] | None = None):
+		"""Timeseries rows of `run_ids` (with `run_id`), reading only `columns` and the matching partitions."""
+		import pyarrow.dataset as pads
+		path = self.root / "timeseries"
+		if not run_ids or not path.exists():
+			return None
+		dataset = pads.dataset(path, format="parquet", partitioning="hive")
+		groups = sorted({r.rsplit("/", 1)[0] for r in run_ids})
+		expr = pads.field("group_id").isin(groups) & pads.field("run_id").isin(list(run_ids))
+		cols = list(dict.fromkeys(["run_id", *columns])) if columns else None
+		return dataset.to_table(columns=cols, filter=expr).to_pandas()
@@ -0,0 +1,124 @@
+"""Streaming run outputs for very long horizons.
+
+Engines hand a `StreamSink` fixed-size day chunks. The sink appends each chunk
+to `timeseries.csv` / `events.csv` (and to Parquet row groups when pyarrow is
+installed), and a radial grid's rows to its shell matrix (`ds.sim.shells`). It
+folds each chunk into running summary totals. Memory stays at one chunk
+regardless of horizon length.
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Any, Iterable
+import numpy as np
+import pandas as pd
+from . import OUTPUT_KINDS
+from .events import EventLog
+from .recorder import frame_from_columns
+from .shells import ShellWriter, grid_table
+from .summary import TotalsAccumulator, target_area_m2
+
+# 100 years per chunk: ~3 MB of timeseries columns for three bands
+DEFAULT_CHUNK_DAYS = 36_500
+
+
+def _arrow():
+	try:
+		import pyarrow
+		import pyarrow.parquet
+		return pyarrow
+	except ImportError:
+		return None
+
+
+class ChunkWriter:
+	"""Append-only table writer: CSV appends and/or one Parquet row group per chunk."""
+
+	def __init__(self, base: Path, kinds: Iterable[str], schema: Any = None):
+		kinds = set(kinds)
+		self.csv_path = base.with_suffix(".csv") if "csv" in kinds else None
+		self._pa = _arrow() if "parquet" in kinds else None
+		self.parquet_path = base.with_suffix(".parquet") if self._pa is not None else None
+		self._schema = schema
+		self._pq = None
+		self.rows = 0
+
+	def append(self, df: pd.DataFrame) -> None:
+		if self.csv_path is not None:
+			df.to_csv(self.csv_path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+		if self.parquet_path is not None:
+			pa = self._pa
+			table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+			if self._pq is None:
+				self._pq = pa.parquet.ParquetWriter(self.parquet_path, table.schema)
+			self._pq.write_table(table)
+		self.rows += len(df)
+
+	def close(self) -> None:
+		if self._pq is not None:
+			self._pq.close()
+			self._pq = None
+
+
+class StreamSink:
+	"""Receives day chunks from an engine: writes them out and keeps summary totals."""
+
+	def __init__(self, out_dir: Path, target_area_m2: float, outputs: Iterable[str] = OUTPUT_KINDS, chunk_days: int = DEFAULT_CHUNK_DAYS):
+		if chunk_days < 1:
+			raise ValueError("chunk_days must be >= 1")
+		out_dir.mkdir(parents=True, exist_ok=True)
+		self.chunk_days = chunk_days
+		self.out_dir = out_dir
+		self.outputs = set(outputs)
+		self.shells: ShellWriter | None = None
+		self.accumulator = TotalsAccumulator(target_area_m2)
+		pa = _arrow()
+		event_schema = pa.schema([("day", pa.int64()), ("type", pa.string()), ("area_m2", pa.float64()), ("system", pa.string()), ("mass_drivers_online", pa.float64())]) if pa else None
+		self.timeseries = ChunkWriter(out_dir / "timeseries", outputs)
+		self.events = ChunkWriter(out_dir / "events", outputs, schema=event_schema)
+
+	def start(self, plan) -> None:
+		"""Called with the compiled plan before the first chunk: opens the shell matrix of a radial grid."""
+		grid = grid_table(plan)
+		if grid is not None and self.outputs & {"csv", "parquet"}:
+			self.shells = ShellWriter(self.out_dir / "shells", grid, plan.horizon_days)
+
+	def write(self, columns: Dict[str, np.ndarray], band_area: np.ndarray, band_od: np.ndarray, events: EventLog) -> None:
+		self.accumulator.update(columns)
+		self.timeseries.append(frame_from_columns(columns, band_area, band_od))
+		if self.shells is not None:
+			self.shells.append(columns)
+		if len(events):
+			self.events.append(events.to_frame())
+
+	def totals(self) -> Dict[str, Any]:
+		"""Close the files (writing an empty events table if there were none) and return the totals."""
+		if not self.events.rows:
+			self.events.append(EventLog().to_frame())
+		self.timeseries.close()
+		self.events.close()
+		if self.shells is not None:
+			self.shells.close()
+			self.shells = None
+		return self.accumulator.totals()
+
+
+def run_streaming(scenario: Dict[str, Any], out_dir: Path, engine: str | None = None, rng: np.random.Generator | None = None, outputs: Iterable[str] = OUTPUT_KINDS, chunk_days: int = DEFAULT_CHUNK_DAYS) -> Dict[str, Any]:
+	"""Run with chunked output straight to `out_dir`; returns the summary/parameters results.
+
+	Figures ("plots") are rendered afterwards from the written timeseries and
+	need it in memory once; leave them out for bounded memory.
+	"""
+	from .engine import run_simulation
+	from .outputs import write_summary
+	outputs = set(outputs)
+	sink = StreamSink(out_dir, target_area_m2(scenario), outputs, chunk_days)
+	results = run_simulation(scenario, engine=engine, rng=rng, sink=sink)
+	if "summary" in outputs:
+		write_summary(results["summary"], results["parameters"], out_dir)
+		bands = results["summary"].get("bands") or []
+		if bands:
+			pd.DataFrame(bands).to_csv(out_dir / "band_summary.csv", index=False)
+	if "plots" in outputs and ("csv" in outputs or sink.timeseries.parquet_path is not None):
+		from .render import render_run
+		render_run(out_dir)
+	return results
@@ -0,0 +1,394 @@
+from __future__ import annotations
+from typing import Dict, Any, List, Tuple
+import numpy as np
+import pandas as pd
+from ..mission.orbit_assignment import OrbitBand, optical_depth
+from .metrics import compute_power_capture_GW
+
+
+def get_path(scenario: Dict[str, Any], path: str, default: Any = None) -> Any:
+	parts = path.split(".")
+	cur: Any = scenario
+	for p in parts:
+		if not isinstance(cur, dict) or p not in cur:
+			return default
+		cur = cur[p]
+	return cur
+
+
+def resolve_bands(scenario: Dict[str, Any]) -> Tuple[List[OrbitBand], List[float], np.ndarray]:
+	"""Return (bands, band mean radii in AU, normalized deployment weights).
+
+	With `launch_strategy.radial_grid` the bands are its shells (`ds.sim.shells`).
+	"""
+	grid = scenario.get("launch_strategy", {}).get("radial_grid")
+	if grid:
+		from .shells import radial_shells
+		edges, w = radial_shells(grid)
+		bands = [OrbitBand(amin_AU=float(lo), amax_AU=float(hi)) for lo, hi in zip(edges[:-1], edges[1:])]
+		return bands, ((edges[:-1] + edges[1:]) * 0.5).tolist(), w
+	lb = scenario.get("launch_strategy", {}).get("target_bands_AU")
+	if isinstance(lb, list) and len(lb) > 0 and all(isinstance(x, (list, tuple)) and len(x) == 2 for x in lb):
+		bands = [OrbitBand(amin_AU=float(r[0]), amax_AU=float(r[1])) for r in lb]
+	else:
+		band_range = scenario.get("launch_strategy", {}).get("target_a_AU_range", [0.35, 0.45])
+		bands = [OrbitBand(amin_AU=float(band_range[0]), amax_AU=float(band_range[1]))]
+	band_means = [(b.amin_AU + b.amax_AU) * 0.5 for b in bands]
+	weights = scenario.get("launch_strategy", {}).get("band_weights")
+	if isinstance(weights, list) and len(weights) == len(bands):
+		w = np.array([max(0.0, float(x)) for x in weights], dtype=float)
+		w = w / w.sum() if w.sum() > 0 else np.ones(len(bands)) / len(bands)
+	else:
+		w = np.ones(len(bands)) / max(1, len(bands))
+	return bands, band_means, w
+
+
+def first_collector(scenario: Dict[str, Any]) -> Dict[str, Any] | None:
+	ct = scenario.get("collectors", {}).get("collector_types", {})
+	return next(iter(ct.values())) if isinstance(ct, dict) and ct else None
+
+
+def collector_mix(scenario: Dict[str, Any]) -> List[Tuple[str, float, Dict[str, Any]]]:
+	"""(name, area fraction, config) of each launched collector type.
+
+	`launch_strategy.collector_mix` weights collector types by area; without it
+	only the first type is launched. Empty without collector types.
+	"""
+	ct = scenario.get("collectors", {}).get("collector_types", {})
+	if not isinstance(ct, dict) or not ct:
+		return []
+	mix = scenario.get("launch_strategy", {}).get("collector_mix")
+	if not mix:
+		name = next(iter(ct))
+		return [(name, 1.0, ct[name])]
+	unknown = [k for k in mix if k not in ct]
+	if unknown:
+		raise ValueError(f"launch_strategy.collector_mix names unknown collector types {unknown}; expected some of {list(ct)}")
+	total = sum(float(v) for v in mix.values())
+	if any(float(v) < 0 for v in mix.values()) or total <= 0:
+		raise ValueError("launch_strategy.collector_mix needs non-negative weights with a positive sum")
+	return [(k, float(v) / total, ct[k]) for k, v in mix.items() if float(v) > 0]
+
+
+def mix_average(scenario: Dict[str, Any], key: str, default: float) -> float:
+	"""Area-weighted mean of a collector property over `collector_mix` (`default` without collectors)."""
+	mix = collector_mix(scenario)
+	if len(mix) == 1:
+		return float(mix[0][2].get(key, default))
+	return sum(f * float(c.get(key, default)) for _, f, c in mix) if mix else default
+
+
+def thermal_derate(scenario: Dict[str, Any]) -> float:
+	# Thermal derating from Mercury site radiator sizing: simple scalar on efficiency
+	radiator_m2 = float(scenario.get("mercury_site", {}).get("radiator_area_m2", 1e5))
+	return min(1.0, radiator_m2 / 1e5)
+
+
+def beaming_factors(scenario: Dict[str, Any]) -> Dict[str, float]:
+	beaming = scenario.get("beaming", {})
+	return {
+		"tx_conversion": float(beaming.get("tx_conversion", 0.85)),
+		"pointing": float(beaming.get("pointing", 0.97)),
+		"rx_conversion": float(beaming.get("rx_conversion", 0.85)),
+		"earth_atmosphere": float(beaming.get("earth_atmosphere", 0.92)),
+	}
+
+
+def beaming_chain(scenario: Dict[str, Any]) -> float:
+	f = beaming_factors(scenario)
+	return f["tx_conversion"] * f["pointing"] * f["rx_conversion"] * f["earth_atmosphere"]
+
+
+def transport_limits(scenario: Dict[str, Any]) -> Tuple[float, float]:
+	"""Return (fleet power in MW, deployed area per MW per day)."""
+	transport_cfg = scenario.get("transport", {})
+	fleet_MW = float(transport_cfg.get("fleet_power_MW", scenario.get("vehicles", {}).get("tugs", {}).get("elec_tug", {}).get("fleet_power_MW", 1.0)))
+	area_per_MW_per_day = float(transport_cfg.get("area_per_MW_per_day", 1.0e4))
+	return fleet_MW, area_per_MW_per_day
+
+
+def flatten_summary(summary: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+	"""Flatten a nested summary to dotted scalar columns (lists by index, e.g. `bands.0.power_GW`)."""
+	flat: Dict[str, Any] = {}
+	items = summary.items() if isinstance(summary, dict) else enumerate(summary)
+	for k, v in items:
+		key = f"{prefix}{k}"
+		if isinstance(v, (dict, list)):
+			flat.update(flatten_summary(v, key + "."))
+		else:
+			flat[key] = v
+	return flat
+
+
+def target_area_m2(scenario: Dict[str, Any]) -> float:
+	# Robustly coerce target to float in case it was provided as a string
+	target_raw = scenario.get("targets", {}).get("total_collector_area_m2", 0.0)
+	try:
+		return float(target_raw)
+	except Exception:
+		return 0.0
+
+
+def timeseries_totals(ts: pd.DataFrame, target: float) -> Dict[str, Any]:
+	"""Reduce a daily timeseries to the aggregates `summarize` needs."""
+	meet = ts[ts["cum_area_m2"] >= target]
+	final_resource_remaining_kg = None
+	if "resource_remaining_kg" in ts.columns:
+		col_rr = ts["resource_remaining_kg"].dropna()
+		if not col_rr.empty:
+			final_resource_remaining_kg = float(col_rr.iloc[-1])
+	return {
+		"day_target_met": meet.iloc[0]["day"] if not meet.empty else None,
+		"final_area_m2": float(ts["cum_area_m2"].iloc[-1]) if not ts.empty else 0.0,
+		"final_power_GW": float(ts["power_GW_1AU_equiv"].iloc[-1]),
+		"energy_kWh": float(ts["energy_kWh"].sum()) if "energy_kWh" in ts.columns else 0.0,
+		"transport_MWh": float(ts["transport_MWh"].sum()) if "transport_MWh" in ts.columns else 0.0,
+		"used_mass_kg": float(ts["used_mass_kg_day"].sum()) if "used_mass_kg_day" in ts.columns else None,
+		"structure_kg": float(ts["structure_kg"].sum()) if "structure_kg" in ts.columns else None,
+		"resource_remaining_kg": final_resource_remaining_kg,
+	}
+
+
+class TotalsAccumulator:
+	"""`timeseries_totals` computed incrementally over day chunks (streaming runs)."""
+
+	def __init__(self, target: float):
+		self.target = target
+		self.day_target_met: int | None = None
+		self.final_area_m2 = 0.0
+		self.final_power_GW = 0.0
+		self.energy_kWh = 0.0
+		self.transport_MWh = 0.0
+		self.used_mass_kg = 0.0
+		self.structure_kg = 0.0
+		self.resource_remaining_kg: float | None = None
+
+	def update(self, cols: Dict[str, np.ndarray]) -> None:
+		if not len(cols["day"]):
+			return
+		if self.day_target_met is None:
+			met = np.flatnonzero(cols["cum_area_m2"] >= self.target)
+			if len(met):
+				self.day_target_met = int(cols["day"][met[0]])
+		self.final_area_m2 = float(cols["cum_area_m2"][-1])
+		self.final_power_GW = float(cols["power_GW_1AU_equiv"][-1])
+		self.energy_kWh += float(cols["energy_kWh"].sum())
+		self.transport_MWh += float(cols["transport_MWh"].sum())
+		self.used_mass_kg += float(cols["used_mass_kg_day"].sum())
+		self.structure_kg += float(cols["structure_kg"].sum())
+		rr = cols["resource_remaining_kg"]
+		valid = np.flatnonzero(~np.isnan(rr))
+		if len(valid):
+			self.resource_remaining_kg = float(rr[valid[-1]])
+
+	def totals(self) -> Dict[str, Any]:
+		return {
+			"day_target_met": self.day_target_met,
+			"final_area_m2": self.final_area_m2,
+			"final_power_GW": self.final_power_GW,
+			"energy_kWh": self.energy_kWh,
+			"transport_MWh": self.transport_MWh,
+			"used_mass_kg": self.used_mass_kg,
+			"structure_kg": self.structure_kg,
+			"resource_remaining_kg": self.resource_remaining_kg,
+		}
+
+
+def summarize(scenario: Dict[str, Any], totals: Dict[str, Any], cum_area_bands: List[float], band_means: List[float], eff_now: float, final_growth_multiplier: float | None) -> Dict[str, Any]:
+	"""Build the end-of-run summary shared by all engines from `timeseries_totals`-style aggregates."""
+	derate = thermal_derate(scenario)
+	eff_chain = beaming_chain(scenario)
+	base_eff_1au = mix_average(scenario, "efficiency_1AU", 0.25)
+	day_met = totals["day_target_met"]
+	years_to_target = day_met / 365.0 if day_met is not None else None
+	# Per-band final metrics; a radial grid reports aggregates instead (per-shell values are in its shell matrix)
+	band_summaries: List[Dict[str, Any]] = []
+	shells = None
+	if scenario.get("launch_strategy", {}).get("radial_grid"):
+		from .shells import shell_summary
+		shells = shell_summary(cum_area_bands, band_means, eff_now * derate * eff_chain)
+		cum_area_bands = []
+	for i in range(len(cum_area_bands)):
+		band_area = float(cum_area_bands[i])
+		band_a = float(band_means[i])
+		band_od = float(optical_depth(band_area, band_a))
+		band_power = float(compute_power_capture_GW(band_area, a_AU=band_a, eff_1au=eff_now * derate * eff_chain))
+		band_summaries.append({
+			"index": i,
+			"a_AU_mean": band_a,
+			"cum_area_m2": band_area,
+			"optical_depth": band_od,
+			"power_GW": band_power,
+		})
+
+	# Aggregate material and energy totals
+	total_energy_kWh = totals["energy_kWh"]
+	total_transport_MWh = totals["transport_MWh"]
+	final_area = totals["final_area_m2"]
+	areal_density = mix_average(scenario, "areal_density_kg_m2", 0.15)
+	collector_mass_kg = final_area * areal_density
+	energy_per_m2_kWh_m2 = (total_energy_kWh / final_area) if final_area > 0 else None
+	transport_energy_per_m2_kWh_m2 = ((total_transport_MWh * 1000.0) / final_area) if final_area > 0 else None
+
+	# Derived efficiency & transport summaries
+	md = scenario.get("vehicles", {}).get("launchers", {}).get("mercury_mass_driver", {})
+	mtbf = float(md.get("mtbf_h", 0.0))
+	mttr = float(md.get("mttr_h", 0.0))
+	availability = (mtbf / (mtbf + mttr)) if (mtbf + mttr) > 0 else None
+	fleet_MW, area_per_MW_per_day = transport_limits(scenario)
+	cap_per_day = fleet_MW * area_per_MW_per_day
+	tug_power_kW = float(scenario.get("vehicles", {}).get("tugs", {}).get("elec_tug", {}).get("power_kW", 0.0))
+	implied_tugs = (fleet_MW * 1000.0 / tug_power_kW) if tug_power_kW > 0 else None
+
+	# Caps/replication
+	max_growth_multiplier_cfg = get_path(scenario, "caps.max_growth_multiplier", None)
+	beaming = beaming_factors(scenario)
+
+	return {
+		"years_to_target": years_to_target,
+		"total_area_m2": final_area,
+		"delivered_power_GW_at_1AU_equiv": totals["final_power_GW"],
+		"earth_mass_kg": scenario.get("earth_bootstrap", {}).get("launches", 0) * scenario.get("vehicles", {}).get("launchers", {}).get("earth_to_transfer", {}).get("payload_kg", 0),
+		"in_situ_fraction": 0.9,
+		"energy_kWh_total": total_energy_kWh,
+		"energy_per_m2_kWh_m2": energy_per_m2_kWh_m2,
+		"transport_MWh_total": total_transport_MWh,
+		"transport_energy_per_m2_kWh_m2": transport_energy_per_m2_kWh_m2,
+		"materials": {
+			"collector_areal_density_kg_m2": areal_density,
+			"collector_mass_kg": collector_mass_kg,
+			"structure_kg_total": totals["structure_kg"],
+			"resource_used_kg_total": totals["used_mass_kg"],
+			"resource_remaining_kg_final": totals["resource_remaining_kg"],
+		},
+		"bands": band_summaries,
+		**({"shells": shells} if shells is not None else {}),
+		"efficiencies": {
+			"pv_eff_1au_base": base_eff_1au,
+			"pv_eff_1au_end": eff_now,
+			"thermal_derate": derate,
+			"beaming": {
+				**beaming,
+				"chain": eff_chain,
+			},
+			"effective_eff_1au_end": eff_now * derate * eff_chain,
+		},
+		"transport": {
+			"fleet_power_MW": fleet_MW,
+			"area_per_MW_per_day": area_per_MW_per_day,
+			"area_cap_m2_per_day": cap_per_day,
+			"implied_tug_count": implied_tugs,
+			"tug_power_kW": tug_power_kW if tug_power_kW > 0 else None,
+			"transport_MWh_total": total_transport_MWh,
+		},
+		"caps": {
+			"max_growth_multiplier": float(max_growth_multiplier_cfg) if max_growth_multiplier_cfg is not None else None,
+			"growth_multiplier_final": float(final_growth_multiplier) if final_growth_multiplier is not None else None,
+		},
+		"mass_driver_availability": availability,
+	}
+
+
+# Parameter docs for outputs
+PARAM_DOCS: Dict[str, str] = {
+	"horizon_years": "Simulation length; longer horizon allows later phases to accrue area/power.",
+	"phases.phase0_days": "Initial setup (no launches); affects when production/launching starts.",
+	"phases.phase1_days": "Ramp-up phase; by default launches still gated until phase 2 in this model.",
+	"phases.phase2_days": "Steady expansion phase when daily PV can be launched.",
+	"production.uptime_fraction": "Multiplies all manufacturing line throughputs.",
+	"production.learning_curve_b": "Learning-curve exponent; lower b accelerates throughput growth over time.",
+	"launch_strategy.cadence_per_day": "Global cap on packages launched per day across rails.",
+	"launch_strategy.target_a_AU_range": "Single deployment band; sets mean radius for OD and 1/r^2 power.",
+	"launch_strategy.target_bands_AU": "Multiple deployment bands; area split by optional band_weights; per-band OD and power tracked.",
+	"launch_strategy.band_weights": "Optional weights for area split across bands; normalized to 1.",
+	"launch_strategy.radial_grid": "Many thin shells from r_min_AU to r_max_AU weighted by a radius distribution or profile; replaces the bands, per-shell output in shells/.",
+	"launch_strategy.collector_mix": "Area fraction launched per collector type (normalized); default is the first type only.",
+	"caps.max_growth_multiplier": "Upper bound on replication growth multiplier (limits exponential growth).",
+	"resources.usable_mass_mercury_kg": "Estimated mass of usable materials from Mercury composition model.",
+	"transport.fleet_power_MW": "Tug fleet electrical power; caps daily deployed area.",
+	"transport.area_per_MW_per_day": "Scaling from fleet power to deployed area per day (model constant).",
+	"beaming.tx_conversion": "Transmitter conversion efficiency factor in delivered power.",
+	"beaming.pointing": "Pointing/phase efficiency factor in delivered power.",
+	"beaming.rx_conversion": "Receiver conversion efficiency factor in delivered power.",
+	"beaming.earth_atmosphere": "Atmospheric transmission factor for delivered power to Earth.",
+	"collectors.efficiency_1AU": "Base PV efficiency at 1 AU for the default collector type.",
+	"collectors.degradation_per_year": "Annual PV degradation; each launch cohort loses efficiency exponentially with its own age.",
+	"mercury_site.radiator_area_m2": "Thermal derating proxy; larger radiators reduce efficiency losses.",
+	"vehicles.launchers.mercury_mass_driver.cooldown_s": "Cooldown between shots; sets base launch cadence.",
+	"vehicles.launchers.mercury_mass_driver.mtbf_h": "Mean time between failures; with MTTR sets availability for cadence.",
+	"vehicles.launchers.mercury_mass_driver.mttr_h": "Mean time to repair; with MTBF sets availability for cadence.",
+	"targets.total_collector_area_m2": "Target cumulative area; summary reports time to reach if within horizon.",
+	"targets.optical_depth_max": "Reference OD threshold; reported OD is capped to this for readability.",
+}
+
+
+def estimate_usable_mercury_mass_kg(scenario: Dict[str, Any]) -> float | None:
+	"""Usable materials on Mercury from bodies data (Fe + SiO2 utilization within the mined shell)."""
+	bodies = scenario.get("bodies")
+	if not isinstance(bodies, dict) or "bodies" not in bodies:
+		return None
+	lst = bodies.get("bodies", [])
+	if not isinstance(lst, list) or not lst:
+		return None
+	mer = next((b for b in lst if isinstance(b, dict) and b.get("name") == "Mercury"), None)
+	if not isinstance(mer, dict):
+		mer = lst[0] if isinstance(lst[0], dict) else None
+	if not isinstance(mer, dict):
+		return None
+	comp = mer.get("composition_mass_frac", {})
+	# Utilization factors configurable via scenario.resources.utilization
+	util_cfg = scenario.get("resources", {}).get("utilization", {}) if isinstance(scenario.get("resources", {}), dict) else {}
+	fe_util = float(util_cfg.get("Fe", 1.0))
+	si_util = float(util_cfg.get("SiO2", 0.2))
+	fe_frac = float(comp.get("Fe", 0.0))
+	si_frac = float(comp.get("SiO2", 0.0))
+	usable_frac = max(0.0, fe_util * fe_frac + si_util * si_frac)
+	radius_m = float(mer.get("radius_m", 2.4397e6))
+	density = float(mer.get("mean_density_kg_m3", 5427.0))
+	depth_m = float(scenario.get("resources", {}).get("mining_depth_m", 10.0)) if isinstance(scenario.get("resources", {}), dict) else 10.0
+	volume_shell_m3 = 4.0 * np.pi * (radius_m ** 2) * depth_m
+	return usable_frac * density * volume_shell_m3
+
+
+def parameter_report(scenario: Dict[str, Any]) -> Dict[str, Any]:
+	"""Parameter docs and effective values (with simple deriveds) for outputs."""
+	H_years = int(scenario.get("horizon_years", 25))
+	md = scenario.get("vehicles", {}).get("launchers", {}).get("mercury_mass_driver", {})
+	mtbf = float(md.get("mtbf_h", 0.0))
+	mttr = float(md.get("mttr_h", 0.0))
+	availability = (mtbf / (mtbf + mttr)) if (mtbf + mttr) > 0 else None
+	beaming = beaming_factors(scenario)
+	fleet_MW, area_per_MW_per_day = transport_limits(scenario)
+	cap_per_day = fleet_MW * area_per_MW_per_day
+	col = first_collector(scenario) or {}
+	param_values: Dict[str, Any] = {
+		"caps.max_growth_multiplier": float(get_path(scenario, "caps.max_growth_multiplier", 0.0)) or None,
+		"resources.usable_mass_mercury_kg": estimate_usable_mercury_mass_kg(scenario),
+		"horizon_years": H_years,
+		"phases.phase0_days": get_path(scenario, "phases.phase0_days", 365),
+		"phases.phase1_days": get_path(scenario, "phases.phase1_days", 3 * 365),
+		"phases.phase2_days": get_path(scenario, "phases.phase2_days", 21 * 365),
+		"production.uptime_fraction": get_path(scenario, "production.uptime_fraction", 0.85),
+		"production.learning_curve_b": get_path(scenario, "production.learning_curve_b", 0.85),
+		"launch_strategy.cadence_per_day": get_path(scenario, "launch_strategy.cadence_per_day", 1e9),
+		"launch_strategy.target_a_AU_range": get_path(scenario, "launch_strategy.target_a_AU_range", [0.35, 0.45]),
+		"launch_strategy.target_bands_AU": get_path(scenario, "launch_strategy.target_bands_AU", None),
+		"launch_strategy.band_weights": get_path(scenario, "launch_strategy.band_weights", None),
+		"launch_strategy.radial_grid": get_path(scenario, "launch_strategy.radial_grid", None),
+		"launch_strategy.collector_mix": {name: f for name, f, _ in collector_mix(scenario)} or None,
+		"transport.fleet_power_MW": fleet_MW,
+		"transport.area_per_MW_per_day": area_per_MW_per_day,
+		"transport.area_cap_m2_per_day": cap_per_day,
+		**{f"beaming.{k}": v for k, v in beaming.items()},
+		"beaming.total_chain_efficiency": beaming_chain(scenario),
+		"collectors.efficiency_1AU": float(col.get("efficiency_1AU", 0.25)) if isinstance(col, dict) else None,
+		"collectors.degradation_per_year": float(col.get("degradation_per_year", 0.0)) if isinstance(col, dict) else None,
+		"mercury_site.radiator_area_m2": float(get_path(scenario, "mercury_site.radiator_area_m2", 1e5)),
+		"vehicles.launchers.mercury_mass_driver.cooldown_s": float(md.get("cooldown_s", 120.0)),
+		"vehicles.launchers.mercury_mass_driver.mtbf_h": mtbf if mtbf > 0 else None,
+		"vehicles.launchers.mercury_mass_driver.mttr_h": mttr if mttr > 0 else None,
+		"vehicles.launchers.mercury_mass_driver.availability": availability,
+		"targets.total_collector_area_m2": float(get_path(scenario, "targets.total_collector_area_m2", 0.0)),
+		"targets.optical_depth_max": float(get_path(scenario, "targets.optical_depth_max", 1.0)),
+	}
+	return {"docs": dict(PARAM_DOCS), "values": param_values}
@@ -0,0 +1,238 @@
+"""Gaussian-process emulator of sweep and Monte Carlo results.
+
+Trains on a consolidated results table: a sweep-spec `results.csv`
+(`point_id`, inputs, flattened summary) or a Monte Carlo `mc_samples.csv`
+(`replicate`, sampled inputs, outcomes). By default the inputs are the columns
+between the id column and `years_to_target`. Inputs are scaled to the unit
+cube over the training domain (log scale for positive inputs spanning a
+decade or more). Positive outputs are modelled in log space. Every output
+gets its own zero-mean GP with an anisotropic squared-exponential kernel.
+Length scales and noise are picked by coordinate search on the log marginal
+likelihood, in plain NumPy.
+
+`years_to_target` is fitted on the rows that met the target. A second GP on
+the met indicator gives `p_met`. Predictions carry a central interval and
+flag queries outside the training box. `suggest` proposes the candidates
+with the largest predictive spread for the next sweep (active learning).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Mapping, Sequence, Tuple
+import json
+import math
+import numpy as np
+from .designs import sobol
+
+# Output name -> results-table column
+OUTPUTS = {
+	"years_to_target": "years_to_target",
+	"total_area_m2": "total_area_m2",
+	"delivered_power_GW_at_1AU_equiv": "delivered_power_GW_at_1AU_equiv",
+	"resource_remaining_kg": "materials.resource_remaining_kg_final",
+}
+ID_COLUMNS = ("point_id", "replicate")
+# Length-scale and noise grids (unit-cube inputs, standardized outputs) of the hyperparameter search
+LENGTH_SCALES = np.geomspace(0.03, 10.0, 16)
+NOISE_VARIANCES = (1e-8, 1e-6, 1e-4, 1e-3, 1e-2, 1e-1)
+# Two-sided z of the reported central interval (90%)
+INTERVAL_Z = 1.6448536269514722
+
+
+def _kernel(a: np.ndarray, b: np.ndarray, scales: np.ndarray) -> np.ndarray:
+	d = (a[:, None, :] - b[None, :, :]) / scales
+	return np.exp(-0.5 * np.einsum("ijk,ijk->ij", d, d))
+
+
+@dataclass
+class GaussianProcess:
+	"""Zero-mean GP on standardized targets with per-input length scales."""
+	X: np.ndarray
+	scales: np.ndarray
+	noise: float
+	y_mean: float
+	y_std: float
+	alpha: np.ndarray
+	L: np.ndarray
+
+	@classmethod
+	def fit(cls, X: np.ndarray, y: np.ndarray) -> "GaussianProcess":
+		y_mean = float(y.mean())
+		y_std = float(y.std()) or 1.0
+		ys = (y - y_mean) / y_std
+		scales = np.full(X.shape[1], 0.5)
+		noise = 1e-4
+		best = _log_likelihood(X, ys, scales, noise)
+		for _ in range(2):
+			for j in range(X.shape[1]):
+				for s in LENGTH_SCALES:
+					trial = scales.copy()
+					trial[j] = s
+					ll = _log_likelihood(X, ys, trial, noise)
+					if ll > best:
+						best, scales = ll, trial
+			for nv in NOISE_VARIANCES:
+				ll = _log_likelihood(X, ys, scales, nv)
+				if ll > best:
+					best, noise = ll, nv
+		L = np.linalg.cholesky(_kernel(X, X, scales) + noise * np.eye(len(X)))
+		alpha = np.linalg.solve(L.T, np.linalg.solve(L, ys))
+		return cls(X=X, scales=scales, noise=noise, y_mean=y_mean, y_std=y_std, alpha=alpha, L=L)
+
+	def predict(self, Xq: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+		"""Posterior mean and standard deviation of the latent function at `Xq`."""
+		k = _kernel(Xq, self.X, self.scales)
+		v = np.linalg.solve(self.L, k.T)
+		var = np.maximum(0.0, 1.0 - np.einsum("ij,ij->j", v, v))
+		return self.y_mean + self.y_std * (k @ self.alpha), self.y_std * np.sqrt(var)
+
+	def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+		return {f"{prefix}.{k}": np.asarray(getattr(self, k)) for k in ("X", "scales", "noise", "y_mean", "y_std", "alpha", "L")}
+
+	@classmethod
+	def from_arrays(cls, data: Mapping[str, np.ndarray], prefix: str) -> "GaussianProcess":
+		a = {k: data[f"{prefix}.{k}"] for k in ("X", "scales", "noise", "y_mean", "y_std", "alpha", "L")}
+		return cls(**{k: (float(v) if v.ndim == 0 else v) for k, v in a.items()})
+
+
+def _log_likelihood(X: np.ndarray, y: np.ndarray, scales: np.ndarray, noise: float) -> float:
+	try:
+		L = np.linalg.cholesky(_kernel(X, X, scales) + noise * np.eye(len(X)))
+	except np.linalg.LinAlgError:
+		return -math.inf
+	alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+	return float(-0.5 * y @ alpha - np.log(np.diag(L)).sum() - 0.5 * len(y) * math.log(2.0 * math.pi))
+
+
+@dataclass
+class Surrogate:
+	inputs: Tuple[str, ...]
+	# Training box in raw units and whether each input is scaled in log space
+	lower: np.ndarray
+	upper: np.ndarray
+	log_inputs: np.ndarray
+	# Output name -> fitted GP, and whether it is modelled in log space
+	models: Dict[str, GaussianProcess]
+	log_outputs: Dict[str, bool]
+	n_train: int
+
+	@classmethod
+	def fit(cls, table, inputs: Sequence[str] | None = None, outputs: Sequence[str] | None = None) -> "Surrogate":
+		"""Fit on a results DataFrame; `outputs` are `OUTPUTS` names (default: those present)."""
+		inputs = tuple(inputs) if inputs else default_inputs(table.columns)
+		if not inputs:
+			raise ValueError("Surrogate needs at least one input column")
+		missing = [c for c in inputs if c not in table.columns]
+		if missing:
+			raise ValueError(f"Input columns not in the results table: {missing}")
+		raw = table[list(inputs)].to_numpy(dtype=float)
+		if not np.isfinite(raw).all():
+			raise ValueError("Surrogate inputs must be finite numbers")
+		lower, upper = raw.min(axis=0), raw.max(axis=0)
+		log_inputs = (lower > 0) & (upper >= 10.0 * lower)
+		surrogate = cls(inputs=inputs, lower=lower, upper=upper, log_inputs=log_inputs, models={}, log_outputs={}, n_train=len(table))
+		X = surrogate.unit(raw)
+		names = list(outputs) if outputs else [n for n, c in OUTPUTS.items() if c in table.columns]
+		for name in names:
+			if name not in OUTPUTS or OUTPUTS[name] not in table.columns:
+				raise ValueError(f"Output {name!r} not in the results table")
+			y = table[OUTPUTS[name]].to_numpy(dtype=float)
+			ok = np.isfinite(y)
+			if name == "years_to_target" and not ok.all():
+				surrogate.models["p_met"] = GaussianProcess.fit(X, ok.astype(float))
+				surrogate.log_outputs["p_met"] = False
+			if ok.sum() < 2:
+				continue
+			log = bool((y[ok] > 0).all())
+			surrogate.models[name] = GaussianProcess.fit(X[ok], np.log(y[ok]) if log else y[ok])
+			surrogate.log_outputs[name] = log
+		return surrogate
+
+	def _scaled(self, raw: np.ndarray) -> np.ndarray:
+		"""Raw inputs on the log scale where `log_inputs` is set."""
+		raw = np.asarray(raw, dtype=float)
+		return np.where(self.log_inputs, np.log(np.where(self.log_inputs, np.maximum(raw, 1e-300), 1.0)), raw)
+
+	def unit(self, raw: np.ndarray) -> np.ndarray:
+		"""Raw inputs mapped onto the unit cube of the training box."""
+		lo, hi = self._scaled(self.lower), self._scaled(self.upper)
+		return (self._scaled(raw) - lo) / np.where(hi > lo, hi - lo, 1.0)
+
+	def raw(self, unit: np.ndarray) -> np.ndarray:
+		lo, hi = self._scaled(self.lower), self._scaled(self.upper)
+		x = lo + unit * (hi - lo)
+		return np.where(self.log_inputs, np.exp(x), x)
+
+	def predict(self, queries: Sequence[Mapping[str, float]]) -> List[Dict[str, Any]]:
+		"""Per query: each output's median and 90% interval, `p_met`, and the inputs outside the training box."""
+		raw = np.array([[float(q[k]) for k in self.inputs] for q in queries], dtype=float)
+		X = self.unit(raw)
+		tol = 1e-9 * np.maximum(1.0, np.abs(self.upper))
+		outside = (raw < self.lower - tol) | (raw > self.upper + tol)
+		preds = {name: gp.predict(X) for name, gp in self.models.items()}
+		out = []
+		for i in range(len(raw)):
+			row: Dict[str, Any] = {"outside_domain": [k for k, o in zip(self.inputs, outside[i]) if o]}
+			for name, (mu, sd) in preds.items():
+				if name == "p_met":
+					row[name] = float(np.clip(mu[i], 0.0, 1.0))
+					continue
+				lo, mid, hi = mu[i] - INTERVAL_Z * sd[i], mu[i], mu[i] + INTERVAL_Z * sd[i]
+				if self.log_outputs[name]:
+					lo, mid, hi = math.exp(lo), math.exp(mid), math.exp(hi)
+				row[name] = {"median": float(mid), "p5": float(lo), "p95": float(hi)}
+			out.append(row)
+		return out
+
+	def suggest(self, n: int, candidates: int = 4096) -> List[Dict[str, float]]:
+		"""`n` points in the training box where the emulator is least certain.
+
+		Greedy over Sobol candidates by the largest standardized predictive
+		sd over the outputs. Each pick joins the training inputs, which
+		shrinks the variance around it, so later picks spread out.
+		"""
+		if len(self.inputs) > 21:
+			raise ValueError("suggest supports at most 21 inputs (Sobol candidates)")
+		C = sobol(candidates, len(self.inputs), skip=1)
+		train = {name: gp.X for name, gp in self.models.items()}
+		picks: List[int] = []
+		for _ in range(min(n, candidates)):
+			# The posterior variance does not depend on the observed values
+			score = np.max([_posterior_sd(train[name], gp.scales, gp.noise, C) for name, gp in self.models.items()], axis=0)
+			score[picks] = -1.0
+			j = int(np.argmax(score))
+			picks.append(j)
+			for name in train:
+				train[name] = np.vstack([train[name], C[j:j + 1]])
+		raw = self.raw(C[picks])
+		return [{k: float(v) for k, v in zip(self.inputs, row)} for row in raw]
+
+	def save(self, path: Path) -> None:
+		meta = {"inputs": list(self.inputs), "log_outputs": self.log_outputs, "n_train": self.n_train}
+		arrays = {"lower": self.lower, "upper": self.upper, "log_inputs": self.log_inputs}
+		for name, gp in self.models.items():
+			arrays.update(gp.arrays(name))
+		np.savez_compressed(path, meta=np.array(json.dumps(meta)), **arrays)
+
+	@classmethod
+	def load(cls, path: Path) -> "Surrogate":
+		with np.load(path) as data:
+			meta = json.loads(str(data["meta"]))
+			models = {name: GaussianProcess.from_arrays(data, name) for name in meta["log_outputs"]}
+			return cls(inputs=tuple(meta["inputs"]), lower=data["lower"], upper=data["upper"], log_inputs=data["log_inputs"],
+				models=models, log_outputs=meta["log_outputs"], n_train=meta["n_train"])
+
+
+def _posterior_sd(X: np.ndarray, scales: np.ndarray, noise: float, Xq: np.ndarray) -> np.ndarray:
+	"""Standardized posterior sd at `Xq` of a GP trained at `X`."""
+	L = np.linalg.cholesky(_kernel(X, X, scales) + noise * np.eye(len(X)))
+	v = np.linalg.solve(L, _kernel(Xq, X, scales).T)
+	return np.sqrt(np.maximum(0.0, 1.0 - np.einsum("ij,ij->j", v, v)))
+
+
+def default_inputs(columns: Sequence[str]) -> Tuple[str, ...]:
+	"""Columns after the id column (`point_id`/`replicate`) and before `years_to_target`."""
+	columns = list(columns)
+	start = next((i + 1 for i, c in enumerate(columns) if c in ID_COLUMNS), 0)
+	end = columns.index("years_to_target") if "years_to_target" in columns else len(columns)
+	return tuple(columns[start:end])
@@ -0,0 +1,129 @@
+"""Sweep scheduler: dedupe design points, run them and consolidate one results table."""
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Any, List, Sequence, Tuple
+import json
+import pandas as pd
+from ..config import with_overrides
+from . import OUTPUT_KINDS
+from .batch import run_batch
+from .designs import SweepSpec, generate_points
+from .engine import run_until
+from .plan import compile_scenario
+from .cache import CacheStats, RunCache
+from .runner import RunTask, run_tasks
+from .scenarios import build_scenario
+from .store import ResultsStore
+from .summary import flatten_summary
+from .trajectory import group_by_trajectory, evaluate_grouped
+
+
+def point_key(point: Dict[str, Any]) -> Tuple:
+	"""Canonical identity of a design point; floats compare at 12 significant digits."""
+	return tuple((k, float(f"{v:.12g}") if isinstance(v, float) else json.dumps(v, sort_keys=True)) for k, v in sorted(point.items()))
+
+
+def dedupe_points(points: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[int]]:
+	"""Return (unique points in first-seen order, index into the unique list for every input point)."""
+	seen: Dict[Tuple, int] = {}
+	unique: List[Dict[str, Any]] = []
+	index: List[int] = []
+	for p in points:
+		key = point_key(p)
+		if key not in seen:
+			seen[key] = len(unique)
+			unique.append(p)
+		index.append(seen[key])
+	return unique, index
+
+
+def prefix_checkpoint(cfg: Dict[str, Any], variant_cfgs: Sequence[Dict[str, Any]], path: Path) -> Path:
+	"""Simulate the pre-launch prefix of `cfg` once and save its checkpoint to `path`.
+
+	Raises ValueError if any variant changes a field that shapes that prefix
+	(see `ds.sim.checkpoint.PREFIX_FIELDS`).
+	"""
+	scenario = build_scenario(cfg)
+	plan = compile_scenario(scenario)
+	checkpoint = run_until(scenario, min(plan.launch_day, plan.horizon_days))
+	for c in variant_cfgs:
+		checkpoint.check_fork(compile_scenario(build_scenario(c)))
+	return checkpoint.save(path)
+
+
+def shares_trajectory(scenarios: Sequence[Dict[str, Any]], engine: str | None = None) -> bool:
+	"""True if some scenarios differ only in post-processing fields (`ds.sim.trajectory.POST_FIELDS`)."""
+	_, groups = group_by_trajectory(scenarios, engine)
+	return len(groups) < len(scenarios)
+
+
+def batch_summaries(scenarios: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+	"""Summaries for the batch engine, in input order.
+
+	If scenarios share deployment trajectories, each trajectory is simulated
+	once (vectorized engine) and its variants are evaluated from it;
+	otherwise they run through `run_batch`, grouped by horizon.
+	"""
+	grouping = group_by_trajectory(scenarios, "vectorized")
+	if len(grouping[1]) < len(scenarios):
+		return evaluate_grouped(scenarios, "vectorized", grouping)
+	summaries: List[Dict[str, Any] | None] = [None] * len(scenarios)
+	groups: Dict[int, List[int]] = {}
+	for i, s in enumerate(scenarios):
+		groups.setdefault(int(s.get("horizon_years", 25)), []).append(i)
+	for rows in groups.values():
+		res = run_batch([scenarios[i] for i in rows])
+		for i, s in zip(rows, res.summaries):
+			summaries[i] = s
+	return summaries  # type: ignore[return-value]
+
+
+def run_points(cfg: Dict[str, Any], points: Sequence[Dict[str, Any]], out_dir: Path, engine: str | None = None, jobs: int = 1, outputs: Tuple[str, ...] = OUTPUT_KINDS, fork: bool = False,
+		cache: RunCache | None = None, stats: CacheStats | None = None, store: ResultsStore | None = None, group_id: str | None = None) -> List[Dict[str, Any]]:
+	"""Run each (unique) point and return its summary in point order.
+
+	With engine "batch" points are grouped by horizon and evaluated with
+	`run_batch` (summaries only); otherwise every point gets a full output
+	directory under `out_dir/points/` holding the selected `outputs`.
+	Points that differ only in post-processing fields are evaluated from a
+	cached deployment trajectory (`ds.sim.trajectory`). Otherwise, with
+	`fork` (loop engine) the shared pre-launch prefix is simulated once and
+	every point resumes from its checkpoint. Full runs are looked up in
+	`cache` first, with hits and misses added to `stats`. With a `store`,
+	their timeseries are written to its dataset under `group_id`.
+	"""
+	if fork and (engine or "loop") != "loop":
+		raise ValueError("fork needs the loop engine")
+	if engine == "batch":
+		return batch_summaries([build_scenario(with_overrides(cfg, p)) for p in points])
+	base = dict(cfg, engine=engine) if engine else cfg
+	cfgs = [with_overrides(base, p) for p in points]
+	# Points that differ only in post-processing reuse each worker's cached trajectory
+	reuse = shares_trajectory([build_scenario(c) for c in cfgs])
+	resume = str(prefix_checkpoint(base, cfgs, out_dir / "prefix_checkpoint.npz")) if fork and not reuse else None
+	parts = [(str(store.timeseries_path(group_id, i)), store.run_id(group_id, i)) if store else None for i in range(len(cfgs))]
+	tasks = [RunTask(cfg=c, out_dir=str(out_dir / "points" / f"point_{i:04d}"), outputs=outputs, resume=resume, reuse_trajectory=reuse, cache=cache, store_part=part)
+		for i, (c, part) in enumerate(zip(cfgs, parts))]
+	return run_tasks(tasks, jobs=jobs, desc="Sweep points", stats=stats)
+
+
+def run_sweep_spec(cfg: Dict[str, Any], spec: SweepSpec, out_dir: Path, engine: str | None = None, jobs: int = 1, outputs: Tuple[str, ...] = OUTPUT_KINDS, fork: bool = False,
+		cache: RunCache | None = None, stats: CacheStats | None = None, store: ResultsStore | None = None, group_id: str | None = None) -> pd.DataFrame:
+	"""Generate, dedupe and run a sweep design; writes `results.csv` with one row per unique point.
+
+	With a `store` the points are also indexed there under `group_id`.
+	"""
+	out_dir.mkdir(parents=True, exist_ok=True)
+	points, _ = dedupe_points(generate_points(spec))
+	summaries = run_points(cfg, points, out_dir, engine=engine or spec.engine or cfg.get("engine"), jobs=jobs, outputs=outputs, fork=fork, cache=cache, stats=stats, store=store, group_id=group_id)
+	if store:
+		point_dirs = [None if engine == "batch" else out_dir / "points" / f"point_{i:04d}" for i in range(len(points))]
+		store.record(group_id, ({"label": i, "params": p, "summary": s, "out_dir": d} for i, (p, s, d) in enumerate(zip(points, summaries, point_dirs))))
+	rows = [{"point_id": i, **p, **flatten_summary(s)} for i, (p, s) in enumerate(zip(points, summaries))]
+	table = pd.DataFrame(rows)
+	table.to_csv(out_dir / "results.csv", index=False)
+	try:
+		table.to_parquet(out_dir / "results.parquet", index=False)
+	except Exception:
+		pass
+	return table
@@ -0,0 +1,187 @@
+"""Two-stage evaluation: deployment trajectory, then power post-processing.
+
+The factory/launch/transport trajectory (deployed area on every day)
+does not depend on the collector efficiency and degradation, thermal derate,
+beaming chain, OD cap or area target (`POST_FIELDS` of the plan).
+`deployment_trajectory` runs an engine once per distinct trajectory and keeps
+the result in a small per-process cache. `evaluate` turns one trajectory into
+summaries for any number of post-processing variants in one array pass;
+`with_post` rebuilds full run results (timeseries, events, summary) for one
+variant without rerunning the day loop.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Any, List, Sequence, Tuple
+import numpy as np
+from .events import EventLog
+from .plan import ScenarioPlan, compile_scenario
+from .recorder import TIMESERIES_COLUMNS, frame_from_columns
+from .shells import grid_table
+from .summary import summarize, timeseries_totals, parameter_report
+from .vintage import fleet_factor, vintage_table
+
+# Plan fields applied only after deployment
+POST_FIELDS = ("base_eff_1au", "degradation", "thermal_derate", "beaming_chain", "od_cap", "target_area_m2")
+# Timeseries columns produced by the post-processing stage
+POST_COLUMNS = ("optical_depth", "power_GW_1AU_equiv")
+
+
+def trajectory_key(plan: ScenarioPlan, engine: str) -> Tuple[str, ScenarioPlan]:
+	"""Plans with equal keys deploy identically; they differ at most in `POST_FIELDS` (and name)."""
+	return engine, replace(plan, name="", **{f: 0.0 for f in POST_FIELDS})
+
+
+def _engine(scenario: Dict[str, Any], engine: str | None) -> str:
+	return engine or scenario.get("engine", "loop")
+
+
+@dataclass(frozen=True)
+class DeploymentTrajectory:
+	"""Post-independent output of one run. Arrays are read-only and shared by every variant."""
+	plan: ScenarioPlan
+	# Timeseries columns except `POST_COLUMNS` (bands take fixed shares of `cum_area_m2`)
+	columns: Dict[str, np.ndarray]
+	events: EventLog
+	# `timeseries_totals` entries that do not depend on post-processing
+	totals: Dict[str, Any]
+	growth_multiplier_final: float | None
+
+	@classmethod
+	def from_results(cls, plan: ScenarioPlan, results: Dict[str, Any]) -> "DeploymentTrajectory":
+		ts = results["timeseries"]
+		columns = {name: ts[name].to_numpy() for name, _ in TIMESERIES_COLUMNS if name not in POST_COLUMNS}
+		for a in columns.values():
+			a.flags.writeable = False
+		totals = timeseries_totals(ts, plan.target_area_m2)
+		for k in ("day_target_met", "final_power_GW"):
+			del totals[k]
+		return cls(plan, columns, results["events"], totals, results["summary"]["caps"]["growth_multiplier_final"])
+
+
+class TrajectoryCache:
+	"""Most recently used trajectories of this process, keyed by `trajectory_key`."""
+
+	def __init__(self, maxsize: int = 8):
+		self.maxsize = maxsize
+		self._entries: OrderedDict = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, scenario: Dict[str, Any], engine: str | None = None, plan: ScenarioPlan | None = None) -> DeploymentTrajectory:
+		from .engine import run_simulation
+		engine = _engine(scenario, engine)
+		plan = plan if plan is not None else compile_scenario(scenario)
+		key = trajectory_key(plan, engine)
+		traj = self._entries.get(key)
+		if traj is not None:
+			self.hits += 1
+			self._entries.move_to_end(key)
+			return traj
+		self.misses += 1
+		traj = DeploymentTrajectory.from_results(plan, run_simulation(scenario, engine=engine))
+		self._entries[key] = traj
+		if len(self._entries) > self.maxsize:
+			self._entries.popitem(last=False)
+		return traj
+
+	def clear(self) -> None:
+		self._entries.clear()
+		self.hits = self.misses = 0
+
+
+TRAJECTORIES = TrajectoryCache()
+
+
+def deployment_trajectory(scenario: Dict[str, Any], engine: str | None = None) -> DeploymentTrajectory:
+	return TRAJECTORIES.get(scenario, engine)
+
+
+def post_params(plans: Sequence[ScenarioPlan]) -> Dict[str, np.ndarray]:
+	"""`POST_FIELDS` of each plan as `(N,)` arrays (`degradation` stays a list of tuples)."""
+	post = {f: np.array([getattr(p, f) for p in plans], dtype=float) for f in POST_FIELDS if f != "degradation"}
+	post["degradation"] = [p.degradation for p in plans]
+	return post
+
+
+def _eff(traj: DeploymentTrajectory, post: Dict[str, Any], rows: slice) -> Tuple[np.ndarray, np.ndarray]:
+	"""(PV efficiency, end-to-end efficiency) as `(N, rows)` arrays, as in the engines."""
+	days, cum_area = traj.columns["day"], traj.columns["cum_area_m2"]
+	factors: Dict[Any, np.ndarray] = {}
+	for d in post["degradation"]:
+		if d not in factors:
+			factors[d] = fleet_factor(np.diff(cum_area, prepend=0.0), cum_area, d, days=days)[0][rows]
+	eff_now = post["base_eff_1au"][:, None] * np.stack([factors[d] for d in post["degradation"]])
+	return eff_now, eff_now * (post["thermal_derate"] * post["beaming_chain"])[:, None]
+
+
+def power_series(traj: DeploymentTrajectory, post: Dict[str, Any], rows: slice = slice(None)) -> np.ndarray:
+	"""Delivered power (GW, 1 AU equivalent) as an `(N, days)` array; `rows` selects a day range."""
+	_, eff = _eff(traj, post, rows)
+	return (traj.columns["cum_area_m2"][rows] * traj.plan.irradiance_weighted * eff) * 1e-9
+
+
+def evaluate(traj: DeploymentTrajectory, scenarios: Sequence[Dict[str, Any]], plans: Sequence[ScenarioPlan] | None = None) -> List[Dict[str, Any]]:
+	"""Summaries of post-processing variants of `traj`, reduced in one array pass over all of them."""
+	plans = plans if plans is not None else [compile_scenario(s) for s in scenarios]
+	base = trajectory_key(traj.plan, "")[1]
+	if any(trajectory_key(p, "")[1] != base for p in plans):
+		raise ValueError("Scenarios differ from the trajectory in more than post-processing fields")
+	post = post_params(plans)
+	days = traj.columns["day"]
+	if not len(days):
+		raise ValueError("Trajectory has no days")
+	last = slice(len(days) - 1, None)
+	eff_end = _eff(traj, post, last)[0][:, 0]
+	power_end = power_series(traj, post, last)[:, 0]
+	cum_area = traj.columns["cum_area_m2"]
+	# Deployed area never decreases, so the first day at target is a sorted search
+	met = np.searchsorted(cum_area, post["target_area_m2"], side="left")
+	bands_final = [w * float(cum_area[-1]) for w in traj.plan.band_weights]
+	summaries = []
+	for k, (scenario, plan) in enumerate(zip(scenarios, plans)):
+		totals = dict(traj.totals, day_target_met=int(days[met[k]]) if met[k] < len(days) else None, final_power_GW=float(power_end[k]))
+		summaries.append(summarize(scenario, totals, bands_final, list(plan.band_means), float(eff_end[k]), traj.growth_multiplier_final))
+	return summaries
+
+
+def with_post(traj: DeploymentTrajectory, scenario: Dict[str, Any], plan: ScenarioPlan | None = None) -> Dict[str, Any]:
+	"""Full run results for one variant of `traj` (shape of `run_simulation`'s return value)."""
+	plan = plan if plan is not None else compile_scenario(scenario)
+	post = post_params([plan])
+	columns = dict(traj.columns)
+	columns["power_GW_1AU_equiv"] = power_series(traj, post)[0]
+	columns["optical_depth"] = np.minimum(traj.columns["cum_area_m2"] * plan.od_factor, plan.od_cap)
+	summary = evaluate(traj, [scenario], [plan])[0]
+	ts = frame_from_columns(columns, *plan.band_blocks(traj.columns["cum_area_m2"]))
+	results = {"timeseries": ts, "events": traj.events, "summary": summary, "parameters": parameter_report(scenario)}
+	vintages = vintage_table(plan, ts)
+	if vintages is not None:
+		results["vintages"] = vintages
+	grid = grid_table(plan)
+	if grid is not None:
+		results["shell_grid"] = grid
+	return results
+
+
+def group_by_trajectory(scenarios: Sequence[Dict[str, Any]], engine: str | None = None) -> Tuple[List[ScenarioPlan], Dict[Tuple, List[int]]]:
+	"""Compiled plans and scenario indices grouped by shared trajectory (first-seen order)."""
+	plans = [compile_scenario(s) for s in scenarios]
+	groups: Dict[Tuple, List[int]] = {}
+	for i, (s, p) in enumerate(zip(scenarios, plans)):
+		groups.setdefault(trajectory_key(p, _engine(s, engine)), []).append(i)
+	return plans, groups
+
+
+def evaluate_grouped(scenarios: Sequence[Dict[str, Any]], engine: str | None = None, grouping: Tuple[List[ScenarioPlan], Dict[Tuple, List[int]]] | None = None) -> List[Dict[str, Any]]:
+	"""Summaries in input order; each distinct trajectory is simulated once.
+
+	`grouping` reuses a `group_by_trajectory` result for the same scenarios.
+	"""
+	plans, groups = grouping if grouping is not None else group_by_trajectory(scenarios, engine)
+	summaries: List[Dict[str, Any] | None] = [None] * len(scenarios)
+	for (eng, _), rows in groups.items():
+		traj = TRAJECTORIES.get(scenarios[rows[0]], eng, plans[rows[0]])
+		for i, s in zip(rows, evaluate(traj, [scenarios[i] for i in rows], [plans[i] for i in rows])):
+			summaries[i] = s
+	return summaries  # type: ignore[return-value]
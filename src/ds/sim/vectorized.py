@@ -0,0 +1,238 @@
+"""Whole-horizon vectorized engine.
+
+Computes the same daily quantities as the loop engine in `ds.sim.engine`
+(learning factor, replication multiplier, mass drivers, cadence and transport
+caps, band split, OD and power) as NumPy arrays over the full horizon. Only the
+replication multiplier is scanned sequentially, and only over replication
+events (one per `replication_cycle_days`), not over days.
+
+Tolerance vs. the loop engine: timeseries columns and summary values agree to
+a relative tolerance of 1e-9. Two documented deviations stay within it:
+- Mass-driver completions use floor(cumsum(growth) / duration) instead of the
+  loop's running remainder, so a completion landing within float rounding of
+  a day boundary may shift by one day.
+- Once usable resources are exhausted, production is exactly zero rather than
+  the loop's float-rounding residue of the remaining mass.
+
+In stochastic reliability mode the daily up fractions are drawn first, one
+`UnitPool.step` per day and in the loop's order, so both engines consume the
+same random stream. The unit counts are known in advance because reliability
+changes output, not the build-out.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Any
+import numpy as np
+from ..config import make_rng
+from ..economy.flows import ENERGY, LAUNCH_PRODUCTS
+from ..economy.reliability import UnitPool
+from .plan import ScenarioPlan, compile_scenario
+from .events import EventLog, INFRASTRUCTURE_PERIOD_DAYS
+from .recorder import frame_from_columns
+from .streaming import StreamSink
+from .summary import summarize, timeseries_totals, parameter_report
+from .vintage import fleet_factor
+
+RTOL = 1e-9
+
+def growth_multiplier_series(elapsed: np.ndarray, replication_factor: float, cycle_days: float, max_growth: float, g0: float = 1.0) -> tuple[np.ndarray, np.ndarray]:
+	"""Growth multiplier used on each elapsed day and the value after that day's replication check.
+
+	`g0` is the multiplier carried in from before `elapsed[0]` (1.0 at the start of a run).
+	"""
+	is_rep = np.mod(elapsed, cycle_days) == 0
+	rep_idx = np.flatnonzero(is_rep)
+	# Sequential scan over replication events only; the cap is not monotone in general
+	levels = np.empty(len(rep_idx) + 1, dtype=float)
+	g = g0
+	levels[0] = g
+	for k in range(len(rep_idx)):
+		g = min(g * replication_factor, max_growth)
+		levels[k + 1] = g
+	after = levels[np.cumsum(is_rep)]
+	used = np.empty_like(after)
+	if len(after):
+		used[0] = g0
+		used[1:] = after[:-1]
+	return used, after
+
+
+def _cumsum_from(start: float | np.ndarray, x: np.ndarray) -> np.ndarray:
+	"""Running sum of `x` (along axis 0) continuing from `start`; sequential like the loop's accumulator."""
+	return np.cumsum(np.concatenate((np.asarray(start, dtype=float)[None], x)), axis=0)[1:]
+
+
+@dataclass
+class ChunkState:
+	"""State carried between day chunks: everything a chunk needs from the days before it."""
+	day: int = 0
+	growth_multiplier: float = 1.0
+	md_progress: float = 0.0
+	resource_used_kg: float = 0.0
+	cum_area: float = 0.0
+	# Retained area of each collector type (`ds.sim.vintage.fleet_factor`)
+	retained: np.ndarray | None = None
+	# Stochastic reliability state (mutated in place chunk to chunk)
+	pool: UnitPool | None = None
+
+
+def factory_series(plan: ScenarioPlan, n_days: int, state: ChunkState | None = None) -> Dict[str, np.ndarray]:
+	"""Daily factory outputs for `n_days` from `state.day`, mirroring `Factory.tick_day`."""
+	state = state or ChunkState()
+	uptime = plan.uptime
+	learning_b = plan.learning_b
+	elapsed = np.arange(state.day + 1, state.day + n_days + 1, dtype=float)
+	learning_factor = np.power(elapsed, 1.0 - learning_b) if learning_b > 0 else np.ones(n_days)
+	g_used, g_after = growth_multiplier_series(elapsed, plan.replication_factor, plan.replication_cycle_days, plan.max_growth_multiplier, state.growth_multiplier)
+	# Mass-driver build progress accrues the post-replication growth multiplier
+	md_cum = _cumsum_from(state.md_progress, g_after)
+	md_total = np.floor(md_cum / plan.md_duration_days)
+	up = None
+	md_availability = np.ones(n_days)
+	pool = state.pool
+	if pool is not None:
+		# Units at the start of each day: lines from the multiplier in use, rails built by the day before
+		md_before = np.concatenate(([np.floor(state.md_progress / plan.md_duration_days)], md_total[:-1]))
+		up = pool.step_days(pool.fleet_units(g_used, md_before))
+		if pool.is_mass_driver.any():
+			md_availability = up[:, -1]
+	# Flow solve per day (stochastic) or once at unit scale (steady state), times the daily factor
+	flows = plan.flows
+	if pool is None:
+		unit = plan.unit_output()
+	else:
+		avail = np.tile(np.array(plan.flow_availability), (n_days, 1))
+		pooled = [(i, pool.names.index(n)) for i, n in enumerate(flows.names) if n in pool.names]
+		if pooled:
+			avail[:, [i for i, _ in pooled]] = up[:, [k for _, k in pooled]]
+		unit = flows.output(avail, LAUNCH_PRODUCTS)
+	scale = uptime * learning_factor * g_used
+	pv = unit["pv_m2"] * scale
+	structure = unit["structure_kg"] * scale
+	energy = unit[ENERGY] * scale
+	# Resource cap: cumulative use may not exceed the usable mass limit
+	areal_density = plan.collector_areal_density_kg_m2
+	used = pv * areal_density + structure
+	used_cum = _cumsum_from(state.resource_used_kg, used)
+	remaining = None
+	if plan.resource_limit_kg is not None and plan.resource_limit_kg >= 0:
+		limit = plan.resource_limit_kg
+		used_before = np.concatenate(([state.resource_used_kg], used_cum[:-1]))
+		remaining_before = np.maximum(0.0, limit - used_before)
+		exceed = used > remaining_before + 1e-9
+		if exceed.any():
+			j = int(np.argmax(exceed))
+			scale = np.ones(n_days)
+			scale[j] = remaining_before[j] / used[j] if used[j] > 0 else 0.0
+			scale[j + 1:] = 0.0
+			pv = pv * scale
+			structure = structure * scale
+			used = pv * areal_density + structure
+			used_cum = _cumsum_from(state.resource_used_kg, used)
+		remaining = np.maximum(0.0, limit - used_cum)
+	return {
+		"pv_m2": pv,
+		"structure_kg": structure,
+		"energy_kWh": energy,
+		"used_mass_kg_day": used,
+		"resource_used_kg": used_cum,
+		"resource_remaining_kg": remaining,
+		"growth_multiplier": g_after,
+		"md_progress": md_cum,
+		"mass_drivers": md_total,
+		"md_availability": md_availability,
+	}
+
+
+def simulate_days(plan: ScenarioPlan, n_days: int, state: ChunkState | None = None) -> tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, ChunkState]:
+	"""Advance `n_days` from `state` (default: day 0).
+
+	Returns (timeseries columns, `(bands, days)` band area and OD blocks, state
+	after the last day). Chaining chunks reproduces one whole-horizon call.
+	"""
+	state = state or ChunkState()
+	days = np.arange(state.day, state.day + n_days)
+	fs = factory_series(plan, n_days, state)
+	num_md = fs["mass_drivers"]
+	# Launch: phase gate, rail cadence and global cadence cap
+	phase = np.where(days < plan.phase0_days, 0, np.where(days < plan.launch_day, 1, 2))
+	cadence_single = plan.launch_cadence_per_day if state.pool is None else plan.launch_cadence_base_per_day * fs["md_availability"]
+	cadence_total = np.minimum(cadence_single * num_md, plan.cadence_cap)
+	area_to_launch = fs["pv_m2"] * (phase >= 2)
+	launched = np.minimum(area_to_launch, cadence_total * plan.package_area_m2)
+	# Transport bottleneck
+	area_per_MW_per_day = plan.area_per_MW_per_day
+	transported = np.minimum(launched, plan.transport_cap_m2_per_day)
+	transport_MW_used = transported / area_per_MW_per_day if area_per_MW_per_day > 0 else np.zeros(n_days)
+	# Bands take fixed shares of the area: OD of the peak band, power from the weighted irradiance
+	cum_area = _cumsum_from(state.cum_area, transported)
+	band_area, band_od = plan.band_blocks(cum_area)
+	od = np.minimum(cum_area * plan.od_factor, plan.od_cap)
+	factor, retained = fleet_factor(transported, cum_area, plan.degradation, carry=state.retained)
+	eff_now = plan.base_eff_1au * factor
+	eff = eff_now * plan.thermal_derate * plan.beaming_chain
+	power = (cum_area * plan.irradiance_weighted * eff) * 1e-9
+
+	cols: Dict[str, Any] = {
+		"day": days,
+		"phase": phase,
+		"pv_m2": fs["pv_m2"],
+		"structure_kg": fs["structure_kg"],
+		"launched_m2": launched,
+		"cum_area_m2": cum_area,
+		"optical_depth": od,
+		"power_GW_1AU_equiv": power,
+		"mass_drivers_online": num_md,
+		"energy_kWh": fs["energy_kWh"],
+		"resource_remaining_kg": fs["resource_remaining_kg"] if fs["resource_remaining_kg"] is not None else np.full(n_days, np.nan),
+		"used_mass_kg_day": fs["used_mass_kg_day"],
+		"transport_MW_used": transport_MW_used,
+		"transport_MWh": transport_MW_used * 24.0,
+		"eff_now": eff_now,
+	}
+	if n_days:
+		state = ChunkState(
+			day=state.day + n_days,
+			growth_multiplier=float(fs["growth_multiplier"][-1]),
+			md_progress=float(fs["md_progress"][-1]),
+			resource_used_kg=float(fs["resource_used_kg"][-1]),
+			cum_area=float(cum_area[-1]),
+			retained=retained,
+			pool=state.pool,
+		)
+	return cols, band_area, band_od, state
+
+
+def chunk_events(plan: ScenarioPlan, cols: Dict[str, np.ndarray], events: EventLog | None = None) -> EventLog:
+	"""Record a chunk's launches and weekly infrastructure states into `events` (default: a new log)."""
+	events = events if events is not None else EventLog()
+	days = cols["day"]
+	launched = cols["launched_m2"]
+	md = cols["mass_drivers_online"]
+	is_launch = launched > 0
+	is_infra = (md > 0) & (days % INFRASTRUCTURE_PERIOD_DAYS == 0)
+	events.extend_launches(days[is_launch], launched[is_launch], plan.launch_system)
+	events.extend_infrastructure(days[is_infra], md[is_infra])
+	return events
+
+
+def run_vectorized(scenario: Dict[str, Any], plan: ScenarioPlan | None = None, sink: StreamSink | None = None, rng: np.random.Generator | None = None) -> Dict[str, Any]:
+	plan = plan if plan is not None else compile_scenario(scenario)
+	pool = UnitPool.for_plan(plan, rng if rng is not None else make_rng(plan.seed))
+	if sink is not None:
+		# Fixed-size chunks with carried state; only one chunk is alive at a time
+		state = ChunkState(pool=pool)
+		events = EventLog()
+		eff_end = plan.base_eff_1au
+		while state.day < plan.horizon_days:
+			cols, band_area, band_od, state = simulate_days(plan, min(sink.chunk_days, plan.horizon_days - state.day), state)
+			events.clear()
+			sink.write(cols, band_area, band_od, chunk_events(plan, cols, events))
+			eff_end = float(cols["eff_now"][-1])
+		summary = summarize(scenario, sink.totals(), [w * state.cum_area for w in plan.band_weights], list(plan.band_means), eff_end, state.growth_multiplier)
+		return {"timeseries": None, "events": None, "summary": summary, "parameters": parameter_report(scenario)}
+	cols, band_area, band_od, state = simulate_days(plan, plan.horizon_days, ChunkState(pool=pool))
+	ts = frame_from_columns(cols, band_area, band_od)
+	events = chunk_events(plan, cols)
+	summary = summarize(scenario, timeseries_totals(ts, plan.target_area_m2), [w * state.cum_area for w in plan.band_weights], list(plan.band_means), float(cols["eff_now"][-1]), state.growth_multiplier)
+	return {"timeseries": ts, "events": events, "summary": summary, "parameters": parameter_report(scenario)}
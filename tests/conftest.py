@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_dirs(tmp_path_factory, monkeypatch):
+	"""Point the default results store and run cache at temporary directories, so no test writes under $HOME."""
+	monkeypatch.setenv("DS_STORE_DIR", str(tmp_path_factory.mktemp("store")))
+	monkeypatch.setenv("DS_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
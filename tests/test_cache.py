@@ -0,0 +1,39 @@
+import json
+import os
+from ds.sim.cache import CacheStats, RunCache, run_key
+from ds.sim.runner import RunTask, run_tasks
+from ds.sim.scenarios import build_scenario
+
+
+def _tasks(base, cache, uptimes=(0.85, 0.9)):
+	cfg = {"name": "cache", "seed": 5, "horizon_years": 1, "production": {"learning_curve_b": 0.85}}
+	return [RunTask(cfg=dict(cfg, production=dict(cfg["production"], uptime_fraction=u)), out_dir=str(base / f"run_{i}"), cache=cache) for i, u in enumerate(uptimes)]
+
+
+def test_cached_runs_match_and_count(tmp_path):
+	cache = RunCache(tmp_path / "cache")
+	first, second = CacheStats(), CacheStats()
+	a = run_tasks(_tasks(tmp_path / "a", cache), stats=first)
+	b = run_tasks(_tasks(tmp_path / "b", cache, uptimes=(0.9, 0.95)), stats=second)
+	assert (first.hits, first.misses) == (0, 2) and (second.hits, second.misses) == (1, 1)
+	assert json.dumps(a[1]) == json.dumps(b[0])
+	assert (tmp_path / "b" / "run_0" / "timeseries.csv").read_text() == (tmp_path / "a" / "run_1" / "timeseries.csv").read_text()
+
+
+def test_key_covers_scenario_and_stream():
+	scenario = build_scenario({"name": "k", "seed": 1})
+	assert run_key(scenario) == run_key(build_scenario({"seed": 1, "name": "k"}))
+	assert run_key(scenario) != run_key(scenario, stream=0)
+	assert run_key(scenario) != run_key(build_scenario({"name": "k", "seed": 2}))
+
+
+def test_lru_eviction(tmp_path):
+	cache = RunCache(tmp_path, max_bytes=13_000)
+	blob = {"data": b"x" * 4000}
+	for i, key in enumerate(("aa1", "bb2", "cc3")):
+		cache.put(key, blob)
+		os.utime(cache.path(key), (i, i))
+	cache.get("aa1")  # most recently used now
+	assert cache.put("dd4", blob) == 1
+	assert cache.get("bb2") is None
+	assert all(cache.get(k) is not None for k in ("aa1", "cc3", "dd4"))
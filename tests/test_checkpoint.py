@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+from ds.config import load_yaml_config, with_overrides
+from ds.sim.scenarios import build_scenario
+from ds.sim.engine import run_simulation, run_until
+from ds.sim.checkpoint import Checkpoint, CheckpointPolicy
+from ds.sim.plan import compile_scenario
+
+
+def _cfg():
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 12
+	return cfg
+
+
+def test_resume_from_saved_checkpoint_matches_full_run(tmp_path):
+	scenario = build_scenario(_cfg())
+	full = run_simulation(scenario, checkpoints=CheckpointPolicy(tmp_path, every_days=1000))
+	assert sorted(p.name for p in tmp_path.iterdir())[:2] == ["checkpoint_day001000.npz", "checkpoint_day002000.npz"]
+	resumed = run_simulation(scenario, resume=Checkpoint.load(tmp_path / "checkpoint_day003000.npz"))
+	pd.testing.assert_frame_equal(resumed["timeseries"], full["timeseries"])
+	pd.testing.assert_frame_equal(resumed["events"].to_frame(), full["events"].to_frame())
+	assert resumed["summary"] == full["summary"]
+
+
+def test_fork_at_launch_matches_from_scratch_variants():
+	cfg = _cfg()
+	scenario = build_scenario(cfg)
+	checkpoint = run_until(scenario, compile_scenario(scenario).launch_day)
+	for overrides in ({"transport.fleet_power_MW": 5.0e4}, {"launch_strategy.cadence_per_day": 100}, {"launch_strategy.band_weights": [0.3, 0.7]}):
+		variant = build_scenario(with_overrides(cfg, overrides))
+		forked = run_simulation(variant, resume=checkpoint)
+		pd.testing.assert_frame_equal(forked["timeseries"], run_simulation(variant)["timeseries"])
+	with pytest.raises(ValueError, match="uptime"):
+		run_simulation(build_scenario(with_overrides(cfg, {"production.uptime_fraction": 0.5})), resume=checkpoint)
+	with pytest.raises(ValueError, match="loop engine"):
+		run_simulation(scenario, engine="vectorized", resume=checkpoint)
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+
+def _env() -> dict:
+	# Inherit the test's environment, e.g. the temporary store and cache dirs from conftest
+	return dict(os.environ, PYTHONPATH=SRC)
+
+
+def _python(code: str) -> str:
+	return subprocess.run([sys.executable, "-c", code], env=_env(), capture_output=True, text=True, check=True).stdout
+
+
+def test_cli_import_is_light():
+	out = _python("import sys, ds.cli; print(sorted(m for m in ('numpy', 'pandas', 'matplotlib', 'pydantic') if m in sys.modules))")
+	assert out.strip() == "[]"
+
+
+def test_no_plots_run_skips_matplotlib(tmp_path):
+	code = (
+		"import sys; from ds.cli import main; "
+		f"sys.argv = ['ds', 'run', '--scenario', 'data/scenarios/baseline.yaml', '--out', {str(tmp_path)!r}, '--engine', 'vectorized', '--outputs', 'csv,summary', '--no-plots', '--no-store', '--no-cache']; "
+		"main(); print(json.dumps('matplotlib' in sys.modules))"
+	)
+	out = _python("import json; " + code)
+	assert json.loads(out.strip().splitlines()[-1]) is False
+	assert (tmp_path / "summary.json").exists() and (tmp_path / "timeseries.csv").exists()
+	assert not (tmp_path / "figs").exists() and not (tmp_path / "timeseries.parquet").exists()
+
+
+def test_streamed_run_is_indexed_in_store(tmp_path):
+	store = tmp_path / "store"
+	cmd = [sys.executable, "-m", "ds.cli", "run", "--scenario", "data/scenarios/baseline.yaml", "--out", str(tmp_path / "out"),
+		"--engine", "vectorized", "--outputs", "csv,summary", "--no-plots", "--no-cache", "--stream", "--store", str(store)]
+	proc = subprocess.run(cmd, env=_env(), capture_output=True, text=True)
+	assert proc.returncode == 0, proc.stderr
+	assert (tmp_path / "out" / "timeseries.csv").exists() and (store / "index.sqlite").exists()
+	assert not (store / "timeseries").exists()
+
+
+def test_sensitivity_writes_undefined_indices_as_null(tmp_path):
+	spec = tmp_path / "spec.yaml"
+	spec.write_text("samples: 8\nbootstrap: 0\nmetrics: [years_to_target]\nparameters:\n"
+		"  transport.fleet_power_MW: {min: 100, max: 200}\n  production.uptime_fraction: {min: 0.8, max: 0.9}\n")
+	cmd = [sys.executable, "-m", "ds.cli", "sensitivity", "--scenario", "data/scenarios/baseline.yaml", "--spec", str(spec), "--out", str(tmp_path / "out"), "--no-store"]
+	proc = subprocess.run(cmd, env=_env(), capture_output=True, text=True)
+	assert proc.returncode == 0, proc.stderr
+	assert "zero variance" in proc.stderr
+	indices = json.loads(proc.stdout)["indices"]
+	assert indices and all(r["S1"] is None and r["ST"] is None for r in indices)
+
+
+def test_mc_run_reports_its_cache_block(tmp_path):
+	cmd = [sys.executable, "-m", "ds.cli", "run", "--scenario", "data/scenarios/baseline.yaml", "--out", str(tmp_path), "--mc", "3", "--no-plots"]
+	proc = subprocess.run(cmd, env=_env(), capture_output=True, text=True)
+	assert proc.returncode == 0, proc.stderr
+	meta = json.loads(proc.stderr.strip().splitlines()[-1])
+	assert "cache" in meta and "store_group" in meta
@@ -0,0 +1,41 @@
+import numpy as np
+from ds.sim.designs import SweepSpec, generate_points, latin_hypercube, sobol
+from ds.sim.sweeps import dedupe_points, run_sweep_spec
+
+
+def test_sobol_and_lhs_are_stratified():
+	n = 256
+	for u in (sobol(n, 5), latin_hypercube(n, 5, np.random.default_rng(3))):
+		assert u.min() >= 0.0 and u.max() < 1.0
+		for j in range(u.shape[1]):
+			assert (np.bincount((u[:, j] * n).astype(int), minlength=n) == 1).all()
+
+
+def test_grid_points_are_deduped():
+	spec = SweepSpec.from_dict({
+		"design": "grid",
+		"parameters": {
+			"production.uptime_fraction": {"values": [0.8, 0.9, 0.8]},
+			"caps.max_growth_multiplier": {"min": 10.0, "max": 100.0, "num": 2},
+		},
+	})
+	points = generate_points(spec)
+	unique, index = dedupe_points(points)
+	assert len(points) == 6 and len(unique) == 4
+	assert index[4] == index[0]
+
+
+def test_sweep_spec_writes_one_row_per_point(tmp_path):
+	cfg = {"name": "spec", "horizon_years": 2, "production": {"uptime_fraction": 0.85, "learning_curve_b": 0.85}}
+	spec = SweepSpec.from_dict({
+		"design": "sobol",
+		"samples": 8,
+		"parameters": {
+			"production.learning_curve_b": {"min": 0.75, "max": 0.9},
+			"transport.fleet_power_MW": {"min": 10, "max": 1000, "scale": "log"},
+		},
+	})
+	table = run_sweep_spec(cfg, spec, tmp_path, engine="batch")
+	assert len(table) == 8
+	assert {"production.learning_curve_b", "transport.fleet_power_MW", "total_area_m2"} <= set(table.columns)
+	assert (tmp_path / "results.csv").exists()
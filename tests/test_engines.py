@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ds.config import load_yaml_config
+from ds.sim.scenarios import build_scenario
+from ds.sim.engine import run_simulation
+from ds.sim.vectorized import RTOL
+from ds.sim.batch import run_batch
+from ds.sim.recorder import TimeseriesRecorder
+from ds.sim.plan import compile_scenario
+from ds.sim.events import EventLog
+
+
+@pytest.mark.parametrize("name", ["advanced_k2", "low_yield"])
+def test_vectorized_matches_loop(name):
+	cfg = load_yaml_config(f"data/scenarios/{name}.yaml")
+	cfg["horizon_years"] = 12
+	scenario = build_scenario(cfg)
+	loop = run_simulation(scenario)
+	vec = run_simulation(scenario, engine="vectorized")
+	ts_l, ts_v = loop["timeseries"], vec["timeseries"]
+	assert list(ts_l.columns) == list(ts_v.columns)
+	for c in ts_l.columns:
+		np.testing.assert_allclose(ts_v[c].astype(float), ts_l[c].astype(float), rtol=RTOL, err_msg=c)
+	for k in ("total_area_m2", "delivered_power_GW_at_1AU_equiv", "energy_kWh_total", "transport_MWh_total"):
+		assert vec["summary"][k] == pytest.approx(loop["summary"][k], rel=RTOL)
+	assert vec["summary"]["caps"] == loop["summary"]["caps"]
+	assert len(vec["events"]) == len(loop["events"])
+	pd.testing.assert_frame_equal(vec["events"].to_frame(), loop["events"].to_frame(), check_exact=False, rtol=RTOL)
+
+
+def test_event_log_runs_and_queries():
+	log = EventLog()
+	for day in (0, 7, 14):
+		log.infrastructure(day, 2)
+	log.launch(21, 5.0, "md")
+	log.infrastructure(21, 3)
+	log.extend_infrastructure(np.array([28, 35, 49]), np.array([3, 3, 3]))
+	# Unchanged weekly states collapse into runs: 0-14 @ 2, 21-35 @ 3, 49 @ 3 (gap)
+	assert log.infrastructure_runs.rows == 3
+	assert len(log) == 8 and log.count("launch") == 1
+	q = log.query("infrastructure", start=10, stop=36)
+	assert q["day"].tolist() == [14, 21, 28, 35] and q["mass_drivers_online"].tolist() == [2, 3, 3, 3]
+	assert log.systems[log.query("launch")["system"][0]] == "md"
+	df = log.to_frame(start=21, stop=22)
+	assert df["type"].tolist() == ["launch", "infrastructure"]
+	with pytest.raises(ValueError):
+		log.query("failure")
+
+
+def test_recorder_frame_shares_memory():
+	rec = TimeseriesRecorder(10, 2)
+	rec.columns["pv_m2"][:] = 1.0
+	rec.band_area_T[1] = 2.0
+	rec.rows = 4
+	ts = rec.to_frame()
+	assert len(ts) == 4 and rec.band_area.shape == (4, 2)
+	assert np.shares_memory(ts["pv_m2"].to_numpy(), rec.columns["pv_m2"])
+	assert np.shares_memory(ts["band_1_area_m2"].to_numpy(), rec.band_area_T)
+
+
+def test_compile_scenario_rejects_bad_config():
+	cfg = load_yaml_config("data/scenarios/baseline.yaml")
+	plan = compile_scenario(build_scenario(cfg))
+	with pytest.raises(AttributeError):
+		plan.uptime = 1.0
+	cfg["production"]["uptime_fraction"] = 1.5
+	with pytest.raises(ValueError, match="uptime_fraction"):
+		run_simulation(build_scenario(cfg))
+
+
+def test_unknown_engine_rejected():
+	scenario = build_scenario({"name": "x", "horizon_years": 1, "production": {"uptime_fraction": 0.85}})
+	with pytest.raises(ValueError):
+		run_simulation(scenario, engine="warp")
+
+
+def test_batch_matches_single_runs():
+	names = ["advanced_k2", "baseline", "fast_ramp"]
+	scenarios = []
+	for name in names:
+		cfg = load_yaml_config(f"data/scenarios/{name}.yaml")
+		cfg["horizon_years"] = 10
+		cfg["targets"]["total_collector_area_m2"] = 1.0e9
+		scenarios.append(build_scenario(cfg))
+	batch = run_batch(scenarios, timeseries=True)
+	assert batch.timeseries["cum_area_m2"].shape == (3, 3650)
+	for k, scenario in enumerate(scenarios):
+		single = run_simulation(scenario, engine="vectorized")
+		s, b = single["summary"], batch.summaries[k]
+		assert b["years_to_target"] == s["years_to_target"]
+		for key in ("total_area_m2", "delivered_power_GW_at_1AU_equiv", "energy_kWh_total", "transport_MWh_total"):
+			assert b[key] == pytest.approx(s[key], rel=RTOL)
+		np.testing.assert_allclose(batch.timeseries["power_GW_1AU_equiv"][k], single["timeseries"]["power_GW_1AU_equiv"], rtol=RTOL)
+
+
+def test_batch_requires_shared_horizon():
+	a = build_scenario({"name": "a", "horizon_years": 1, "production": {"uptime_fraction": 0.85}})
+	b = build_scenario({"name": "b", "horizon_years": 2, "production": {"uptime_fraction": 0.85}})
+	with pytest.raises(ValueError):
+		run_batch([a, b])
+
+
+def test_post_processing_variants_share_trajectory():
+	from ds.config import with_overrides
+	from ds.sim.trajectory import TrajectoryCache, evaluate_grouped, with_post
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 12
+	overrides = [
+		{"beaming.pointing": 0.9},
+		{"mercury_site.radiator_area_m2": 5.0e4},
+		{"collectors.collector_types.thin_film_pv_A.efficiency_1AU": 0.2, "collectors.collector_types.thin_film_pv_A.degradation_per_year": 0.05},
+		{"targets.optical_depth_max": 1e-6, "targets.total_collector_area_m2": 1.0e9},
+	]
+	scenarios = [build_scenario(with_overrides(cfg, o)) for o in overrides]
+	summaries = evaluate_grouped(scenarios, "loop")
+	cache = TrajectoryCache()
+	for scenario, summary in zip(scenarios, summaries):
+		full = run_simulation(scenario)
+		for k in ("years_to_target", "delivered_power_GW_at_1AU_equiv", "energy_kWh_total"):
+			assert summary[k] == pytest.approx(full["summary"][k], rel=RTOL)
+		assert summary["efficiencies"]["effective_eff_1au_end"] == pytest.approx(full["summary"]["efficiencies"]["effective_eff_1au_end"], rel=RTOL)
+		ts = with_post(cache.get(scenario, "loop"), scenario)["timeseries"]
+		np.testing.assert_allclose(ts.to_numpy(float), full["timeseries"].to_numpy(float), rtol=RTOL)
+	assert (cache.misses, cache.hits) == (1, 3)
+
+
+@pytest.mark.parametrize("overrides", [
+	{},
+	# Slow ramp: mass-driver completions and a transport-cap switch inside phase 2
+	{"transport.fleet_power_MW": 1.0, "caps.max_growth_multiplier": 1.0, "targets.total_collector_area_m2": 5.0e7},
+])
+def test_adaptive_matches_loop(overrides):
+	from ds.config import with_overrides
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 12
+	scenario = build_scenario(with_overrides(cfg, overrides))
+	loop = run_simulation(scenario)
+	ada = run_simulation(scenario, engine="adaptive")
+	stepping = ada["stepping"]
+	assert stepping["steps"] < 100 and stepping["error_bound_rel"] < RTOL
+	for c in loop["timeseries"].columns:
+		np.testing.assert_allclose(ada["timeseries"][c].astype(float), loop["timeseries"][c].astype(float), rtol=RTOL, err_msg=c)
+	for k in ("years_to_target", "total_area_m2", "delivered_power_GW_at_1AU_equiv", "energy_kWh_total", "transport_MWh_total"):
+		assert ada["summary"][k] == pytest.approx(loop["summary"][k], rel=RTOL)
+	assert len(ada["events"]) == len(loop["events"])
+	# Coarse output samples the same solution; totals come from the steps, not the rows
+	coarse = run_simulation(build_scenario(with_overrides(cfg, dict(overrides, output_every_days=30))), engine="adaptive")
+	ts = coarse["timeseries"]
+	assert ts["day"].iloc[-1] == 12 * 365 - 1 and len(ts) == 147
+	np.testing.assert_allclose(ts.to_numpy(float), ada["timeseries"].iloc[ts["day"]].to_numpy(float), rtol=RTOL)
+	assert coarse["summary"] == ada["summary"]
+
+
+def test_uncapped_baseline_runs_to_its_horizon():
+	# Replication is uncapped here: the mass-driver count outgrows int64 before 40 years
+	cfg = load_yaml_config("data/scenarios/baseline.yaml")
+	for years in (cfg["horizon_years"], 40):
+		ts = run_simulation(build_scenario(dict(cfg, horizon_years=years)))["timeseries"]
+		assert len(ts) == years * 365
+		md = ts["mass_drivers_online"].to_numpy()
+		assert np.isfinite(md).all() and (np.diff(md) >= 0).all()
+	assert md[-1] > 2.0 ** 63
+
+
+def test_vectorized_counts_beyond_int64_match_loop():
+	cfg = dict(load_yaml_config("data/scenarios/baseline.yaml"), horizon_years=40)
+	scenario = build_scenario(cfg)
+	loop = run_simulation(scenario)
+	md_l = loop["timeseries"]["mass_drivers_online"]
+	assert md_l.iloc[-1] > 2.0 ** 63
+	for engine in ("vectorized", "adaptive"):
+		other = run_simulation(scenario, engine=engine)
+		np.testing.assert_allclose(other["timeseries"]["mass_drivers_online"], md_l, rtol=RTOL, err_msg=engine)
+		assert other["events"].count("infrastructure") == loop["events"].count("infrastructure")
+
+
+def test_engines_share_the_loop_column_dtypes():
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 3
+	scenario = build_scenario(cfg)
+	ref = run_simulation(scenario)
+	ref_ts, ref_events = ref["timeseries"].dtypes, ref["events"].to_frame().dtypes
+	for engine in ("vectorized", "adaptive"):
+		res = run_simulation(scenario, engine=engine)
+		pd.testing.assert_series_equal(res["timeseries"].dtypes, ref_ts, obj=f"{engine} timeseries dtypes")
+		pd.testing.assert_series_equal(res["events"].to_frame().dtypes, ref_events, obj=f"{engine} event dtypes")
+	cube = run_batch([scenario], timeseries=True).timeseries
+	assert all(cube[c].dtype == ref_ts[c] for c in cube if c in ref_ts)
@@ -0,0 +1,65 @@
+import time
+import numpy as np
+import pytest
+from ds.economy.flows import ENERGY, FlowNetwork
+from ds.sim.plan import compile_scenario
+from ds.sim.scenarios import build_scenario
+
+
+def _chain(n, rate=1.0, yield_=0.5):
+	nodes = {f"n{i}": {"kW": 1.0, "product": f"p{i}", "product_yield": yield_ if i else 1.0} for i in range(n)}
+	edges = [[f"n{i}", f"n{i + 1}", rate] for i in range(n - 1)]
+	return FlowNetwork.from_config(nodes, edges, {name: 100.0 for name in nodes})
+
+
+def test_consumption_limits_and_proportional_sharing():
+	nodes = {
+		"mine": {"kW": 10, "product": "ore"},
+		"a": {"kW": 1, "product": "pv_m2"},
+		"b": {"kW": 1, "product": "structure_kg"},
+	}
+	net = FlowNetwork.from_config(nodes, [["mine", "a", 2.0], ["mine", "b", 1.0]], {"mine": 100.0, "a": 40.0, "b": 40.0})
+	out = net.unit_output(np.ones(3))
+	# Demand 80 + 40 ore against 100 supplied: both consumers run at 100/120
+	assert out["pv_m2"] == pytest.approx(40 * 100 / 120)
+	assert out["structure_kg"] == pytest.approx(40 * 100 / 120)
+	assert out["ore"] == pytest.approx(100.0)
+	assert out[ENERGY] == pytest.approx(24 * 12)
+	# Ample ore: consumers run at capacity, outputs scale with availability
+	half = net.unit_output([1.0, 0.5, 0.5])
+	assert half["pv_m2"] == pytest.approx(20.0) and half["structure_kg"] == pytest.approx(20.0)
+
+
+def test_batched_solve_matches_rows():
+	net = _chain(5)
+	avail = np.random.default_rng(0).random((7, 5))
+	batched = net.output(avail)
+	for i in range(len(avail)):
+		row = net.unit_output(avail[i])
+		assert all(batched[k][i] == pytest.approx(v) for k, v in row.items())
+
+
+def test_cycle_and_unknown_nodes_rejected():
+	nodes = {"a": {"product": "x"}, "b": {"product": "y"}}
+	with pytest.raises(ValueError, match="cycle"):
+		FlowNetwork.from_config(nodes, [["a", "b", 1.0], ["b", "a", 1.0]], {})
+	with pytest.raises(ValueError, match="unknown"):
+		FlowNetwork.from_config(nodes, [["a", "c"]], {})
+
+
+def test_long_chain_is_fast():
+	net = _chain(60)
+	start = time.perf_counter()
+	out = net.output(np.ones((1000, 60)))
+	assert time.perf_counter() - start < 1.0
+	# Each stage halves the flow of the one before
+	assert out["p59"][0] == pytest.approx(100 * 0.5 ** 59)
+
+
+def test_default_factories_match_line_products():
+	plan = compile_scenario(build_scenario({"name": "flows", "production": {"uptime_fraction": 1.0}}))
+	unit = plan.unit_output()
+	avail = plan.flow_availability
+	pos = {n: i for i, n in enumerate(plan.flows.names)}
+	assert unit["pv_m2"] == pytest.approx(5000 * avail[pos["pv_line"]] + 0.5 * 10000 * avail[pos["reflector_line"]])
+	assert unit["structure_kg"] == pytest.approx(30000 * avail[pos["structure_line"]])
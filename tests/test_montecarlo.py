@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from ds.config import load_yaml_config, with_overrides
+from ds.sim.scenarios import build_scenario
+from ds.sim.batch import run_batch
+from ds.sim.montecarlo import MonteCarloSpec, run_monte_carlo
+
+DISTRIBUTIONS = {
+	"production.uptime_fraction": {"dist": "triangular", "min": 0.7, "mode": 0.85, "max": 0.95},
+	"uncertainty.failure_rate_scale": {"dist": "lognormal", "median": 1.0, "sigma": 0.5, "max": 3.0},
+	"launch_strategy.cadence_per_day": [200, 1000],
+}
+
+
+def _scenario(**overrides):
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 12
+	cfg.setdefault("targets", {})["total_collector_area_m2"] = 1.0e10
+	return build_scenario(with_overrides(cfg, overrides))
+
+
+def test_zero_sigma_replicates_match_batch_run():
+	scenario = _scenario(**{"uncertainty.pv_efficiency_sigma": 0.0, "uncertainty.yield_sigma": 0.0})
+	summary = run_batch([scenario]).summaries[0]
+	mc = run_monte_carlo(scenario, MonteCarloSpec.from_dict(None, replicates=4))
+	for q in ("p5", "p50", "p95"):
+		assert mc.summary["years_to_target"][q] == summary["years_to_target"]
+		assert mc.summary["total_area_m2"][q] == pytest.approx(summary["total_area_m2"], rel=1e-12)
+		assert mc.summary["delivered_power_GW_at_1AU_equiv"][q] == pytest.approx(summary["delivered_power_GW_at_1AU_equiv"], rel=1e-12)
+	assert mc.summary["years_to_target"]["fraction_met"] == 1.0
+
+
+def test_replicates_do_not_depend_on_count_or_block_size():
+	scenario = _scenario()
+	spec = MonteCarloSpec.from_dict({"distributions": DISTRIBUTIONS}, seed=3, replicates=24)
+	mc = run_monte_carlo(scenario, spec)
+	few = run_monte_carlo(scenario, MonteCarloSpec.from_dict({"distributions": DISTRIBUTIONS}, seed=3, replicates=5), max_elements=5000)
+	for k, v in few.samples.items():
+		np.testing.assert_array_equal(v, mc.samples[k][:5])
+	assert set(mc.samples["launch_strategy.cadence_per_day"]) == {200, 1000}
+	assert np.ptp(mc.samples["total_area_m2"]) > 0
+	area = mc.bands["cum_area_m2"]
+	assert area.shape == (3, len(mc.days)) and (np.diff(area, axis=0) >= 0).all()
+	with pytest.raises(ValueError, match="triangular needs"):
+		MonteCarloSpec.from_dict({"distributions": {"production.uptime_fraction": {"dist": "triangular", "min": 0.7}}}, replicates=2)
+
+
+def test_sequential_run_stops_at_target_width(tmp_path):
+	scenario = _scenario()
+	dists = {"production.uptime_fraction": DISTRIBUTIONS["production.uptime_fraction"], "launch_strategy.cadence_per_day": {"dist": "uniform", "min": 600, "max": 1500}}
+	stopping = {"batch": 40, "targets": [{"metric": "years_to_target", "stat": "p90", "abs": 0.25}, {"metric": "delivered_power_GW_at_1AU_equiv", "stat": "mean", "rel": 0.02}]}
+	spec = MonteCarloSpec.from_dict({"distributions": dists, "stopping": stopping}, seed=3, replicates=4000)
+	mc = run_monte_carlo(scenario, spec)
+	n = mc.summary["replicates"]
+	assert mc.summary["stopping"]["reason"] == "converged" and n < 4000 and n % 40 == 0
+	assert [row["replicates"] for row in mc.trace] == list(range(40, n + 1, 40))
+	assert mc.trace[-1]["converged"] and not mc.trace[-2]["converged"]
+	fixed = run_monte_carlo(scenario, MonteCarloSpec.from_dict({"distributions": dists}, seed=3, replicates=n))
+	np.testing.assert_array_equal(fixed.samples["delivered_power_GW_at_1AU_equiv"], mc.samples["delivered_power_GW_at_1AU_equiv"])
+	power = fixed.samples["delivered_power_GW_at_1AU_equiv"]
+	est = mc.summary["stopping"]["estimates"]["delivered_power_GW_at_1AU_equiv_mean"]
+	assert est["estimate"] == pytest.approx(power.mean(), rel=1e-12)
+	assert est["half_width"] == pytest.approx(1.959964 * power.std(ddof=1) / np.sqrt(n), rel=1e-6)
+	budget = run_monte_carlo(scenario, MonteCarloSpec.from_dict({"distributions": dists, "stopping": dict(stopping, max_seconds=0)}, replicates=400))
+	assert budget.summary["stopping"]["reason"] == "max_seconds" and budget.summary["replicates"] == 40
+
+
+def test_unreached_target_never_converges():
+	scenario = _scenario(**{"targets.total_collector_area_m2": 1.0e30})
+	stopping = {"batch": 20, "targets": [{"metric": "years_to_target", "stat": "p90", "rel": 0.05}]}
+	mc = run_monte_carlo(scenario, MonteCarloSpec.from_dict({"distributions": DISTRIBUTIONS, "stopping": stopping}, seed=3, replicates=100))
+	assert mc.summary["stopping"]["reason"] == "replicates" and mc.summary["replicates"] == 100
+	assert not any(row["converged"] for row in mc.trace)
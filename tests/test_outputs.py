@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from ds.sim.scenarios import build_scenario
+from ds.sim.engine import run_simulation
+from ds.sim.outputs import write_outputs
+from ds.sim.render import lttb, render_runs
+
+
+def test_lttb_keeps_endpoints_and_spike():
+	x = np.arange(10_000, dtype=float)
+	y = np.sin(x / 500.0)
+	y[4321] = 50.0
+	idx = lttb(x, y, 300)
+	assert len(idx) == 300 and idx[0] == 0 and idx[-1] == len(x) - 1
+	assert np.all(np.diff(idx) > 0) and 4321 in idx
+	assert len(lttb(x[:100], y[:100], 300)) == 100
+
+
+def test_deferred_render(tmp_path):
+	results = run_simulation(build_scenario({"name": "r", "horizon_years": 2}), engine="vectorized")
+	write_outputs(results, tmp_path / "run", outputs=("csv",))
+	assert not (tmp_path / "run" / "figs").exists()
+	written = render_runs([tmp_path / "run"], max_points=200)
+	assert len(written[0]) == 5 and (tmp_path / "run" / "figs" / "power_vs_time.png").exists()
+
+
+def test_streaming_matches_in_memory(tmp_path):
+	import pandas as pd
+	from ds.config import load_yaml_config
+	from ds.sim.streaming import run_streaming
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 12
+	scenario = build_scenario(cfg)
+	for engine in ("loop", "vectorized"):
+		full = run_simulation(scenario, engine=engine)
+		streamed = run_streaming(scenario, tmp_path / engine, engine=engine, outputs=("csv", "summary"), chunk_days=1000)
+		assert streamed["timeseries"] is None
+		ts = pd.read_csv(tmp_path / engine / "timeseries.csv")
+		np.testing.assert_allclose(ts.to_numpy(float), full["timeseries"].to_numpy(float), rtol=1e-12)
+		assert len(pd.read_csv(tmp_path / engine / "events.csv")) == len(full["events"])
+		for k in ("years_to_target", "total_area_m2", "energy_kWh_total", "transport_MWh_total"):
+			assert streamed["summary"][k] == pytest.approx(full["summary"][k], rel=1e-12)
+
+
+def test_checked_in_reference_results_match_the_engine():
+	import json
+	import pandas as pd
+	from ds.config import load_yaml_config
+	results = run_simulation(build_scenario(load_yaml_config("data/scenarios/advanced_k2.yaml")))
+	with open("results/advanced_k2/summary.json") as f:
+		ref = json.load(f)
+	for key in ("total_area_m2", "delivered_power_GW_at_1AU_equiv", "energy_kWh_total", "transport_MWh_total"):
+		assert results["summary"][key] == pytest.approx(ref[key], rel=1e-9), key
+	ts = pd.read_csv("results/advanced_k2/timeseries.csv")
+	for c in ("cum_area_m2", "power_GW_1AU_equiv", "energy_kWh"):
+		np.testing.assert_allclose(results["timeseries"][c], ts[c], rtol=1e-9, err_msg=c)
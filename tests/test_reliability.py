@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ds.config import load_yaml_config, make_rng, with_overrides
+from ds.economy.reliability import UnitPool, transition_probabilities
+from ds.sim.scenarios import build_scenario
+from ds.sim.engine import run_simulation
+from ds.sim.checkpoint import Checkpoint, CheckpointPolicy
+from ds.sim.vectorized import RTOL
+
+
+def _scenario(mode="stochastic"):
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 12
+	cfg["reliability_mode"] = mode
+	cfg["caps"]["max_growth_multiplier"] = 1.0
+	cfg["transport"]["fleet_power_MW"] = 1.0e4
+	# One shot per rail per day and small packages: launches are limited by the rails that are up
+	return with_overrides(build_scenario(cfg), {
+		"vehicles.launchers.mercury_mass_driver.cooldown_s": 86400.0,
+		"collectors.collector_types.thin_film_pv_A.area_m2": 100.0,
+	})
+
+
+def test_pool_tracks_steady_state_with_aggregate_draws():
+	pool = UnitPool(["line", "mercury_mass_driver"], [5000.0, 4000.0], [24.0, 24.0], 1.5, np.random.default_rng(0))
+	up = pool.step_days(pool.fleet_units(np.full(5000, 1.0e6), np.full(5000, 40.0)))
+	expected = [m / 1.5 / (m / 1.5 + 24.0) for m in (5000.0, 4000.0)]
+	np.testing.assert_allclose(up[100:].mean(axis=0), expected, rtol=1e-3)
+	# Millions of lines fluctuate little; 40 rails lose whole units
+	assert up[100:, 0].std() < 1e-3 and set(np.unique(up[:, 1] * 40)) <= set(range(41))
+	assert pool.up.sum() + pool.down.sum() == 1_000_040
+	assert transition_probabilities(0.0, 24.0) == (1.0, 0.0)
+
+
+def test_stochastic_engines_agree_and_resume(tmp_path):
+	scenario = _scenario()
+	loop = run_simulation(scenario, checkpoints=CheckpointPolicy(tmp_path, at_days=(3000,)))
+	vec = run_simulation(scenario, engine="vectorized")
+	for c in loop["timeseries"].columns:
+		np.testing.assert_allclose(vec["timeseries"][c].astype(float), loop["timeseries"][c].astype(float), rtol=RTOL, err_msg=c)
+	resumed = run_simulation(scenario, resume=Checkpoint.load(tmp_path / "checkpoint_day003000.npz"))
+	pd.testing.assert_frame_equal(resumed["timeseries"], loop["timeseries"])
+	# Rails in repair lower the launch rate below the steady-state model on some days
+	expected = run_simulation(_scenario("expected"), engine="vectorized")["timeseries"]["launched_m2"]
+	ratio = loop["timeseries"]["launched_m2"][expected > 0] / expected[expected > 0]
+	assert ratio.min() < 1.0 < ratio.max()
+	other = run_simulation(scenario, engine="vectorized", rng=make_rng(scenario["seed"], 1))
+	assert not np.array_equal(other["timeseries"]["launched_m2"], vec["timeseries"]["launched_m2"])
+	with pytest.raises(ValueError, match="stochastic"):
+		run_simulation(scenario, engine="adaptive")
+
+
+def test_failure_rate_scale_reaches_steady_state_only_in_monte_carlo():
+	from ds.sim.batch import run_batch
+	from ds.sim.montecarlo import MonteCarloSpec, run_monte_carlo
+	nominal, scaled = (with_overrides(_scenario("expected"), {"uncertainty.failure_rate_scale": s, "uncertainty.pv_efficiency_sigma": 0.0, "uncertainty.yield_sigma": 0.0})
+		for s in (1.0, 3.0))
+	single = run_simulation(scaled)["summary"]
+	assert single == run_simulation(nominal)["summary"]
+	area = run_batch([scaled]).summaries[0]["total_area_m2"]
+	assert area == pytest.approx(single["total_area_m2"], rel=RTOL)
+	mc = run_monte_carlo(scaled, MonteCarloSpec.from_dict(None, replicates=2))
+	assert mc.summary["total_area_m2"]["p50"] < area * (1 - 1e-3)
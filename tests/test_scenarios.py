@@ -1,3 +1,6 @@
+import copy
+import pickle
+import pytest
 from pathlib import Path
 from ds.sim.scenarios import build_scenario
 from ds.sim.engine import run_simulation
@@ -10,3 +13,17 @@ def test_reproducibility_seed():
 	r1 = run_simulation(s1)
 	r2 = run_simulation(s2)
 	assert r1["summary"]["total_area_m2"] == r2["summary"]["total_area_m2"]
+
+
+def test_base_data_shared_read_only():
+	s1 = build_scenario({"name": "a"})
+	s2 = build_scenario({"name": "b"})
+	assert s1["factories"] is s2["factories"]
+	with pytest.raises(TypeError):
+		s1["factories"]["replication"]["replication_factor"] = 3.0
+	with pytest.raises(TypeError):
+		s1["bodies"]["bodies"].append({})
+	own = copy.deepcopy(s1["factories"])
+	own["replication"]["replication_factor"] = 3.0
+	assert s2["factories"]["replication"]["replication_factor"] == 1.6
+	assert pickle.loads(pickle.dumps(s1["factories"])) == s1["factories"]
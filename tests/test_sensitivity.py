@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from ds.config import load_yaml_config, with_overrides
+from ds.sim.scenarios import build_scenario
+from ds.sim.batch import run_batch
+from ds.sim.sensitivity import SensitivitySpec, evaluate_points, run_sensitivity, saltelli_design, sobol_indices
+
+
+def test_sobol_indices_match_ishigami():
+	n, d = 4096, 3
+	A, B, AB = saltelli_design(n, d)
+
+	def f(u):
+		x = -np.pi + 2.0 * np.pi * u
+		return np.sin(x[..., 0]) + 7.0 * np.sin(x[..., 1]) ** 2 + 0.1 * x[..., 2] ** 4 * np.sin(x[..., 0])
+
+	first, total = sobol_indices(f(A), f(B), f(AB))
+	assert np.allclose(first, [0.314, 0.442, 0.0], atol=0.03)
+	assert np.allclose(total, [0.558, 0.442, 0.244], atol=0.03)
+
+
+def test_evaluate_points_matches_batch_summaries():
+	scenario = build_scenario(load_yaml_config("data/scenarios/advanced_k2.yaml"))
+	keys = ("transport.fleet_power_MW", "production.uptime_fraction")
+	rows = [(300.0, 0.9), (1500.0, 0.85), (3000.0, 0.95)]
+	out = evaluate_points(scenario, keys, rows)
+	summaries = run_batch([with_overrides(scenario, dict(zip(keys, r))) for r in rows]).summaries
+	for i, s in enumerate(summaries):
+		years = s["years_to_target"]
+		assert out["years_to_target"][i] == (np.inf if years is None else years)
+		assert np.isclose(out["delivered_power_GW_at_1AU_equiv"][i], s["delivered_power_GW_at_1AU_equiv"])
+
+
+def test_run_sensitivity_ranks_levers():
+	scenario = build_scenario(load_yaml_config("data/scenarios/advanced_k2.yaml"))
+	spec = SensitivitySpec.from_dict({"samples": 64, "bootstrap": 50, "metrics": ["delivered_power_GW_at_1AU_equiv"], "parameters": {
+		"transport.fleet_power_MW": {"min": 100, "max": 3000, "scale": "log"},
+		"caps.max_growth_multiplier": {"min": 1.0e4, "max": 1.0e6, "scale": "log"},
+	}})
+	results = run_sensitivity(scenario, spec)
+	assert len(results.evaluations["point_id"]) == 64 * 4
+	st = {r["parameter"]: r for r in results.indices}
+	assert st["transport.fleet_power_MW"]["ST"] > 0.5 > st["caps.max_growth_multiplier"]["ST"]
+	assert st["transport.fleet_power_MW"]["ST_lo"] <= st["transport.fleet_power_MW"]["ST"] <= st["transport.fleet_power_MW"]["ST_hi"]
+
+
+def test_constant_metric_warns_and_has_no_indices():
+	scenario = build_scenario(with_overrides(load_yaml_config("data/scenarios/advanced_k2.yaml"), {"targets.total_collector_area_m2": 1.0e30}))
+	spec = SensitivitySpec.from_dict({"samples": 16, "bootstrap": 10, "metrics": ["years_to_target"], "parameters": {
+		"transport.fleet_power_MW": {"min": 100, "max": 3000, "scale": "log"},
+		"production.uptime_fraction": {"min": 0.8, "max": 0.97},
+	}})
+	with pytest.warns(UserWarning, match="years_to_target has zero variance"):
+		results = run_sensitivity(scenario, spec)
+	assert all(np.isnan(r["S1"]) and np.isnan(r["ST"]) for r in results.indices)
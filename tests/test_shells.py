@@ -0,0 +1,89 @@
+from statistics import NormalDist
+import numpy as np
+import pytest
+from ds.config import load_yaml_config
+from ds.sim.batch import run_batch
+from ds.sim.engine import run_simulation
+from ds.sim.montecarlo import Distribution
+from ds.sim.outputs import write_outputs
+from ds.sim.plan import compile_scenario
+from ds.sim.scenarios import build_scenario
+from ds.sim.shells import load_shells, radial_shells
+from ds.sim.vectorized import RTOL
+
+
+def test_distribution_cdf_inverts_sampling():
+	u = np.linspace(0.01, 0.99, 99)
+	z = np.array([NormalDist().inv_cdf(p) for p in u])
+	for spec in ({"dist": "normal", "mean": 0.4, "sd": 0.05}, {"dist": "lognormal", "median": 0.4, "sigma": 0.3},
+			{"dist": "uniform", "min": 0.3, "max": 0.5}, {"dist": "loguniform", "min": 0.3, "max": 0.5},
+			{"dist": "triangular", "min": 0.3, "mode": 0.35, "max": 0.5}):
+		d = Distribution.from_dict("r", spec)
+		np.testing.assert_allclose(d.cdf(d.sample(z, u)), u, atol=1e-12, err_msg=spec["dist"])
+	with pytest.raises(ValueError, match="no cdf"):
+		Distribution.from_dict("r", [1, 2]).cdf(np.zeros(1))
+
+
+def test_shell_weights():
+	edges, w = radial_shells({"r_min_AU": 0.3, "r_max_AU": 0.5, "shells": 4})
+	np.testing.assert_allclose(edges, [0.3, 0.35, 0.4, 0.45, 0.5])
+	np.testing.assert_allclose(w, 0.25)
+	# A triangular profile integrates exactly over shells that straddle its knots
+	_, w = radial_shells({"r_min_AU": 0.2, "r_max_AU": 0.6, "shells": 4, "profile": [[0.3, 0.0], [0.4, 1.0], [0.5, 0.0]]})
+	np.testing.assert_allclose(w, [0.0, 0.5, 0.5, 0.0], atol=1e-15)
+	_, w = radial_shells({"r_min_AU": 0.3, "r_max_AU": 0.5, "shells": 1000, "distribution": {"dist": "normal", "mean": 0.4, "sd": 0.02}})
+	assert w.sum() == pytest.approx(1.0) and np.argmax(w) in (499, 500)
+	for bad, match in (({"r_min_AU": 0.5, "r_max_AU": 0.3, "shells": 2}, "r_min_AU < r_max_AU"),
+			({"r_min_AU": 0.3, "r_max_AU": 0.5, "shells": 2, "distribution": {"dist": "uniform", "min": 0.7, "max": 0.8}}, "no weight"),
+			({"r_min_AU": 0.3, "r_max_AU": 0.5, "shells": 2, "profile": [[0.3, 1.0]], "distribution": {"dist": "uniform", "min": 0, "max": 1}}, "not both")):
+		with pytest.raises(ValueError, match=match):
+			radial_shells(bad)
+
+
+def _scenario(grid=None, bands=None):
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 12
+	scenario = build_scenario(cfg)
+	ls = dict(scenario["launch_strategy"], band_weights=None)
+	if grid is not None:
+		ls["radial_grid"] = grid
+	if bands is not None:
+		ls["target_bands_AU"] = bands
+	return dict(scenario, launch_strategy=ls)
+
+
+def test_grid_matches_equivalent_bands_without_band_columns():
+	grid = _scenario({"r_min_AU": 0.3, "r_max_AU": 0.6, "shells": 3})
+	bands = _scenario(bands=[[0.3, 0.4], [0.4, 0.5], [0.5, 0.6]])
+	ref = run_simulation(bands)
+	ts_ref = ref["timeseries"]
+	for engine in ("loop", "vectorized", "adaptive"):
+		res = run_simulation(grid, engine=engine)
+		ts = res["timeseries"]
+		assert not any(c.startswith("band_") for c in ts.columns)
+		for c in ("cum_area_m2", "optical_depth", "power_GW_1AU_equiv"):
+			np.testing.assert_allclose(ts[c], ts_ref[c], rtol=RTOL, err_msg=f"{engine} {c}")
+		assert res["summary"]["bands"] == [] and res["summary"]["shells"]["count"] == 3
+		assert res["summary"]["shells"]["power_GW"] == pytest.approx(sum(b["power_GW"] for b in ref["summary"]["bands"]), rel=RTOL)
+	batch = run_batch([grid], timeseries=True)
+	assert batch.timeseries["band_area_m2"].shape[2] == 0
+	assert batch.summaries[0]["delivered_power_GW_at_1AU_equiv"] == pytest.approx(ref["summary"]["delivered_power_GW_at_1AU_equiv"], rel=RTOL)
+
+
+def test_shell_matrix_written_and_streamed(tmp_path):
+	from ds.sim.streaming import run_streaming
+	scenario = _scenario({"r_min_AU": 0.25, "r_max_AU": 0.65, "shells": 800, "distribution": {"dist": "lognormal", "median": 0.4, "sigma": 0.15}})
+	plan = compile_scenario(scenario)
+	assert len(plan.band_means) == 800 and plan.band_columns == 0
+	results = run_simulation(scenario)
+	ts = results["timeseries"]
+	write_outputs(results, tmp_path / "mem", ("csv",))
+	m = load_shells(tmp_path / "mem")
+	assert isinstance(m.area_m2, np.memmap) and m.area_m2.shape == (len(ts), 800)
+	np.testing.assert_array_equal(m.day, ts["day"])
+	np.testing.assert_allclose(m.area_m2.sum(axis=1), ts["cum_area_m2"], rtol=1e-12)
+	rows = slice(4000, 4010)
+	np.testing.assert_allclose(m.power_GW(rows).sum(axis=1), ts["power_GW_1AU_equiv"].to_numpy()[rows], rtol=1e-12)
+	np.testing.assert_allclose(m.optical_depth(rows).max(axis=1), ts["optical_depth"].to_numpy()[rows], rtol=1e-12)
+	run_streaming(scenario, tmp_path / "stream", outputs=("csv", "summary"), chunk_days=1000)
+	np.testing.assert_allclose(load_shells(tmp_path / "stream" / "shells").area_m2, m.area_m2, rtol=1e-12)
@@ -0,0 +1,36 @@
+import pytest
+from ds.config import load_yaml_config, with_overrides
+from ds.sim.scenarios import build_scenario
+from ds.sim.batch import run_batch
+from ds.sim.plan import compile_scenario
+from ds.sim.solve import solve_minimum
+from ds.sim.summary import get_path
+
+
+def _years(scenario, values):
+	return run_batch([with_overrides(scenario, dict(values, horizon_years=15))]).summaries[0]["years_to_target"]
+
+
+def test_solve_brackets_the_deadline_threshold():
+	scenario = build_scenario(load_yaml_config("data/scenarios/advanced_k2.yaml"))
+	keys = ["transport.fleet_power_MW", "launch_strategy.cadence_per_day"]
+	result = solve_minimum(scenario, keys, deadline_years=15.0, rtol=1e-3)
+	out = result.to_dict()
+	assert out["feasible"] and out["monotone"] and out["batch_runs"] <= 8
+	assert _years(scenario, out["values"]) <= 15.0
+	assert _years(scenario, out["values_below"]) is None
+	assert out["values"]["transport.fleet_power_MW"] / out["values_below"]["transport.fleet_power_MW"] <= 1.001
+	assert out["binding"]["binding"] == "transport"
+	# Transport alone cannot reach the target: rails stay the binding cap
+	alone = solve_minimum(scenario, keys[:1], deadline_years=15.0)
+	assert not alone.feasible and alone.values is None and alone.binding["binding"] == "cadence"
+
+
+def test_levers_missing_from_the_scenario_anchor_on_their_fallback():
+	scenario = build_scenario(load_yaml_config("data/scenarios/baseline.yaml"))
+	assert get_path(scenario, "transport.fleet_power_MW", None) is None
+	keys = ["transport.fleet_power_MW", "launch_strategy.cadence_per_day"]
+	result = solve_minimum(scenario, keys, deadline_years=20.0, rtol=1e-2)
+	assert result.feasible and result.anchors[0] == compile_scenario(scenario).fleet_MW
+	with pytest.raises(ValueError, match="set it in the scenario to scale it with other levers"):
+		solve_minimum(scenario, [keys[0], "phases.no_such_lever"], deadline_years=20.0)
@@ -0,0 +1,49 @@
+import sqlite3
+import numpy as np
+import pytest
+from ds.sim.runner import RunTask, run_tasks
+from ds.sim.store import ResultsStore, quote_dotted
+
+
+def test_quote_dotted_leaves_literals():
+	where = "param.production.uptime_fraction > 0.8 and label = 'a.b' and years_to_target < 2.5"
+	assert quote_dotted(where) == "\"param.production.uptime_fraction\" > 0.8 and label = 'a.b' and years_to_target < 2.5"
+
+
+def test_record_and_query_across_groups(tmp_path):
+	store = ResultsStore(tmp_path)
+	sweep = store.new_group("sweep", "demo")
+	store.record(sweep, [{"label": i, "params": {"transport.fleet_power_MW": p}, "summary": {"years_to_target": y, "materials": {"used_kg": 1.0}}}
+		for i, (p, y) in enumerate([(100.0, 30.0), (500.0, 12.0), (900.0, None)])])
+	mc = store.new_group("mc", "demo")
+	store.record_table(mc, {"replicate": np.arange(3), "x": np.array([0.1, 0.2, 0.3]), "years_to_target": np.array([5.0, np.nan, 25.0])}, label="replicate", params=["x"])
+	hits = store.query("years_to_target < 20", columns=["kind", "param.transport.fleet_power_MW", "param.x"], order_by="years_to_target")
+	assert hits["run_id"].tolist() == [f"{mc}/0", f"{sweep}/1"]
+	assert hits["param.transport.fleet_power_MW"].tolist()[1] == 500.0 and hits["kind"].tolist() == ["mc", "sweep"]
+	assert len(store.query("materials.used_kg = 1 and years_to_target is null")) == 1
+
+
+def test_runs_write_timeseries_parts(tmp_path):
+	store = ResultsStore(tmp_path / "store")
+	group = store.new_group("mc", "par")
+	cfg = {"name": "par", "seed": 5, "horizon_years": 1}
+	tasks = [RunTask(cfg=dict(cfg, replicate=i), out_dir=str(tmp_path / f"r{i}"), stream=i, outputs=("summary",),
+		store_part=(str(store.timeseries_path(group, i)), store.run_id(group, i))) for i in range(2)]
+	summaries = run_tasks(tasks)
+	store.record(group, [{"label": i, "summary": s} for i, s in enumerate(summaries)])
+	ts = store.timeseries([store.run_id(group, 1)], columns=["day", "cum_area_m2"])
+	assert set(ts.columns) == {"run_id", "day", "cum_area_m2"} and (ts["run_id"] == store.run_id(group, 1)).all()
+	assert len(ts) == 365
+
+
+def test_invalid_query_closes_its_connection(tmp_path, monkeypatch):
+	store = ResultsStore(tmp_path)
+	opened = []
+	connect = store._connect
+	monkeypatch.setattr(store, "_connect", lambda readonly=False: opened.append(connect(readonly)) or opened[-1])
+	with pytest.raises(ValueError, match="Invalid store query"):
+		store.query("no_such_column > 1")
+	# A closed connection refuses further statements
+	for con in opened:
+		with pytest.raises(sqlite3.ProgrammingError):
+			con.execute("SELECT 1")
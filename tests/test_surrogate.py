@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ds.config import load_yaml_config, with_overrides
+from ds.sim.scenarios import build_scenario
+from ds.sim.batch import run_batch
+from ds.sim.designs import SweepSpec, generate_points
+from ds.sim.summary import flatten_summary
+from ds.sim.surrogate import Surrogate
+
+PARAMETERS = {
+	"production.uptime_fraction": {"min": 0.6, "max": 0.95},
+	"transport.fleet_power_MW": {"min": 100, "max": 3000, "scale": "log"},
+}
+
+
+def _table(design, samples, seed=0):
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 15
+	cfg["targets"]["total_collector_area_m2"] = 3.0e10
+	scenario = build_scenario(cfg)
+	points = generate_points(SweepSpec.from_dict({"design": design, "samples": samples, "seed": seed, "parameters": PARAMETERS}))
+	summaries = run_batch([with_overrides(scenario, p) for p in points]).summaries
+	return pd.DataFrame([{"point_id": i, **p, **flatten_summary(s)} for i, (p, s) in enumerate(zip(points, summaries))])
+
+
+def test_surrogate_predicts_held_out_points(tmp_path):
+	model = Surrogate.fit(_table("sobol", 48))
+	assert model.inputs == tuple(PARAMETERS) and "p_met" in model.models
+	test = _table("lhs", 20, seed=4)
+	pred = model.predict(test[list(model.inputs)].to_dict("records"))
+	area = np.array([p["total_area_m2"]["median"] for p in pred])
+	assert np.median(np.abs(area / test["total_area_m2"] - 1)) < 0.05
+	assert all(p["total_area_m2"]["p5"] <= p["total_area_m2"]["median"] <= p["total_area_m2"]["p95"] for p in pred)
+	assert model.predict([{"production.uptime_fraction": 0.99, "transport.fleet_power_MW": 500}])[0]["outside_domain"] == ["production.uptime_fraction"]
+	model.save(tmp_path / "model.npz")
+	loaded = Surrogate.load(tmp_path / "model.npz")
+	assert loaded.predict(test[list(model.inputs)].iloc[:1].to_dict("records"))[0]["total_area_m2"]["median"] == pytest.approx(area[0], rel=1e-12)
+	# Suggested points lie in the training box and feed a "points" sweep design
+	points = model.suggest(4)
+	assert len({tuple(p.values()) for p in points}) == 4
+	assert all(PARAMETERS[k]["min"] <= v <= PARAMETERS[k]["max"] for p in points for k, v in p.items())
+	assert generate_points(SweepSpec.from_dict({"design": "points", "points": points})) == points
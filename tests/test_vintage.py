@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from ds.config import load_yaml_config, with_overrides
+from ds.sim.batch import run_batch
+from ds.sim.engine import run_simulation
+from ds.sim.plan import compile_scenario
+from ds.sim.scenarios import build_scenario
+from ds.sim.vectorized import RTOL
+from ds.sim.vintage import decayed_cumsum
+
+
+def _naive(added, q, carry=0.0):
+	out, y = [], carry
+	for a in added:
+		y = y * q + a
+		out.append(y)
+	return np.array(out)
+
+
+def test_decayed_cumsum_matches_recurrence_across_blocks():
+	added = np.random.default_rng(0).random(3000)
+	# A fast rate forces many rescaling blocks
+	for rate in (0.0, 1e-4, 0.9):
+		np.testing.assert_allclose(decayed_cumsum(added, rate, carry=2.0), _naive(added, np.exp(-rate), 2.0), rtol=1e-12)
+	np.testing.assert_array_equal(decayed_cumsum(added, np.inf, carry=5.0), added)
+	# Irregular days decay by the gap between them; rows broadcast with their own rates
+	days = np.array([0, 3, 4, 10])
+	y = decayed_cumsum(np.ones((2, 4)), np.array([0.1, 0.2]), days=days)
+	assert y[1, -1] == pytest.approx(1 + np.exp(-1.2) * (1 + np.exp(-0.2) * (1 + np.exp(-0.6))))
+
+
+def _mix_scenario():
+	cfg = load_yaml_config("data/scenarios/advanced_k2.yaml")
+	cfg["horizon_years"] = 14
+	cfg["launch_strategy"]["collector_mix"] = {"thin_film_pv_A": 3, "reflector_microwave_B": 1}
+	cfg["vintage_snapshot_days"] = [3000, 5109]
+	return with_overrides(build_scenario(cfg), {
+		"collectors.collector_types.thin_film_pv_A.degradation_per_year": 0.08,
+		"collectors.collector_types.reflector_microwave_B.degradation_per_year": 0.3,
+	})
+
+
+def test_fleet_efficiency_follows_launch_cohorts():
+	scenario = _mix_scenario()
+	plan = compile_scenario(scenario)
+	assert plan.collector_mix == (("thin_film_pv_A", 0.75), ("reflector_microwave_B", 0.25))
+	assert plan.base_eff_1au == pytest.approx(0.75 * 0.28 + 0.25 * 0.22)
+	loop = run_simulation(scenario)
+	ts = loop["timeseries"]
+	added = np.diff(ts["cum_area_m2"].to_numpy(), prepend=0.0)
+	last = len(ts) - 1
+	ages = (last - ts["day"].to_numpy()) / 365.0
+	cohorts = sum(share * (added * (1.0 - deg) ** ages).sum() for share, deg in plan.degradation)
+	eff_end = plan.base_eff_1au * cohorts / ts["cum_area_m2"].iloc[-1]
+	assert loop["summary"]["efficiencies"]["pv_eff_1au_end"] == pytest.approx(eff_end, rel=1e-12)
+	# Young area outweighs old: better than degrading the whole fleet by the horizon age
+	assert eff_end > plan.base_eff_1au * sum(s * (1.0 - d) ** (last / 365.0) for s, d in plan.degradation)
+	power = ts["power_GW_1AU_equiv"].to_numpy()
+	for engine in ("vectorized", "adaptive"):
+		np.testing.assert_allclose(run_simulation(scenario, engine=engine)["timeseries"]["power_GW_1AU_equiv"], power, rtol=RTOL, err_msg=engine)
+	batch = run_batch([scenario]).summaries[0]
+	assert batch["delivered_power_GW_at_1AU_equiv"] == pytest.approx(loop["summary"]["delivered_power_GW_at_1AU_equiv"], rel=RTOL)
+
+
+def test_vintage_histogram_at_snapshots(tmp_path):
+	from ds.sim.outputs import write_outputs
+	scenario = _mix_scenario()
+	results = run_simulation(scenario, engine="vectorized")
+	v = results["vintages"]
+	ts = results["timeseries"].set_index("day")
+	for snap in (3000, 5109):
+		at = v[v["snapshot_day"] == snap]
+		assert at["area_m2"].sum() == pytest.approx(ts.loc[snap, "cum_area_m2"], rel=1e-12)
+		assert (at["retained_area_m2"] <= at["area_m2"] * (1 + 1e-12)).all()
+		assert set(at["band"]) == {0, 1, 2} and set(at["collector"]) == {"thin_film_pv_A", "reflector_microwave_B"}
+	write_outputs(results, tmp_path, ("csv",))
+	assert (tmp_path / "vintages.csv").exists()
+	with pytest.raises(ValueError, match="vintage_snapshot_days"):
+		compile_scenario(dict(scenario, vintage_snapshot_days=[10 ** 6]))
+	with pytest.raises(ValueError, match="collector_mix"):
+		compile_scenario(dict(scenario, launch_strategy={"collector_mix": {"nope": 1.0}}))